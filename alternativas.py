@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mejores K divisiones distintas del sorteo (para rotación entre semanas)
+
+En vez de quedarse solo con la mejor división, la búsqueda ofrece cada división
+evaluada a un TopDivisiones: un heap acotado que guarda las K de menor
+objetivo (info['objetivo'] si el sorteo balancea también líneas, repetición o
+predicción; si no, info['diferencia']), sin repetir divisiones (clave = máscara de bits de los ids del
+equipo 1) y, opcionalmente, exigiendo que cada par de alternativas difiera en
+al menos distancia_minima jugadores que cambian de equipo.
+
+Después se puede elegir una o sortear entre ellas con elegir_alternativa()
+sin volver a correr la búsqueda.
+"""
+
+import heapq
+import random
+
+def valor_objetivo(info):
+    """Lo que minimiza el sorteo para una división: info['objetivo'] si existe, si no la diferencia"""
+    return info.get('objetivo', info['diferencia'])
+
+def mascara_equipo(equipo):
+    """Máscara de bits con los ids de los jugadores del equipo"""
+    mascara = 0
+    for jugador in equipo:
+        mascara |= 1 << jugador.id
+    return mascara
+
+class TopDivisiones:
+    """Heap acotado con las K mejores divisiones distintas"""
+
+    def __init__(self, k=5, distancia_minima=0):
+        self.k = k
+        self.distancia_minima = distancia_minima
+        self.descartadas = 0
+        self._heap = []  # (-objetivo, -orden, mascara, equipo1, equipo2, info): la peor queda arriba
+        self._mascaras = set()
+        self._orden = 0
+        self._total = 0
+
+    def __len__(self):
+        return len(self._heap)
+
+    def distancia(self, mascara_a, mascara_b):
+        """Jugadores que cambian de equipo entre dos divisiones (sin importar qué equipo es cuál)"""
+        cambios = (mascara_a ^ mascara_b).bit_count()
+        return min(cambios, self._total - cambios)
+
+    def ofrecer(self, equipo1, equipo2, info):
+        """Considera una división evaluada; devuelve True si quedó entre las K mejores"""
+        mascara = mascara_equipo(equipo1)
+        self._total = (mascara | mascara_equipo(equipo2)).bit_count()
+        diferencia = valor_objetivo(info)
+
+        if mascara in self._mascaras:
+            return False
+        # Ante empate gana la que llegó antes, así el resultado es reproducible
+        if len(self._heap) >= self.k and diferencia >= -self._heap[0][0]:
+            self.descartadas += 1
+            return False
+
+        if self.distancia_minima:
+            conflictos = [e for e in self._heap if self.distancia(e[2], mascara) < self.distancia_minima]
+            if any(-e[0] <= diferencia for e in conflictos):
+                self.descartadas += 1
+                return False  # Ya hay una alternativa parecida y al menos igual de buena
+            if conflictos:
+                for entrada in conflictos:
+                    self._mascaras.discard(entrada[2])
+                self._heap = [e for e in self._heap if e not in conflictos]
+                heapq.heapify(self._heap)
+                self.descartadas += len(conflictos)
+
+        self._orden += 1
+        heapq.heappush(self._heap, (-diferencia, -self._orden, mascara, equipo1, equipo2, info))
+        self._mascaras.add(mascara)
+        if len(self._heap) > self.k:
+            self._mascaras.discard(heapq.heappop(self._heap)[2])
+            self.descartadas += 1
+        return True
+
+    def ordenadas(self):
+        """Alternativas de menor a mayor objetivo como [(equipo1, equipo2, info), ...]"""
+        entradas = sorted(self._heap, key=lambda e: (-e[0], -e[1]))
+        return [(equipo1, equipo2, info) for _, _, _, equipo1, equipo2, info in entradas]
+
+def elegir_alternativa(alternativas, indice=None, margen=None, rng=None):
+    """Elige una de las alternativas guardadas
+
+    Args:
+        alternativas: Lista de (equipo1, equipo2, info), como info['alternativas']
+        indice: Si se indica, devuelve esa alternativa (0 = la mejor)
+        margen: Al sortear, solo considera las de objetivo <= margen (si ninguna cumple, la mejor)
+        rng: random.Random a usar (por defecto el módulo random)
+
+    Returns:
+        tuple: (equipo1, equipo2, info) o (None, None, None) si no hay alternativas
+    """
+    if not alternativas:
+        return None, None, None
+    if indice is not None:
+        return alternativas[indice]
+    candidatas = [a for a in alternativas if margen is None or valor_objetivo(a[2]) <= margen]
+    return (rng or random).choice(candidatas or alternativas[:1])
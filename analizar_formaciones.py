@@ -8,7 +8,7 @@ import json
 import itertools
 from sorteo_posiciones_especificas import (
     cargar_jugadores, jugadores_confirmados, generar_formaciones_posibles,
-    optimizar_posiciones_equipo, puede_jugar_posicion
+    optimizar_posiciones_equipo, puede_jugar_posicion, formatear_formacion
 )
 
 def analizar_formaciones():
@@ -51,10 +51,7 @@ def analizar_equipo_con_formaciones(equipo, formaciones):
         formacion_obj, puntaje, asignacion = optimizar_posiciones_equipo(equipo)
         
         if formacion_obj:
-            defensas = formacion_obj['LCB'] + formacion_obj['RCB']
-            mediocampos = formacion_obj['LM'] + formacion_obj['CM'] + formacion_obj['RM']
-            delanteros = formacion_obj['CF']
-            formato = f"1-{defensas}-{mediocampos}-{delanteros}"
+            formato = formatear_formacion(formacion_obj)
             
             resultados.append({
                 'formacion': formato,
@@ -101,14 +98,8 @@ def analizar_diversidad_equipos():
         form2, puntaje2, _ = optimizar_posiciones_equipo(equipo2)
         
         if form1 and form2:
-            def formato_formacion(f):
-                defensas = f['LCB'] + f['RCB']
-                mediocampos = f['LM'] + f['CM'] + f['RM']
-                delanteros = f['CF']
-                return f"1-{defensas}-{mediocampos}-{delanteros}"
-            
-            formacion1_str = formato_formacion(form1)
-            formacion2_str = formato_formacion(form2)
+            formacion1_str = formatear_formacion(form1)
+            formacion2_str = formatear_formacion(form2)
             
             formaciones_encontradas.add(f"{formacion1_str} vs {formacion2_str}")
     
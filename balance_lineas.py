@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Balance por líneas (arco / defensa / mediocampo / delantera) además del total
+
+El sorteo compara solo puntaje1 contra puntaje2, así que un equipo puede ganar
+la suma con una defensa mucho más floja. Con pesos_lineas el objetivo pasa a ser
+
+    objetivo = pesos['total'] · |total1 - total2| + Σ_línea pesos[línea] · |línea1 - línea2|
+
+donde cada línea suma los puntajes de la asignación que ya produjo el
+optimizador (la línea 'arco' es la diferencia de arqueros). Las líneas salen
+de la plantilla de formaciones.py, así una plantilla con otras líneas también
+funciona. Una línea sin peso no cuenta.
+
+El sorteo (iterar_mejoras) compara las divisiones de a una a medida que las
+evalúa, así que cada una se puntúa con evaluar_balance. objetivos_lote es solo
+para ranking_divisiones, que ya tiene todas las divisiones evaluadas: pondera
+la matriz de diferencias de una vez (NumPy si está instalado). El desglose por
+línea de cada división se sigue armando en Python en los dos casos.
+"""
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+from formaciones import obtener_plantilla, posicion_base
+
+PESOS_POR_DEFECTO = {'total': 1.0, 'arco': 0.5, 'defensa': 0.5, 'mediocampo': 0.5, 'delantera': 0.25}
+
+_lineas_por_plantilla = {}
+
+def _lineas_plantilla():
+    """(nombres de líneas, {posición: línea}) de la plantilla vigente, calculados una vez
+
+    Incluye 'arco' (para GK) y las líneas de las plantillas por tamaño.
+    """
+    plantilla = obtener_plantilla()
+    clave = id(plantilla)
+    if clave not in _lineas_por_plantilla:
+        lineas = list(plantilla['lineas'])
+        for especifica in plantilla.get('por_jugadores_campo', {}).values():
+            lineas += especifica.get('lineas', [])
+        nombres = ['arco']
+        por_posicion = {'GK': 'arco'}
+        for linea in lineas:
+            if linea['nombre'] not in nombres:
+                nombres.append(linea['nombre'])
+            for posicion in linea['posiciones']:
+                por_posicion.setdefault(posicion, linea['nombre'])
+        _lineas_por_plantilla[clave] = (nombres, por_posicion)
+    return _lineas_por_plantilla[clave]
+
+def nombres_lineas():
+    """'arco' y las líneas de la plantilla vigente, en orden"""
+    return _lineas_plantilla()[0]
+
+def desglose_lineas(asignacion):
+    """{línea: suma de puntajes} de una asignación [(nombre, posición, puntaje), ...]"""
+    nombres, por_posicion = _lineas_plantilla()
+    desglose = dict.fromkeys(nombres, 0.0)
+    for _, posicion, puntaje in asignacion:
+        linea = por_posicion.get(posicion, por_posicion.get(posicion_base(posicion)))
+        if linea is not None:
+            desglose[linea] += puntaje
+    return desglose
+
+def _normalizar_pesos(pesos):
+    """Pesos completos: los no indicados valen 0 (y 'total' 1 si no se indica)"""
+    pesos = dict(pesos or {})
+    pesos.setdefault('total', 1.0)
+    return pesos
+
+def evaluar_balance(info, pesos=None):
+    """Objetivo por líneas de una división ya evaluada
+
+    Args:
+        info: info de evaluar_division (usa asignacion1/2 y puntaje1/2)
+        pesos: dict {'total': ..., línea: ...}; por defecto PESOS_POR_DEFECTO
+
+    Returns:
+        dict: {'objetivo': valor, 'lineas': {'rojo': desglose1, 'negro': desglose2}}
+    """
+    pesos = _normalizar_pesos(PESOS_POR_DEFECTO if pesos is None else pesos)
+    desglose1 = desglose_lineas(info['asignacion1'])
+    desglose2 = desglose_lineas(info['asignacion2'])
+    objetivo = pesos['total'] * abs(info['puntaje1'] - info['puntaje2'])
+    for linea, valor in desglose1.items():
+        objetivo += pesos.get(linea, 0.0) * abs(valor - desglose2[linea])
+    return {'objetivo': objetivo, 'lineas': {'rojo': desglose1, 'negro': desglose2}}
+
+def objetivos_lote(infos, pesos=None):
+    """Objetivo por líneas de un ranking ya evaluado (ranking_divisiones)
+
+    Arma una matriz (división × [total, líneas...]) de diferencias absolutas y la
+    multiplica por el vector de pesos. Da lo mismo que evaluar_balance en cada info (salvo redondeo).
+
+    Returns:
+        list: Objetivo de cada info, en el mismo orden
+    """
+    pesos = _normalizar_pesos(PESOS_POR_DEFECTO if pesos is None else pesos)
+    nombres = nombres_lineas()
+    vector_pesos = [pesos['total']] + [pesos.get(linea, 0.0) for linea in nombres]
+    filas = []
+    for info in infos:
+        desglose1 = desglose_lineas(info['asignacion1'])
+        desglose2 = desglose_lineas(info['asignacion2'])
+        filas.append([info['puntaje1'] - info['puntaje2']] + [desglose1[l] - desglose2[l] for l in nombres])
+    if not filas:
+        return []
+    if NUMPY_AVAILABLE:
+        return (np.abs(np.array(filas, dtype=float)) @ np.array(vector_pesos, dtype=float)).tolist()
+    return [sum(peso * abs(valor) for peso, valor in zip(vector_pesos, fila)) for fila in filas]
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark del motor de sorteo con planteles sintéticos de 12 a 40 jugadores
+
+Genera planteles con semilla fija que imitan jugadores_posiciones_especificas.json
+(misma distribución de puntaje general, de posiciones listadas y de diferencias
+entre el puntaje por posición y el general), corre cada estrategia registrada
+en estrategias_sorteo.py (los modos del motor y también 'simple' y
+'balanceado') con las mismas opciones y guarda por corrida:
+    ms, evaluaciones, evaluaciones por segundo, memoria pico (tracemalloc) y
+    diferencia lograda (diferencia_posiciones: la del motor para todas)
+en un JSON que se puede comparar contra una base guardada para marcar regresiones.
+
+El tiempo se mide en una corrida sin tracemalloc (que la haría varias veces más
+lenta) y la memoria en una segunda corrida con la misma semilla. Los tamaños
+sin formaciones en la plantilla (más de 7 por equipo con la plantilla por
+defecto) no se pueden sortear y se saltean; para medirlos hay que agregar sus
+formaciones en formaciones.json.
+
+Uso:
+    python benchmark_sorteo.py                        # Corre todo y guarda benchmark_resultados.json
+    python benchmark_sorteo.py --base benchmark_base.json     # Además compara con la base
+    python benchmark_sorteo.py --guardar-base         # Guarda el resultado como nueva base
+    python benchmark_sorteo.py --tamanos 12 14 --estrategias simple aleatorio exhaustivo
+"""
+
+import sys
+import json
+import random
+import argparse
+import platform
+import tracemalloc
+from datetime import datetime
+
+from cache_evaluaciones import CacheEvaluaciones
+from filtro_grueso import NUMPY_AVAILABLE
+from plantel import POSICIONES, Plantel
+from estrategias_sorteo import ESTRATEGIAS, sortear
+from sorteo_posiciones_especificas import cargar_jugadores, generar_formaciones_posibles
+
+TAMANOS_POR_DEFECTO = (12, 14, 18, 22, 30, 40)
+ARCHIVO_RESULTADOS = 'benchmark_resultados.json'
+ARCHIVO_BASE = 'benchmark_base.json'
+TIEMPO_LIMITE_MS = 1000
+
+# Tolerancias para marcar regresiones contra la base
+TOLERANCIA_VELOCIDAD = 0.25   # Evaluaciones por segundo: más de 25% menos es regresión
+TOLERANCIA_TIEMPO = 0.25      # ms: más de 25% más (y más de MS_MINIMOS) es regresión
+MS_MINIMOS = 20
+TOLERANCIA_MEMORIA = 0.5     # Memoria pico: más de 50% más (y más de KB_MINIMOS) es regresión
+KB_MINIMOS = 256
+TOLERANCIA_DIFERENCIA = 0.05  # Puntos de diferencia
+
+def perfiles_reales(archivo='jugadores_posiciones_especificas.json'):
+    """Distribuciones del plantel real que imita el generador
+
+    Returns:
+        dict: puntajes generales, perfiles (posiciones listadas y diferencias por posición
+              respecto del general) y fracción de arqueros
+    """
+    jugadores = cargar_jugadores(archivo)
+    perfiles = []
+    for j in jugadores:
+        listadas = [p.strip() for p in j['posicion'].split(',')]
+        diferencias = {p: j['puntajes_posicion'][p] - j['puntaje'] for p in POSICIONES}
+        perfiles.append((listadas, diferencias))
+    return {
+        'puntajes': [j['puntaje'] for j in jugadores],
+        'perfiles': perfiles,
+        'fraccion_arqueros': sum('GK' in listadas for listadas, _ in perfiles) / max(len(perfiles), 1)
+    }
+
+def plantel_sintetico(cantidad, semilla, reales=None):
+    """Plantel sintético reproducible de `cantidad` jugadores con al menos 2 arqueros
+
+    Cada jugador toma el perfil de posiciones de un jugador real al azar, un puntaje
+    general muestreado del plantel real con ruido y, por posición, la diferencia del
+    perfil más ruido (todo acotado a [1, 10]).
+    """
+    reales = reales or perfiles_reales()
+    rng = random.Random(semilla)
+    while True:
+        datos = []
+        for i in range(cantidad):
+            listadas, diferencias = rng.choice(reales['perfiles'])
+            general = min(10.0, max(1.0, rng.choice(reales['puntajes']) + rng.gauss(0, 0.4)))
+            datos.append({
+                'nombre': f"Sintético {i + 1:02d}",
+                'posicion': ', '.join(listadas),
+                'puntaje': round(general, 1),
+                'puntajes_posicion': {p: round(min(10.0, max(1.0, general + diferencias[p] + rng.gauss(0, 0.3))), 1)
+                                      for p in POSICIONES}
+            })
+        if sum('GK' in d['posicion'] for d in datos) >= 2:
+            return Plantel(datos)
+
+def _evaluaciones(info, cache):
+    """Divisiones evaluadas con el motor en una corrida (None si la estrategia no usa el motor)"""
+    if 'busqueda_local' in info:
+        return info['busqueda_local']['evaluaciones']
+    if 'ramificacion' in info:
+        return info['ramificacion']['hojas']
+    estadisticas = cache.estadisticas()
+    return (estadisticas['aciertos'] + estadisticas['fallos']) // 2 or None
+
+def _correr(jugadores, estrategia, semilla, tiempo_limite_ms):
+    """Una corrida silenciosa con las mismas opciones para toda estrategia; devuelve (ResultadoSorteo, caché)"""
+    cache = CacheEvaluaciones()
+    resultado = sortear(estrategia, jugadores, semilla=semilla, num_intentos=100000, margen_error=0.0,
+                        cache=cache, tiempo_limite_ms=tiempo_limite_ms)
+    return resultado, cache
+
+def medir(jugadores, estrategia, semilla=0, tiempo_limite_ms=TIEMPO_LIMITE_MS):
+    """Mide una estrategia sobre un plantel (tiempo y memoria en corridas separadas)
+
+    El tiempo es el de la estrategia sola y la diferencia es diferencia_posiciones de
+    estrategias_sorteo.py, la misma medida del motor para todas.
+    """
+    sorteo, cache = _correr(jugadores, estrategia, semilla, tiempo_limite_ms)
+    ms = sorteo.ms
+
+    tracemalloc.start()
+    _correr(jugadores, estrategia, semilla, tiempo_limite_ms)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # La clave sigue siendo 'modo' para poder comparar contra bases guardadas antes
+    resultado = {'modo': estrategia, 'jugadores': len(jugadores), 'semilla': semilla, 'ms': round(ms, 1),
+                 'memoria_pico_kb': round(pico / 1024, 1)}
+    if not sorteo.valido or sorteo.diferencia_posiciones is None:
+        return dict(resultado, valido=False)
+    evaluaciones = _evaluaciones(sorteo.info, cache)
+    return dict(resultado, valido=True, evaluaciones=evaluaciones,
+                eval_por_seg=round(evaluaciones / (ms / 1000), 1) if evaluaciones and ms else None,
+                diferencia=round(sorteo.diferencia_posiciones, 3))
+
+def correr_benchmark(tamanos=TAMANOS_POR_DEFECTO, estrategias=None, semilla=0, tiempo_limite_ms=TIEMPO_LIMITE_MS):
+    """Corre cada estrategia (por defecto todas las de ESTRATEGIAS) sobre cada tamaño y devuelve el reporte completo"""
+    estrategias = list(estrategias or ESTRATEGIAS)
+    reales = perfiles_reales()
+    resultados = []
+    for cantidad in tamanos:
+        plantel = plantel_sintetico(cantidad, semilla + cantidad, reales)
+        if not generar_formaciones_posibles(cantidad // 2 - 1):
+            print(f"   {cantidad:>2} jugadores · sin formaciones en la plantilla, se saltea")
+            continue
+        for estrategia in estrategias:
+            resultado = medir(plantel.jugadores, estrategia, semilla, tiempo_limite_ms)
+            resultados.append(resultado)
+            print(f"   {cantidad:>2} jugadores · {estrategia:<12} {resultado['ms']:>8.1f} ms  "
+                  f"{resultado.get('eval_por_seg') or 0:>10.0f} eval/s  {resultado['memoria_pico_kb']:>9.1f} KB  "
+                  f"diferencia {resultado.get('diferencia', float('nan')):.3f}")
+    return {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': NUMPY_AVAILABLE,
+        'semilla': semilla,
+        'tiempo_limite_ms': tiempo_limite_ms,
+        'resultados': resultados
+    }
+
+def comparar(actual, base):
+    """Regresiones de `actual` contra `base` como lista de mensajes (vacía si no hay)"""
+    por_clave = {(r['modo'], r['jugadores']): r for r in base.get('resultados', [])}
+    regresiones = []
+    for r in actual['resultados']:
+        b = por_clave.get((r['modo'], r['jugadores']))
+        if b is None:
+            continue
+        nombre = f"{r['jugadores']} jugadores · {r['modo']}"
+        if b.get('valido') and not r.get('valido'):
+            regresiones.append(f"{nombre}: ya no encuentra una división válida")
+            continue
+        if not r.get('valido'):
+            continue
+        if r['ms'] > b['ms'] * (1 + TOLERANCIA_TIEMPO) and r['ms'] - b['ms'] > MS_MINIMOS:
+            regresiones.append(f"{nombre}: {b['ms']:.0f} → {r['ms']:.0f} ms")
+        if b.get('eval_por_seg') and (r.get('eval_por_seg') or 0) < b['eval_por_seg'] * (1 - TOLERANCIA_VELOCIDAD):
+            regresiones.append(f"{nombre}: {b['eval_por_seg']:.0f} → {r['eval_por_seg']:.0f} eval/s")
+        if (r['memoria_pico_kb'] > b['memoria_pico_kb'] * (1 + TOLERANCIA_MEMORIA)
+                and r['memoria_pico_kb'] - b['memoria_pico_kb'] > KB_MINIMOS):
+            regresiones.append(f"{nombre}: memoria {b['memoria_pico_kb']:.0f} → {r['memoria_pico_kb']:.0f} KB")
+        if r['diferencia'] > b['diferencia'] + TOLERANCIA_DIFERENCIA:
+            regresiones.append(f"{nombre}: diferencia {b['diferencia']:.3f} → {r['diferencia']:.3f}")
+    return regresiones
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark del motor de sorteo con planteles sintéticos')
+    parser.add_argument('--tamanos', type=int, nargs='+', default=list(TAMANOS_POR_DEFECTO))
+    parser.add_argument('--estrategias', '--modos', nargs='+', default=list(ESTRATEGIAS), choices=list(ESTRATEGIAS))
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--tiempo-limite-ms', type=int, default=TIEMPO_LIMITE_MS)
+    parser.add_argument('--salida', default=ARCHIVO_RESULTADOS)
+    parser.add_argument('--base', help='JSON de una corrida anterior para marcar regresiones')
+    parser.add_argument('--guardar-base', action='store_true', help=f'Guarda también el resultado en {ARCHIVO_BASE}')
+    args = parser.parse_args()
+
+    base = None
+    if args.base:  # Se lee antes de correr: la salida puede ser el mismo archivo
+        try:
+            with open(args.base, 'r', encoding='utf-8') as f:
+                base = json.load(f)
+        except Exception as e:
+            print(f"❌ Error leyendo {args.base}: {e}")
+            sys.exit(2)
+
+    print(f"⏱️  Benchmark del sorteo (semilla {args.semilla}, plazo {args.tiempo_limite_ms} ms, "
+          f"{'NumPy' if NUMPY_AVAILABLE else 'Python puro'})")
+    reporte = correr_benchmark(args.tamanos, args.estrategias, args.semilla, args.tiempo_limite_ms)
+
+    archivos = [args.salida] + ([ARCHIVO_BASE] if args.guardar_base else [])
+    for archivo in archivos:
+        with open(archivo, 'w', encoding='utf-8') as f:
+            json.dump(reporte, f, ensure_ascii=False, indent=2)
+    print(f"💾 Resultados guardados en {', '.join(archivos)}")
+
+    if base is not None:
+        regresiones = comparar(reporte, base)
+        if regresiones:
+            print(f"❌ {len(regresiones)} regresión(es) contra {args.base}:")
+            for mensaje in regresiones:
+                print(f"   • {mensaje}")
+            sys.exit(1)
+        print(f"✅ Sin regresiones contra {args.base}")
+
+if __name__ == "__main__":
+    main()
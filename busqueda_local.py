@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sorteo por búsqueda local para planteles grandes (fútbol 11, torneos, 30+ confirmados)
+
+Los modos exactos del motor principal recorren divisiones completas, y con
+equipos grandes ya no alcanzan a ver una fracción útil de ellas. Acá se parte de
+una división golosa (reparto en serpentina por puntaje) y se mejora
+intercambiando jugadores entre equipos:
+
+- 'escalada': aplica el primer intercambio que mejora; al atascarse
+  perturba la mejor división con intercambios al azar y vuelve a subir.
+- 'recocido': recocido simulado; acepta intercambios peores con probabilidad
+  exp(-delta / T) y la temperatura baja según el tiempo consumido.
+
+Cada división visitada se evalúa con el motor principal (evaluar_division:
+arqueros y formación óptima), así que el objetivo es la diferencia real y la
+búsqueda termina apenas queda dentro de margen_error. Por eso solo sirve para
+tamaños con formaciones en la plantilla (formaciones.json, con
+"por_jugadores_campo" para fútbol 11 u otros tamaños).
+
+Para guiar la búsqueda se usa además un objetivo aproximado que se actualiza
+en O(líneas) por intercambio: cada jugador aporta su mejor puntaje en una
+posición válida y cuenta en la línea de esa posición,
+    |suma1 - suma2| + peso_lineas · Σ |jugadores_línea1 - jugadores_línea2|
+    + penalización por cada equipo sin arquero válido
+    + penalización por cada arquero sin otra posición que quedaría jugando de campo
+La escalada prueba los intercambios en orden de ese objetivo, y las divisiones
+sin formación completa valen PENALIZACION_SIN_FORMACION más el aproximado.
+Los 2 mejores jugadores quedan fijos en equipos distintos, igual que en el
+sorteo principal.
+"""
+
+import math
+import random
+import time
+
+from formaciones import generar_formaciones
+from plantel import POSICIONES, LINEAS, LINEA_POSICION, INDICE_POSICION, asegurar_jugadores
+
+COLUMNA_GK = INDICE_POSICION['GK']
+INDICE_LINEA = {linea: i for i, linea in enumerate(LINEAS)}
+PENALIZACION_SIN_ARQUERO = 100.0
+PENALIZACION_ARQUERO_DE_CAMPO = 100.0
+PENALIZACION_SIN_FORMACION = 1000.0  # Divisiones que el motor no puede armar
+
+def posicion_preferida(jugador, permitir_fuera_posicion=False):
+    """Mejor posición de campo del jugador (GK solo si no tiene otra) y su puntaje"""
+    candidatas = [
+        (jugador.puntajes[i], posicion) for i, posicion in enumerate(POSICIONES)
+        if posicion != 'GK' and (permitir_fuera_posicion or jugador.elegibles >> i & 1)
+    ]
+    if not candidatas:
+        return 'GK', jugador.puntajes[COLUMNA_GK]
+    puntaje, posicion = max(candidatas)
+    return posicion, puntaje
+
+class EstadoDivision:
+    """División de dos equipos con sumas y conteos por línea mantenidos incrementalmente"""
+
+    def __init__(self, valores, lineas, arqueros, equipo, peso_lineas, solo_arco=None):
+        self.valores = valores      # Aporte de cada jugador
+        self.lineas = lineas        # Índice de línea de cada jugador
+        self.arqueros = arqueros    # 1 si puede jugar de arquero
+        self.solo_arco = solo_arco or [0] * len(valores)  # 1 si solo puede jugar de arquero
+        self.peso_lineas = peso_lineas
+        self.reiniciar(equipo)
+
+    def reiniciar(self, equipo):
+        """Recalcula sumas y conteos desde cero para una división (0 o 1 por jugador)"""
+        valores, lineas, arqueros = self.valores, self.lineas, self.arqueros
+        self.equipo = list(equipo)
+        self.sumas = [0.0, 0.0]
+        self.conteos = [[0] * len(LINEAS), [0] * len(LINEAS)]
+        self.num_arqueros = [0, 0]
+        self.num_solo_arco = [0, 0]
+        for i, t in enumerate(self.equipo):
+            self.sumas[t] += valores[i]
+            self.conteos[t][lineas[i]] += 1
+            self.num_arqueros[t] += arqueros[i]
+            self.num_solo_arco[t] += self.solo_arco[i]
+        self.objetivo = self._objetivo(self.sumas[0], self.sumas[1], self.conteos[0], self.conteos[1],
+                                       self.num_arqueros[0], self.num_arqueros[1],
+                                       self.num_solo_arco[0], self.num_solo_arco[1])
+
+    def _objetivo(self, suma1, suma2, conteo1, conteo2, arqueros1, arqueros2, solo_arco1, solo_arco2):
+        desbalance_lineas = sum(abs(a - b) for a, b in zip(conteo1, conteo2))
+        objetivo = abs(suma1 - suma2) + self.peso_lineas * desbalance_lineas
+        if not arqueros1:
+            objetivo += PENALIZACION_SIN_ARQUERO
+        if not arqueros2:
+            objetivo += PENALIZACION_SIN_ARQUERO
+        # Solo uno por equipo va al arco: los demás arqueros puros no tienen posición de campo
+        objetivo += PENALIZACION_ARQUERO_DE_CAMPO * (max(solo_arco1 - 1, 0) + max(solo_arco2 - 1, 0))
+        return objetivo
+
+    def evaluar_intercambio(self, a, b):
+        """Objetivo si a (equipo 0) y b (equipo 1) cambian de equipo, sin aplicarlo"""
+        va, vb = self.valores[a], self.valores[b]
+        la, lb = self.lineas[a], self.lineas[b]
+        conteo1 = list(self.conteos[0])
+        conteo2 = list(self.conteos[1])
+        conteo1[la] -= 1
+        conteo1[lb] += 1
+        conteo2[lb] -= 1
+        conteo2[la] += 1
+        cambio_arqueros = self.arqueros[b] - self.arqueros[a]
+        cambio_solo_arco = self.solo_arco[b] - self.solo_arco[a]
+        return self._objetivo(self.sumas[0] - va + vb, self.sumas[1] - vb + va, conteo1, conteo2,
+                              self.num_arqueros[0] + cambio_arqueros, self.num_arqueros[1] - cambio_arqueros,
+                              self.num_solo_arco[0] + cambio_solo_arco, self.num_solo_arco[1] - cambio_solo_arco)
+
+    def aplicar_intercambio(self, a, b, objetivo=None):
+        """Intercambia a (equipo 0) con b (equipo 1)"""
+        if objetivo is None:
+            objetivo = self.evaluar_intercambio(a, b)
+        va, vb = self.valores[a], self.valores[b]
+        la, lb = self.lineas[a], self.lineas[b]
+        self.sumas[0] += vb - va
+        self.sumas[1] += va - vb
+        self.conteos[0][la] -= 1
+        self.conteos[0][lb] += 1
+        self.conteos[1][lb] -= 1
+        self.conteos[1][la] += 1
+        cambio_arqueros = self.arqueros[b] - self.arqueros[a]
+        self.num_arqueros[0] += cambio_arqueros
+        self.num_arqueros[1] -= cambio_arqueros
+        cambio_solo_arco = self.solo_arco[b] - self.solo_arco[a]
+        self.num_solo_arco[0] += cambio_solo_arco
+        self.num_solo_arco[1] -= cambio_solo_arco
+        self.equipo[a], self.equipo[b] = 1, 0
+        self.objetivo = objetivo
+
+def reparto_serpentina(valores, fijos=None):
+    """División golosa: ordena por aporte y reparte 1-2-2-1-1-2-... entre los equipos"""
+    orden = sorted(range(len(valores)), key=lambda i: valores[i], reverse=True)
+    equipo = [0] * len(valores)
+    for posicion, i in enumerate(orden):
+        equipo[i] = 0 if posicion % 4 in (0, 3) else 1
+    fijos = fijos or {}
+    for i, t in fijos.items():
+        equipo[i] = t
+    # Los fijos pueden desbalancear la cantidad: se corrige moviendo libres del más grande
+    libres = [i for i in orden if i not in fijos]
+    while equipo.count(0) != equipo.count(1):
+        grande = 0 if equipo.count(0) > equipo.count(1) else 1
+        i = next(i for i in reversed(libres) if equipo[i] == grande)
+        equipo[i] = 1 - grande
+    return equipo
+
+class EvaluadorMotor:
+    """Evalúa divisiones (0 o 1 por jugador) con el motor principal y recuerda la mejor
+
+    Las divisiones ya vistas no se vuelven a optimizar. contadores['evaluaciones']
+    cuenta solo las que llegan al motor.
+    """
+
+    def __init__(self, jugadores, mejor_jugador, segundo_mejor_jugador, jugadores_sorted_gk,
+                 permitir_fuera_posicion, cache, contadores):
+        from sorteo_posiciones_especificas import evaluar_division
+        self._evaluar_division = evaluar_division
+        self.jugadores = jugadores
+        self.mejor_jugador = mejor_jugador
+        self.segundo_mejor_jugador = segundo_mejor_jugador
+        self.jugadores_sorted_gk = jugadores_sorted_gk
+        self.permitir_fuera_posicion = permitir_fuera_posicion
+        self.cache = cache
+        self.contadores = contadores
+        self.vistas = {}
+        self.mejor = None  # (diferencia, equipo1, equipo2, info)
+
+    def __call__(self, equipo, objetivo_aproximado):
+        """Diferencia real de la división, o la penalización si algún equipo no tiene formación"""
+        clave = tuple(equipo)
+        if clave in self.vistas:
+            self.contadores['repetidas'] += 1
+            return self.vistas[clave]
+        self.contadores['evaluaciones'] += 1
+        equipo1, equipo2, info = self._evaluar_division(
+            [j for j, t in zip(self.jugadores, equipo) if t == 0],
+            [j for j, t in zip(self.jugadores, equipo) if t == 1],
+            self.mejor_jugador, self.segundo_mejor_jugador, self.jugadores_sorted_gk,
+            self.permitir_fuera_posicion, self.cache)
+        if formacion_completa(equipo1, equipo2, info):
+            objetivo = info['diferencia']
+            if self.mejor is None or objetivo < self.mejor[0]:
+                self.mejor = (objetivo, equipo1, equipo2, info)
+        else:
+            self.contadores['sin_formacion'] += 1
+            objetivo = PENALIZACION_SIN_FORMACION + objetivo_aproximado
+        self.vistas[clave] = objetivo
+        return objetivo
+
+def _con_intercambio(equipo, a, b):
+    """Copia de la división con a (equipo 0) y b (equipo 1) intercambiados"""
+    equipo = list(equipo)
+    equipo[a], equipo[b] = 1, 0
+    return equipo
+
+def _escalada(estado, libres, evaluar, margen_error, plazo, rng, contadores):
+    """Primer intercambio que mejora (en orden del objetivo aproximado); al atascarse perturba la mejor división"""
+    actual = evaluar(estado.equipo, estado.objetivo)
+    mejor_objetivo = actual
+    mejor_equipo = list(estado.equipo)
+    while mejor_objetivo > margen_error + 1e-9 and time.perf_counter() < plazo:
+        equipo0 = [i for i in libres if estado.equipo[i] == 0]
+        equipo1 = [i for i in libres if estado.equipo[i] == 1]
+        if not equipo0 or not equipo1:
+            break  # Nada que intercambiar
+        vecinos = sorted((estado.evaluar_intercambio(a, b), a, b) for a in equipo0 for b in equipo1)
+        mejora = None
+        for aproximado, a, b in vecinos:
+            if time.perf_counter() >= plazo:
+                break
+            objetivo = evaluar(_con_intercambio(estado.equipo, a, b), aproximado)
+            if objetivo < actual - 1e-9:
+                mejora = (a, b, aproximado, objetivo)
+                break
+        if mejora is not None:
+            a, b, aproximado, actual = mejora
+            estado.aplicar_intercambio(a, b, aproximado)
+            contadores['intercambios'] += 1
+            if actual < mejor_objetivo - 1e-9:
+                mejor_objetivo = actual
+                mejor_equipo = list(estado.equipo)
+                contadores['mejoras'] += 1
+            continue
+        if time.perf_counter() >= plazo:
+            break
+        # Óptimo local: reiniciar desde la mejor división con 2 intercambios al azar
+        contadores['reinicios'] += 1
+        estado.reiniciar(mejor_equipo)
+        for _ in range(2):
+            a = rng.choice([i for i in libres if estado.equipo[i] == 0])
+            b = rng.choice([i for i in libres if estado.equipo[i] == 1])
+            estado.aplicar_intercambio(a, b)
+        actual = evaluar(estado.equipo, estado.objetivo)
+    return mejor_equipo, mejor_objetivo
+
+def _recocido(estado, libres, evaluar, margen_error, inicio, plazo, rng, contadores):
+    """Recocido simulado sobre la diferencia real, con enfriamiento geométrico según el tiempo transcurrido"""
+    actual = evaluar(estado.equipo, estado.objetivo)
+    mejor_objetivo = actual
+    mejor_equipo = list(estado.equipo)
+    valores_libres = [estado.valores[i] for i in libres]
+    temperatura_inicial = max(max(valores_libres) - min(valores_libres), 0.1) if valores_libres else 0.1
+    temperatura_final = temperatura_inicial * 1e-3
+    duracion = max(plazo - inicio, 1e-6)
+
+    while mejor_objetivo > margen_error + 1e-9:  # Tolerancia por el redondeo de las sumas
+        ahora = time.perf_counter()
+        if ahora >= plazo:
+            break
+        progreso = (ahora - inicio) / duracion
+        temperatura = temperatura_inicial * (temperatura_final / temperatura_inicial) ** progreso
+
+        equipo0 = [i for i in libres if estado.equipo[i] == 0]
+        equipo1 = [i for i in libres if estado.equipo[i] == 1]
+        if not equipo0 or not equipo1:
+            break
+        a = rng.choice(equipo0)
+        b = rng.choice(equipo1)
+        aproximado = estado.evaluar_intercambio(a, b)
+        objetivo = evaluar(_con_intercambio(estado.equipo, a, b), aproximado)
+        delta = objetivo - actual
+        if delta <= 0 or rng.random() < math.exp(-delta / temperatura):
+            estado.aplicar_intercambio(a, b, aproximado)
+            actual = objetivo
+            contadores['intercambios'] += 1
+            if actual < mejor_objetivo - 1e-9:
+                mejor_objetivo = actual
+                mejor_equipo = list(estado.equipo)
+                contadores['mejoras'] += 1
+    return mejor_equipo, mejor_objetivo
+
+def formacion_completa(equipo1, equipo2, info):
+    """True si el motor asignó posición a todos los jugadores de ambos equipos"""
+    return (info is not None and len(info['asignacion1']) == len(equipo1)
+            and len(info['asignacion2']) == len(equipo2))
+
+def sorteo_busqueda_local(jugadores, tiempo_limite_ms=500, metodo='recocido', permitir_fuera_posicion=False,
+                          peso_lineas=1.0, margen_error=0.0, cache=None, rng=None):
+    """Sorteo de dos equipos por búsqueda local con plazo
+
+    Args:
+        jugadores: Lista de jugadores (número par; la plantilla de formaciones.py debe tener
+                   formaciones para ese tamaño de equipo)
+        tiempo_limite_ms: Plazo de la búsqueda
+        metodo: 'recocido' (recocido simulado) o 'escalada' (primer intercambio que mejora, con reinicios)
+        permitir_fuera_posicion: Si True, permite jugadores en posiciones que no están en su lista
+        peso_lineas: Peso del desbalance de jugadores por línea en el objetivo aproximado
+        margen_error: La búsqueda termina apenas una división queda dentro de este margen
+        cache: CacheEvaluaciones opcional para evaluar_division
+        rng: random.Random a usar (por defecto el módulo random)
+
+    Returns:
+        tuple: (equipo1, equipo2, info) con el arquero primero en cada equipo; info es el del
+               motor principal para la mejor división con formación completa, con
+               info['busqueda_local'] resumiendo la búsqueda. (None, None, None) si no hay
+               formaciones para ese tamaño o ninguna división visitada tiene formación completa.
+    """
+    if len(jugadores) % 2 != 0:
+        print("❌ Error: Número impar de jugadores")
+        return None, None, None
+    if metodo not in ('recocido', 'escalada'):
+        print(f"❌ Error: Método de búsqueda desconocido '{metodo}'")
+        return None, None, None
+    if not generar_formaciones(len(jugadores) // 2 - 1):
+        print(f"❌ Error: No hay formaciones para equipos de {len(jugadores) // 2} jugadores "
+              f"(agregarlas en formaciones.json)")
+        return None, None, None
+
+    from sorteo_posiciones_especificas import _preparar_sorteo, _verificar_separacion
+
+    jugadores = asegurar_jugadores(jugadores)
+    if cache is not None:
+        cache.preparar(jugadores)
+    rng = rng or random
+    inicio = time.perf_counter()
+    plazo = inicio + tiempo_limite_ms / 1000
+
+    mejor_jugador, segundo_mejor_jugador, jugadores_sorted_gk = _preparar_sorteo(
+        jugadores, permitir_fuera_posicion, mostrar=False)
+    preferidas = {j.id: posicion_preferida(j, permitir_fuera_posicion) for j in jugadores}
+    valores = [preferidas[j.id][1] for j in jugadores]
+    lineas = [INDICE_LINEA[LINEA_POSICION[preferidas[j.id][0]]] for j in jugadores]
+    arqueros = [1 if permitir_fuera_posicion or j.puede_jugar('GK') else 0 for j in jugadores]
+    solo_arco = [1 if preferidas[j.id][0] == 'GK' else 0 for j in jugadores]
+
+    indice = {j.id: i for i, j in enumerate(jugadores)}
+    fijos = {indice[mejor_jugador.id]: 0, indice[segundo_mejor_jugador.id]: 1}
+    libres = [i for i in range(len(jugadores)) if i not in fijos]
+
+    estado = EstadoDivision(valores, lineas, arqueros, reparto_serpentina(valores, fijos), peso_lineas, solo_arco)
+    contadores = {'evaluaciones': 0, 'repetidas': 0, 'sin_formacion': 0, 'intercambios': 0, 'mejoras': 0,
+                  'reinicios': 0}
+    evaluar = EvaluadorMotor(jugadores, mejor_jugador, segundo_mejor_jugador, jugadores_sorted_gk,
+                             permitir_fuera_posicion, cache, contadores)
+    objetivo_inicial = evaluar(estado.equipo, estado.objetivo)
+
+    if metodo == 'escalada':
+        _escalada(estado, libres, evaluar, margen_error, plazo, rng, contadores)
+    else:
+        _recocido(estado, libres, evaluar, margen_error, inicio, plazo, rng, contadores)
+
+    if evaluar.mejor is None:
+        print(f"❌ Error: Ninguna de las {contadores['evaluaciones']} divisiones evaluadas tiene formación completa")
+        return None, None, None
+    diferencia, equipo1, equipo2, info = evaluar.mejor
+    ms = (time.perf_counter() - inicio) * 1000
+    info['busqueda_local'] = dict(contadores, metodo=metodo, objetivo_inicial=round(objetivo_inicial, 3),
+                                  diferencia=round(diferencia, 3), ms=round(ms, 1))
+
+    print(f"🧭 Búsqueda local ({metodo}): {objetivo_inicial:.2f} → {diferencia:.2f} "
+          f"en {contadores['evaluaciones']} evaluaciones, {contadores['intercambios']} intercambios ({ms:.0f} ms)")
+    _verificar_separacion(mejor_jugador, segundo_mejor_jugador, equipo1, equipo2)
+    return equipo1, equipo2, info
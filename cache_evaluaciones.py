@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Caché de evaluaciones de equipos para el sorteo con posiciones específicas
+
+Guarda el resultado de optimizar_posiciones_equipo (formación, puntaje, asignación)
+por composición de equipo. La clave es canónica:
+    (índice del arquero, máscara de bits de los jugadores de campo,
+     permitir_fuera_posicion, versión de los puntajes y de la plantilla de formaciones)
+Los índices salen del orden alfabético de los nombres, así la misma lista de
+jugadores produce siempre las mismas claves y la caché puede guardarse en disco.
+"""
+
+import os
+import json
+import hashlib
+from collections import OrderedDict
+
+ARCHIVO_CACHE = 'cache_sorteo.json'
+
+def _datos_puntajes(jugador):
+    """Lo que entra en la versión de puntajes de un jugador"""
+    return (jugador['nombre'], jugador['posicion'], jugador['puntaje'], sorted(jugador['puntajes_posicion'].items()))
+
+def version_puntajes(jugadores):
+    """Huella de los puntajes de una lista de jugadores (cambia si se edita cualquier puntaje)"""
+    datos = sorted(_datos_puntajes(j) for j in jugadores)
+    contenido = json.dumps(datos, ensure_ascii=False)
+    return hashlib.sha1(contenido.encode('utf-8')).hexdigest()[:12]
+
+class CacheEvaluaciones:
+    """Caché LRU de evaluaciones de equipos con contadores de aciertos y fallos"""
+
+    def __init__(self, capacidad=20000, archivo=None):
+        self.capacidad = capacidad
+        self.archivo = archivo
+        self.aciertos = 0
+        self.fallos = 0
+        self.indices = {}
+        self.version = None
+        self._preparada = False
+        self._puntajes = {}   # nombre -> _datos_puntajes con los que se preparó
+        self._plantilla = None
+        self._datos = OrderedDict()
+
+        if archivo:
+            self.cargar_desde_disco(archivo)
+
+    def preparar(self, jugadores):
+        """Asigna índices canónicos a los jugadores y fija la versión de puntajes
+
+        Si ya se preparó con una lista que incluye a todos estos jugadores, con los mismos
+        puntajes y la misma plantilla de formaciones, no hace nada: así se puede preparar
+        una vez con el plantel completo y reutilizar la caché con cualquier lista de
+        confirmados. Si cambió algún puntaje (se editó el JSON del plantel) o la
+        plantilla, la caché se vacía y se vuelve a preparar con estos jugadores.
+        """
+        from formaciones import huella_plantilla  # Import diferido: formaciones -> plantel -> este módulo
+        plantilla = huella_plantilla()
+        if (self._preparada and plantilla == self._plantilla
+                and all(self._puntajes.get(j['nombre']) == _datos_puntajes(j) for j in jugadores)):
+            return
+
+        version = f"{version_puntajes(jugadores)}:{plantilla}"
+        if version != self.version:
+            self._datos.clear()  # Las entradas de otra versión ya no sirven
+        self.version = version
+        self.indices = {nombre: i for i, nombre in enumerate(sorted(j['nombre'] for j in jugadores))}
+        self._puntajes = {j['nombre']: _datos_puntajes(j) for j in jugadores}
+        self._plantilla = plantilla
+        self._preparada = True
+
+    def ordenar(self, jugadores):
+        """Ordena jugadores por su índice canónico"""
+        return sorted(jugadores, key=lambda j: self.indices[j.nombre])
+
+    def clave(self, arquero, jugadores_campo, permitir_fuera_posicion=False):
+        """Construye la clave canónica de un equipo"""
+        mascara = 0
+        for jugador in jugadores_campo:
+            mascara |= 1 << self.indices[jugador.nombre]
+        return (self.indices[arquero.nombre], mascara, bool(permitir_fuera_posicion), self.version)
+
+    def obtener(self, clave):
+        """Devuelve la evaluación guardada o None, actualizando los contadores"""
+        valor = self._datos.get(clave)
+        if valor is None:
+            self.fallos += 1
+            return None
+        self._datos.move_to_end(clave)
+        self.aciertos += 1
+        return valor
+
+    def guardar(self, clave, valor):
+        """Guarda una evaluación, descartando la menos usada si se supera la capacidad"""
+        self._datos[clave] = valor
+        self._datos.move_to_end(clave)
+        while len(self._datos) > self.capacidad:
+            self._datos.popitem(last=False)
+
+    def estadisticas(self):
+        """Resumen de uso de la caché"""
+        consultas = self.aciertos + self.fallos
+        return {
+            'entradas': len(self._datos),
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'tasa_aciertos': round(self.aciertos / consultas, 3) if consultas else 0.0
+        }
+
+    def guardar_en_disco(self, archivo=None):
+        """Guarda la caché en un archivo JSON"""
+        archivo = archivo or self.archivo or ARCHIVO_CACHE
+        entradas = [
+            [list(clave), [formacion, puntaje, [list(a) for a in asignacion]]]
+            for clave, (formacion, puntaje, asignacion) in self._datos.items()
+        ]
+        try:
+            with open(archivo, 'w', encoding='utf-8') as f:
+                json.dump({'version': self.version, 'indices': self.indices, 'entradas': entradas},
+                          f, ensure_ascii=False)
+            return True
+        except Exception as e:
+            print(f"⚠️  Error guardando caché en {archivo}: {e}")
+            return False
+
+    def cargar_desde_disco(self, archivo=None):
+        """Carga una caché guardada previamente (si el archivo existe)"""
+        archivo = archivo or self.archivo or ARCHIVO_CACHE
+        if not os.path.exists(archivo):
+            return False
+        try:
+            with open(archivo, 'r', encoding='utf-8') as f:
+                datos = json.load(f)
+            self.version = datos['version']
+            self.indices = datos['indices']
+            self._datos.clear()
+            for clave, (formacion, puntaje, asignacion) in datos['entradas']:
+                self.guardar(tuple(clave), (formacion, puntaje, [tuple(a) for a in asignacion]))
+            print(f"💾 Caché cargada desde {archivo}: {len(self._datos)} evaluaciones")
+            return True
+        except Exception as e:
+            print(f"⚠️  Error cargando caché desde {archivo}: {e}")
+            return False
@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Calibración del sorteo contra el historial: re-sortea cada partido jugado
+
+Recorre los partidos del historial (historial_partidos.json, otro JSON con el
+mismo formato o la base de datos de database_manager.py), reconstruye el
+plantel de cada uno con los jugadores de los dos equipos y:
+
+    1. Mide la diferencia que predice el sorteo para los equipos que jugaron
+       de verdad (con signo, rojo - negro): puntaje por posición según el motor
+       y promedio general.
+    2. La compara con la diferencia de goles real: correlación, recta
+       goles = intercepto + pendiente · diferencia, acierto del signo y una
+       tabla por tramos de |diferencia| (la calibración).
+    3. Vuelve a sortear ese plantel con la estrategia elegida (registro de
+       estrategias_sorteo.py) y compara su diferencia con la de los equipos
+       reales; con la pendiente de la calibración la traduce a goles esperados.
+
+Los sorteos corren en un ProcessPoolExecutor. Cada worker carga el plantel y
+una caché de evaluaciones una sola vez y los reutiliza en todos sus partidos;
+a cada worker viajan solo ids y vuelven solo números. Cada partido se sortea con
+la semilla "semilla:id del partido", así el reporte no depende de cuántos
+workers haya. Las estadísticas se calculan al final de una vez sobre todos los
+partidos, con NumPy si está disponible y en Python puro si no.
+
+Se descartan (y se cuentan por motivo) los partidos sin resultado, con equipos
+de distinto tamaño o con jugadores que no están en el plantel.
+
+Uso:
+    python calibracion_historial.py                            # historial_partidos.json, estrategia aleatorio
+    python calibracion_historial.py --archivo railway_backup.json --estrategia exhaustivo --workers 4
+    python calibracion_historial.py --fuente db                # Partidos de la base de datos
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import bisect
+import argparse
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+from cache_evaluaciones import CacheEvaluaciones
+from coocurrencia import equipos_partido
+from estrategias_sorteo import ESTRATEGIAS, buscar_jugadores, diferencia_posiciones, sortear
+from plantel import Plantel
+from seleccion_suplentes import ARCHIVO_HISTORIAL
+
+ARCHIVO_REPORTE = 'calibracion_historial.json'
+ARCHIVO_JUGADORES = 'jugadores_posiciones_especificas.json'
+TRAMOS_POR_DEFECTO = 4
+
+# ===== LECTURA DEL HISTORIAL =====
+
+def partidos_historial(fuente='json', archivo=ARCHIVO_HISTORIAL):
+    """Recorre los partidos de la fuente ('json' = archivo, 'db' = DatabaseManager)"""
+    if fuente == 'db':
+        from database_manager import get_db_manager
+        yield from get_db_manager().get_historial_partidos()
+        return
+    try:
+        with open(archivo, 'r', encoding='utf-8-sig') as f:
+            yield from json.load(f)
+    except FileNotFoundError:
+        print(f"❌ Error: No se encontró el archivo {archivo}")
+
+def reconstruir_partido(partido, jugadores):
+    """Equipos de un partido como ids del plantel y su diferencia de goles
+
+    Returns:
+        tuple: ((ids rojo, ids negro, goles rojo - goles negro), None) o (None, motivo de descarte)
+    """
+    resultado = partido.get('resultado') or {}
+    if not isinstance(resultado.get('rojo'), int) or not isinstance(resultado.get('negro'), int):
+        return None, 'sin_resultado'
+    rojo, negro = equipos_partido(partido)
+    if len(rojo) != len(negro) or len(rojo) < 2:
+        return None, 'equipos_desparejos'
+    encontrados_rojo, faltan_rojo = buscar_jugadores(jugadores, rojo)
+    encontrados_negro, faltan_negro = buscar_jugadores(jugadores, negro)
+    ids_rojo = [j.id for j in encontrados_rojo]
+    ids_negro = [j.id for j in encontrados_negro]
+    if faltan_rojo or faltan_negro or len(set(ids_rojo + ids_negro)) != 2 * len(rojo):
+        return None, 'jugadores_desconocidos'
+    return (ids_rojo, ids_negro, resultado['rojo'] - resultado['negro']), None
+
+# ===== WORKERS =====
+
+# Estado de cada worker (se carga una vez en _iniciar_worker)
+_plantel = None
+_cache = None
+_estrategia = None
+_opciones = None
+
+def _iniciar_worker(archivo_jugadores, estrategia, opciones):
+    """Carga el plantel y prepara la caché de evaluaciones del worker"""
+    global _plantel, _cache, _estrategia, _opciones
+    _plantel = Plantel.desde_archivo(archivo_jugadores)
+    _cache = CacheEvaluaciones()
+    _cache.preparar(_plantel.jugadores)
+    _estrategia = estrategia
+    _opciones = opciones
+
+def _reproducir(tarea):
+    """Mide los equipos reales y re-sortea un partido
+
+    Returns:
+        tuple: (diferencia por posición real con signo, diferencia general real con signo,
+                diferencia por posición del sorteo, diferencia general del sorteo, ms);
+               NaN donde no hay valor
+    """
+    semilla, ids_rojo, ids_negro = tarea
+    rojo = [_plantel.jugadores[i] for i in ids_rojo]
+    negro = [_plantel.jugadores[i] for i in ids_negro]
+    permitir = _opciones.get('permitir_fuera_posicion', False)
+
+    real_posiciones = diferencia_posiciones(rojo, negro, permitir, con_signo=True)
+    real_general = sum(j.puntaje for j in rojo) / len(rojo) - sum(j.puntaje for j in negro) / len(negro)
+    resultado = sortear(_estrategia, rojo + negro, semilla=semilla, cache=_cache, **_opciones)
+    return (_numero(real_posiciones), real_general, _numero(resultado.diferencia_posiciones),
+            _numero(resultado.diferencia_general), resultado.ms)
+
+def _numero(valor):
+    return float('nan') if valor is None else float(valor)
+
+# ===== ESTADÍSTICAS =====
+
+def _tramos_reporte(bordes, cuentas, sumas_prediccion, sumas_goles):
+    """Tabla de calibración por tramos de |diferencia| (se omiten los tramos vacíos)"""
+    return [{'desde': round(float(bordes[k]), 3), 'hasta': round(float(bordes[k + 1]), 3), 'partidos': int(cuentas[k]),
+             'diferencia_media': round(float(sumas_prediccion[k]) / int(cuentas[k]), 3),
+             'goles_medios': round(float(sumas_goles[k]) / int(cuentas[k]), 3)}
+            for k in range(len(cuentas)) if cuentas[k]]
+
+def calibrar(prediccion, goles, tramos=TRAMOS_POR_DEFECTO):
+    """Qué tan bien una diferencia predicha (con signo) anticipa la diferencia de goles
+
+    Args:
+        prediccion: Diferencias predichas rojo - negro (NaN = sin predicción, se ignora)
+        goles: Diferencias de goles rojo - negro, en el mismo orden
+        tramos: Cantidad de tramos (cuantiles de |diferencia|) de la tabla de calibración
+
+    Returns:
+        dict: partidos, correlacion, pendiente (goles por punto), intercepto, acierto_signo
+              (entre los partidos sin empate ni predicción 0), error_medio (goles, de la
+              recta) y tramos [{desde, hasta, partidos, diferencia_media, goles_medios}]
+    """
+    if NUMPY_AVAILABLE:
+        x = np.asarray(prediccion, dtype=float)
+        y = np.asarray(goles, dtype=float)
+        validos = ~np.isnan(x)
+        x, y = x[validos], y[validos]
+        n = len(x)
+        if n < 2 or x.std() == 0 or y.std() == 0:
+            return {'partidos': int(n)}
+        pendiente, intercepto = np.polyfit(x, y, 1)
+        correlacion = float(np.corrcoef(x, y)[0, 1])
+        error_medio = float(np.abs(y - (intercepto + pendiente * x)).mean())
+        con_signo = (x != 0) & (y != 0)
+        acierto = float((np.sign(x[con_signo]) == np.sign(y[con_signo])).mean()) if con_signo.any() else None
+        abs_x, abs_y = np.abs(x), np.abs(y)
+        bordes = np.quantile(abs_x, np.linspace(0, 1, tramos + 1), method='nearest')
+        grupo = np.clip(np.searchsorted(bordes, abs_x, side='right') - 1, 0, tramos - 1)
+        cuentas = np.bincount(grupo, minlength=tramos)
+        sumas_x = np.bincount(grupo, weights=abs_x, minlength=tramos)
+        sumas_y = np.bincount(grupo, weights=abs_y, minlength=tramos)
+    else:
+        pares = [(p, g) for p, g in zip(prediccion, goles) if not math.isnan(p)]
+        n = len(pares)
+        if n < 2:
+            return {'partidos': n}
+        x = [p for p, _ in pares]
+        y = [float(g) for _, g in pares]
+        media_x, media_y = sum(x) / n, sum(y) / n
+        sxx = sum((a - media_x) ** 2 for a in x)
+        syy = sum((b - media_y) ** 2 for b in y)
+        if sxx == 0 or syy == 0:
+            return {'partidos': n}
+        sxy = sum((a - media_x) * (b - media_y) for a, b in zip(x, y))
+        pendiente = sxy / sxx
+        intercepto = media_y - pendiente * media_x
+        correlacion = sxy / math.sqrt(sxx * syy)
+        error_medio = sum(abs(b - (intercepto + pendiente * a)) for a, b in zip(x, y)) / n
+        con_signo = [(a > 0) == (b > 0) for a, b in zip(x, y) if a != 0 and b != 0]
+        acierto = sum(con_signo) / len(con_signo) if con_signo else None
+        abs_x = [abs(a) for a in x]
+        ordenados = sorted(abs_x)
+        bordes = [ordenados[round(k / tramos * (n - 1))] for k in range(tramos + 1)]
+        cuentas, sumas_x, sumas_y = [0] * tramos, [0.0] * tramos, [0.0] * tramos
+        for a, b in zip(abs_x, y):
+            k = min(max(bisect.bisect_right(bordes, a) - 1, 0), tramos - 1)
+            cuentas[k] += 1
+            sumas_x[k] += a
+            sumas_y[k] += abs(b)
+
+    return {
+        'partidos': int(n),
+        'correlacion': round(correlacion, 4),
+        'pendiente': round(float(pendiente), 4),
+        'intercepto': round(float(intercepto), 4),
+        'acierto_signo': round(acierto, 4) if acierto is not None else None,
+        'error_medio': round(error_medio, 3),
+        'tramos': _tramos_reporte(bordes, cuentas, sumas_x, sumas_y)
+    }
+
+def comparar_sorteo(real, sorteo, pendiente=None):
+    """Diferencia de los equipos reales contra la del re-sorteo (valores absolutos)
+
+    Returns:
+        dict: partidos, diferencia_real y diferencia_sorteo medias, fraccion_mejor (el sorteo
+              queda más parejo), fraccion_peor y, con la pendiente de la calibración, los goles
+              de diferencia esperados con cada división
+    """
+    if NUMPY_AVAILABLE:
+        real = np.abs(np.asarray(real, dtype=float))
+        sorteo = np.asarray(sorteo, dtype=float)
+        validos = ~np.isnan(real) & ~np.isnan(sorteo)
+        real, sorteo = real[validos], sorteo[validos]
+        n = len(real)
+        if not n:
+            return {'partidos': 0}
+        medias = (float(real.mean()), float(sorteo.mean()))
+        mejor, peor = float((sorteo < real).mean()), float((sorteo > real).mean())
+    else:
+        pares = [(abs(r), s) for r, s in zip(real, sorteo) if not math.isnan(r) and not math.isnan(s)]
+        n = len(pares)
+        if not n:
+            return {'partidos': 0}
+        medias = (sum(r for r, _ in pares) / n, sum(s for _, s in pares) / n)
+        mejor = sum(s < r for r, s in pares) / n
+        peor = sum(s > r for r, s in pares) / n
+
+    reporte = {
+        'partidos': int(n),
+        'diferencia_real': round(medias[0], 3),
+        'diferencia_sorteo': round(medias[1], 3),
+        'fraccion_mejor': round(mejor, 4),
+        'fraccion_peor': round(peor, 4)
+    }
+    if pendiente is not None:
+        reporte['goles_esperados_real'] = round(abs(pendiente) * medias[0], 3)
+        reporte['goles_esperados_sorteo'] = round(abs(pendiente) * medias[1], 3)
+    return reporte
+
+# ===== REPRODUCCIÓN =====
+
+def reproducir_historial(partidos, estrategia='aleatorio', opciones=None, archivo_jugadores=ARCHIVO_JUGADORES,
+                         num_workers=1, semilla=0, tramos=TRAMOS_POR_DEFECTO, limite=None):
+    """Re-sortea los partidos del historial y calcula la calibración
+
+    Args:
+        partidos: Iterable de partidos (ver partidos_historial)
+        estrategia: Nombre registrado en estrategias_sorteo.ESTRATEGIAS
+        opciones: Opciones de la estrategia (tiempo_limite_ms, margen_error, ...)
+        num_workers: Procesos del pool (1 = en este proceso)
+        semilla: Cada partido se sortea con la semilla "semilla:id del partido"
+        limite: Máximo de partidos a reproducir (los primeros válidos)
+
+    Returns:
+        dict: Reporte con descartados, calibracion (posiciones y general) y sorteo
+    """
+    if estrategia not in ESTRATEGIAS:
+        raise ValueError(f"Estrategia desconocida '{estrategia}' (disponibles: {', '.join(ESTRATEGIAS)})")
+    opciones = dict(opciones or {})
+    inicio = time.perf_counter()
+    plantel = Plantel.desde_archivo(archivo_jugadores)
+
+    tareas, goles = [], []
+    leidos = 0
+    descartados = {}
+    for partido in partidos:
+        if limite is not None and len(tareas) >= limite:
+            break
+        leidos += 1
+        reconstruido, motivo = reconstruir_partido(partido, plantel.jugadores)
+        if reconstruido is None:
+            descartados[motivo] = descartados.get(motivo, 0) + 1
+            continue
+        ids_rojo, ids_negro, diferencia_goles = reconstruido
+        tareas.append((f"{semilla}:{partido.get('id', leidos)}", ids_rojo, ids_negro))
+        goles.append(diferencia_goles)
+
+    if num_workers > 1 and len(tareas) > 1:
+        tamano_bloque = max(1, len(tareas) // (num_workers * 4))
+        with ProcessPoolExecutor(max_workers=num_workers, initializer=_iniciar_worker,
+                                 initargs=(archivo_jugadores, estrategia, opciones)) as executor:
+            filas = list(executor.map(_reproducir, tareas, chunksize=tamano_bloque))
+    else:
+        _iniciar_worker(archivo_jugadores, estrategia, opciones)
+        filas = [_reproducir(tarea) for tarea in tareas]
+
+    columnas = list(zip(*filas)) if filas else [()] * 5
+    real_posiciones, real_general, sorteo_posiciones, sorteo_general, ms = columnas
+    calibracion = {'posiciones': calibrar(real_posiciones, goles, tramos),
+                   'general': calibrar(real_general, goles, tramos)}
+    return {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'estrategia': estrategia,
+        'opciones': opciones,
+        'semilla': semilla,
+        'workers': num_workers,
+        'numpy': NUMPY_AVAILABLE,
+        'partidos_leidos': leidos,
+        'partidos_reproducidos': len(tareas),
+        'descartados': descartados,
+        'segundos': round(time.perf_counter() - inicio, 2),
+        'ms_sorteo_medio': round(sum(ms) / len(ms), 1) if ms else None,
+        'calibracion': calibracion,
+        'sorteo': {
+            'posiciones': comparar_sorteo(real_posiciones, sorteo_posiciones,
+                                          calibracion['posiciones'].get('pendiente')),
+            'general': comparar_sorteo(real_general, sorteo_general, calibracion['general'].get('pendiente'))
+        }
+    }
+
+def mostrar_reporte(reporte):
+    """Resumen legible del reporte"""
+    descartados = ', '.join(f"{motivo} {cantidad}" for motivo, cantidad in reporte['descartados'].items()) or 'ninguno'
+    print(f"📚 {reporte['partidos_reproducidos']} de {reporte['partidos_leidos']} partidos re-sorteados con "
+          f"'{reporte['estrategia']}' en {reporte['segundos']:.1f} s ({reporte['workers']} workers; "
+          f"descartados: {descartados})")
+    for medida in ('posiciones', 'general'):
+        c = reporte['calibracion'][medida]
+        s = reporte['sorteo'][medida]
+        if 'correlacion' not in c:
+            print(f"   {medida}: datos insuficientes para calibrar ({c['partidos']} partidos)")
+            continue
+        acierto = f"{c['acierto_signo']:.0%}" if c['acierto_signo'] is not None else '-'
+        print(f"   {medida}: r = {c['correlacion']:+.2f}, goles = {c['intercepto']:+.2f} "
+              f"{c['pendiente']:+.2f}·diferencia, signo acertado {acierto}, error medio {c['error_medio']:.1f} goles")
+        for tramo in c['tramos']:
+            print(f"      |dif| {tramo['desde']:.2f}-{tramo['hasta']:.2f}: {tramo['partidos']:>4} partidos, "
+                  f"|goles| medio {tramo['goles_medios']:.1f}")
+        if s['partidos']:
+            print(f"      re-sorteo: diferencia {s['diferencia_real']:.2f} → {s['diferencia_sorteo']:.2f} "
+                  f"(más parejo en {s['fraccion_mejor']:.0%}), goles esperados "
+                  f"{s['goles_esperados_real']:.1f} → {s['goles_esperados_sorteo']:.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Re-sortea el historial y calibra las diferencias contra los goles')
+    parser.add_argument('--fuente', choices=('json', 'db'), default='json')
+    parser.add_argument('--archivo', default=ARCHIVO_HISTORIAL, help='Historial JSON (con --fuente json)')
+    parser.add_argument('--jugadores', default=ARCHIVO_JUGADORES, help='Plantel')
+    parser.add_argument('--estrategia', default='aleatorio', choices=list(ESTRATEGIAS))
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--intentos', type=int, default=1000)
+    parser.add_argument('--margen-error', type=float, default=0.3)
+    parser.add_argument('--tiempo-limite-ms', type=int, default=None)
+    parser.add_argument('--permitir-fuera-posicion', action='store_true')
+    parser.add_argument('--tramos', type=int, default=TRAMOS_POR_DEFECTO)
+    parser.add_argument('--limite', type=int, help='Máximo de partidos a reproducir')
+    parser.add_argument('--salida', default=ARCHIVO_REPORTE)
+    args = parser.parse_args()
+
+    opciones = {'num_intentos': args.intentos, 'margen_error': args.margen_error,
+                'permitir_fuera_posicion': args.permitir_fuera_posicion}
+    if args.tiempo_limite_ms is not None:
+        opciones['tiempo_limite_ms'] = args.tiempo_limite_ms
+    reporte = reproducir_historial(partidos_historial(args.fuente, args.archivo), args.estrategia, opciones,
+                                   args.jugadores, args.workers, args.semilla, max(args.tramos, 1), args.limite)
+    mostrar_reporte(reporte)
+    try:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(reporte, f, ensure_ascii=False, indent=2)
+        print(f"💾 Reporte guardado en {args.salida}")
+    except Exception as e:
+        print(f"❌ Error guardando {args.salida}: {e}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Matriz de compañeros de equipo (coocurrencia) para no repetir siempre las mismas duplas
+
+Para cada par de jugadores guarda cuántas veces jugaron en el mismo equipo, con
+decaimiento por recencia: cada partido nuevo multiplica todo lo anterior por
+`decaimiento` y suma 1 a cada par que compartió equipo. Así un par que jugó
+junto el último partido pesa 1 y uno que jugó junto hace 5 partidos pesa 0.8⁵.
+
+La matriz se guarda en coocurrencia.json y se actualiza de a un partido al
+guardar un resultado (registrar_resultado). Solo se reconstruye desde el
+historial completo si el historial cambió por otro lado (un partido editado,
+borrado o agregado fuera de orden); eso se detecta con una huella por partido.
+
+Para el sorteo, compilar_penalizacion deja una lista de (máscara del par, peso)
+con los ids de los confirmados, y la penalización de una división es la suma
+de pesos de los pares que quedan enteros en el mismo equipo.
+"""
+
+import json
+import hashlib
+
+ARCHIVO_COOCURRENCIA = 'coocurrencia.json'
+DECAIMIENTO_POR_DEFECTO = 0.8
+
+def equipos_partido(partido):
+    """(rojo, negro) de un partido del historial, en cualquiera de sus dos formatos"""
+    equipos = partido.get('equipos') or {}
+    rojo = partido.get('equipo_rojo') or equipos.get('rojo') or []
+    negro = partido.get('equipo_negro') or equipos.get('negro') or []
+    return rojo, negro
+
+def _clave_orden(partido):
+    """Orden cronológico de los partidos (como en seleccion_suplentes.cargar_historial)"""
+    return (partido.get('fecha', ''), partido.get('id', 0))
+
+def _huella(partido):
+    """Huella de lo que importa de un partido para la matriz (fecha y equipos)"""
+    rojo, negro = equipos_partido(partido)
+    contenido = json.dumps([partido.get('fecha', ''), sorted(rojo), sorted(negro)], ensure_ascii=False)
+    return hashlib.sha1(contenido.encode('utf-8')).hexdigest()[:10]
+
+class MatrizCoocurrencia:
+    """Pesos de coocurrencia por par de jugadores (nombres en minúsculas)"""
+
+    def __init__(self, decaimiento=DECAIMIENTO_POR_DEFECTO):
+        self.decaimiento = decaimiento
+        self.pesos = {}      # {nombre: {nombre: peso}}, simétrica
+        self.registrados = {}  # {id de partido: huella}
+        self.ultimo = None   # Clave de orden del último partido registrado
+
+    def peso(self, nombre1, nombre2):
+        """Peso acumulado de haber jugado juntos"""
+        return self.pesos.get(nombre1.lower(), {}).get(nombre2.lower(), 0.0)
+
+    def registrar_partido(self, partido):
+        """Suma un partido al final de la matriz (debe ser posterior a los ya registrados)"""
+        for fila in self.pesos.values():
+            for nombre in fila:
+                fila[nombre] *= self.decaimiento
+        for equipo in equipos_partido(partido):
+            nombres = [nombre.strip().lower() for nombre in equipo]
+            for a in nombres:
+                fila = self.pesos.setdefault(a, {})
+                for b in nombres:
+                    if a != b:
+                        fila[b] = fila.get(b, 0.0) + 1.0
+        self.registrados[str(partido.get('id'))] = _huella(partido)
+        self.ultimo = _clave_orden(partido)
+
+    @classmethod
+    def desde_historial(cls, historial, decaimiento=DECAIMIENTO_POR_DEFECTO):
+        """Construye la matriz recorriendo el historial del más antiguo al más reciente"""
+        matriz = cls(decaimiento)
+        for partido in sorted(historial, key=_clave_orden):
+            matriz.registrar_partido(partido)
+        return matriz
+
+    def al_dia_con(self, historial):
+        """Partidos del historial que faltan registrar, o None si hay que reconstruir
+
+        Hay que reconstruir si un partido registrado se borró o cambió, o si un
+        partido nuevo es anterior al último registrado (el decaimiento ya no cuadra).
+        """
+        actuales = {str(p.get('id')): p for p in historial}
+        for id_partido, huella in self.registrados.items():
+            if id_partido not in actuales or _huella(actuales[id_partido]) != huella:
+                return None
+        nuevos = sorted((p for i, p in actuales.items() if i not in self.registrados), key=_clave_orden)
+        if nuevos and self.ultimo is not None and _clave_orden(nuevos[0]) < tuple(self.ultimo):
+            return None
+        return nuevos
+
+    def guardar(self, archivo=ARCHIVO_COOCURRENCIA):
+        """Guarda la matriz en un archivo JSON"""
+        try:
+            with open(archivo, 'w', encoding='utf-8') as f:
+                json.dump({'decaimiento': self.decaimiento, 'ultimo': self.ultimo,
+                           'registrados': self.registrados, 'pesos': self.pesos}, f, ensure_ascii=False)
+            return True
+        except Exception as e:
+            print(f"⚠️  Error guardando {archivo}: {e}")
+            return False
+
+    @classmethod
+    def cargar(cls, archivo=ARCHIVO_COOCURRENCIA):
+        """Matriz guardada en archivo, o None si no existe o no se puede leer"""
+        try:
+            with open(archivo, 'r', encoding='utf-8') as f:
+                datos = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"⚠️  Error leyendo {archivo}: {e}")
+            return None
+        matriz = cls(datos.get('decaimiento', DECAIMIENTO_POR_DEFECTO))
+        matriz.pesos = datos.get('pesos', {})
+        matriz.registrados = datos.get('registrados', {})
+        matriz.ultimo = datos.get('ultimo')
+        return matriz
+
+def obtener_coocurrencia(historial=None, archivo=ARCHIVO_COOCURRENCIA, decaimiento=DECAIMIENTO_POR_DEFECTO):
+    """Matriz al día con el historial: la guardada, completada o reconstruida si hace falta
+
+    Args:
+        historial: Partidos (por defecto historial_partidos.json); el servidor puede pasar
+                   los de la base de datos
+        archivo: Dónde se guarda la matriz entre sorteos
+        decaimiento: Peso de cada partido respecto del siguiente más nuevo
+    """
+    if historial is None:
+        from seleccion_suplentes import cargar_historial
+        historial = cargar_historial()
+    matriz = MatrizCoocurrencia.cargar(archivo)
+    nuevos = None
+    if matriz is not None and matriz.decaimiento == decaimiento:
+        nuevos = matriz.al_dia_con(historial)
+    if nuevos is None:
+        matriz = MatrizCoocurrencia.desde_historial(historial, decaimiento)
+        matriz.guardar(archivo)
+    elif nuevos:
+        for partido in nuevos:
+            matriz.registrar_partido(partido)
+        matriz.guardar(archivo)
+    return matriz
+
+def registrar_resultado(partido, archivo=ARCHIVO_COOCURRENCIA):
+    """Actualiza coocurrencia.json con un partido recién guardado (sin releer el historial)
+
+    Si el partido no es el más reciente, o es uno ya registrado que se editó, no se
+    toca la matriz: la próxima obtener_coocurrencia detecta el cambio y la reconstruye.
+    """
+    matriz = MatrizCoocurrencia.cargar(archivo)
+    if matriz is None:
+        return False
+    if str(partido.get('id')) in matriz.registrados:
+        return False
+    if matriz.ultimo is not None and _clave_orden(partido) < tuple(matriz.ultimo):
+        return False
+    matriz.registrar_partido(partido)
+    return matriz.guardar(archivo)
+
+class PenalizacionRepeticion:
+    """Penalización por duplas repetidas para un conjunto fijo de jugadores
+
+    Attributes:
+        pares: [(máscara con los dos ids, peso), ...] solo los pares con peso > 0
+        peso: Puntos de diferencia por unidad de coocurrencia
+    """
+
+    def __init__(self, pares, todos, peso):
+        self.pares = pares
+        self.todos = todos
+        self.peso = peso
+
+    def penalizacion(self, mascara1):
+        """Penalización de la división cuyo equipo 1 tiene esa máscara de ids"""
+        mascara2 = self.todos & ~mascara1
+        total = 0.0
+        for par, peso in self.pares:
+            if mascara1 & par == par or mascara2 & par == par:
+                total += peso
+        return self.peso * total
+
+    def __bool__(self):
+        return bool(self.pares) and self.peso > 0
+
+def compilar_penalizacion(matriz, jugadores, peso):
+    """Prepara la penalización para los jugadores de un sorteo (ver PenalizacionRepeticion)"""
+    pares = []
+    todos = 0
+    for i, a in enumerate(jugadores):
+        todos |= 1 << a.id
+        for b in jugadores[i + 1:]:
+            valor = matriz.peso(a.nombre, b.nombre)
+            if valor > 0:
+                pares.append(((1 << a.id) | (1 << b.id), valor))
+    return PenalizacionRepeticion(pares, todos, peso)
@@ -159,13 +159,20 @@ class DatabaseManager:
             return self._get_historial_json()
     
     def save_partido(self, partido):
-        """Guarda un partido en la base de datos"""
+        """Guarda un partido en la base de datos (y actualiza coocurrencia.py y los ratings de ratings_elo.py)"""
         if self.use_postgres:
-            return self._save_partido_postgres(partido)
+            guardado = self._save_partido_postgres(partido)
         elif os.path.exists(self.sqlite_db):
-            return self._save_partido_sqlite(partido)
+            guardado = self._save_partido_sqlite(partido)
         else:
-            return self._save_partido_json(partido)
+            guardado = self._save_partido_json(partido)
+        if guardado:
+            from coocurrencia import registrar_resultado as registrar_coocurrencia
+            registrar_coocurrencia(partido)
+            if partido.get('resultado'):
+                from ratings_elo import registrar_resultado
+                registrar_resultado(partido)
+        return guardado
     
     def update_partido(self, partido_id, partido):
         """Actualiza un partido existente"""
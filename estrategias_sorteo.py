@@ -0,0 +1,474 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Biblioteca de estrategias de sorteo con un registro por nombre
+
+Reúne en un solo lugar lo que sorteo_posiciones_especificas.py, sorteo_rapido.py,
+sorteo_partido.py y sorteo_automatico.py hacían cada uno por su cuenta:
+
+    carga de confirmados: jugadores_confirmados.txt (sección después de '---'),
+                          confirmaciones_automaticas.json (hoy o la fecha más
+                          reciente) o confirmados.txt (un nombre por línea), en ese
+                          orden; los nombres se comparan sin mayúsculas, tildes
+                          ni espacios
+    estrategias:          funciones (jugadores, **opciones) -> (equipo1, equipo2, info)
+                          registradas con @registrar_estrategia
+    resultado común:      ResultadoSorteo, con el tiempo y dos medidas iguales para
+                          todas las estrategias (diferencia de promedio general y
+                          diferencia de puntaje por posición según el motor)
+
+Estrategias registradas:
+    simple        arquero al azar por equipo y el resto al azar (sorteo_rapido.py)
+    balanceado    arqueros y delanteros separados y la mejor de N mezclas por
+                  promedio general (sorteo_partido.py / sorteo_automatico.py)
+    aleatorio, dos_etapas, exhaustivo, ramificacion, local
+                  los modos del motor de posiciones específicas (MODOS_SORTEO)
+
+Uso:
+    python estrategias_sorteo.py                              # Compara todas con los confirmados
+    python estrategias_sorteo.py --estrategias simple exhaustivo --semilla 3
+"""
+
+import io
+import json
+import time
+import random
+import inspect
+import argparse
+import unicodedata
+import contextlib
+from datetime import datetime
+
+from plantel import Plantel, asegurar_jugadores
+from sorteo_posiciones_especificas import (MODOS_SORTEO, _preparar_sorteo, evaluar_division,
+                                           generar_formaciones_posibles, sorteo_con_posiciones_especificas)
+
+FUENTES_CONFIRMADOS = ('jugadores_confirmados.txt', 'confirmaciones_automaticas.json', 'confirmados.txt')
+
+# Categorías de los scripts viejos (jugadores.json) para cada posición específica
+CATEGORIA_POSICION = {
+    'GK': 'Arquero',
+    'LCB': 'Defensa', 'CB': 'Defensa', 'RCB': 'Defensa',
+    'LM': 'Mediocampo', 'CM': 'Mediocampo', 'RM': 'Mediocampo',
+    'CF': 'Delantero'
+}
+
+# ===== CARGA DE CONFIRMADOS =====
+
+def normalizar_nombre(nombre):
+    """Nombre sin mayúsculas, espacios ni tildes ('Iván P' -> 'ivanp')"""
+    nombre = nombre.lower().replace(' ', '')
+    return ''.join(c for c in unicodedata.normalize('NFD', nombre) if unicodedata.category(c) != 'Mn')
+
+def leer_nombres_confirmados(archivo, fecha=None):
+    """Nombres confirmados de una de las FUENTES_CONFIRMADOS ([] si no existe o no tiene)
+
+    Con `fecha` (YYYY-MM-DD) se leen las confirmaciones de esa fecha del JSON en vez
+    de las de hoy o la más reciente.
+    """
+    try:
+        if archivo.endswith('.json'):
+            with open(archivo, 'r', encoding='utf-8') as f:
+                confirmaciones = json.load(f)
+            if fecha is not None:
+                return confirmaciones.get(fecha, {}).get('jugadores', [])
+            fecha_hoy = datetime.now().strftime('%Y-%m-%d')
+            if fecha_hoy in confirmaciones and 'jugadores' in confirmaciones[fecha_hoy]:
+                return confirmaciones[fecha_hoy]['jugadores']
+            fechas_disponibles = sorted(confirmaciones.keys(), reverse=True)
+            if not fechas_disponibles:
+                return []
+            print(f"⚠️  Usando confirmaciones de {fechas_disponibles[0]} (no hay para hoy)")
+            return confirmaciones[fechas_disponibles[0]].get('jugadores', [])
+
+        with open(archivo, 'r', encoding='utf-8') as f:
+            lineas = [linea.strip() for linea in f]
+        # jugadores_confirmados.txt trae FECHA/HORA/CANCHA antes de '---'
+        if '---' in lineas:
+            lineas = lineas[lineas.index('---') + 1:]
+        return [linea for linea in lineas if linea]
+    except FileNotFoundError:
+        return []
+    except Exception as e:
+        print(f"⚠️ Error leyendo {archivo}: {e}")
+        return []
+
+def buscar_jugadores(jugadores, nombres):
+    """Busca nombres en el plantel sin distinguir mayúsculas, tildes ni espacios
+
+    Returns:
+        tuple: (encontrados, no_encontrados); un nombre repetido se toma una sola vez
+    """
+    por_nombre = {}
+    for jugador in jugadores:
+        por_nombre.setdefault(normalizar_nombre(jugador['nombre']), jugador)
+    encontrados, no_encontrados = [], []
+    vistos = set()
+    for nombre in nombres:
+        jugador = por_nombre.get(normalizar_nombre(nombre))
+        if jugador is None:
+            no_encontrados.append(nombre)
+        elif id(jugador) not in vistos:
+            vistos.add(id(jugador))
+            encontrados.append(jugador)
+    return encontrados, no_encontrados
+
+def jugadores_confirmados(todos_jugadores, fuentes=FUENTES_CONFIRMADOS):
+    """Confirmados de la primera fuente que tenga alguno que esté en el plantel"""
+    for archivo in fuentes:
+        nombres = leer_nombres_confirmados(archivo)
+        if not nombres:
+            continue
+        print(f"📄 Leyendo jugadores desde {archivo}")
+        confirmados, no_encontrados = buscar_jugadores(todos_jugadores, nombres)
+        for nombre in no_encontrados:
+            print(f"⚠️  Jugador '{nombre}' no encontrado en la base de datos")
+        if confirmados:
+            print(f"✅ {len(confirmados)} jugadores confirmados cargados desde {archivo}")
+            return confirmados
+    print(f"❌ Error: No hay confirmaciones disponibles ({', '.join(fuentes)})")
+    return []
+
+def cargar_confirmados(archivo='jugadores_posiciones_especificas.json', fuentes=FUENTES_CONFIRMADOS):
+    """Plantel y confirmados como objetos Jugador: (plantel, confirmados)"""
+    plantel = Plantel.desde_archivo(archivo)
+    return plantel, jugadores_confirmados(plantel.jugadores, fuentes) if plantel.jugadores else []
+
+# ===== REGISTRO DE ESTRATEGIAS =====
+
+ESTRATEGIAS = {}
+
+def registrar_estrategia(nombre):
+    """Decorador: registra una función (jugadores, **opciones) -> (equipo1, equipo2, info)
+
+    La primera línea del docstring es la descripción que muestran la CLI y la API.
+    Las estrategias deben aceptar **opciones e ignorar las que no usan, así se
+    pueden comparar todas con las mismas opciones.
+    """
+    def registrar(funcion):
+        ESTRATEGIAS[nombre] = funcion
+        return funcion
+    return registrar
+
+def obtener_estrategia(nombre):
+    """Función de la estrategia registrada con ese nombre (ValueError si no existe)"""
+    try:
+        return ESTRATEGIAS[nombre]
+    except KeyError:
+        raise ValueError(f"Estrategia de sorteo desconocida '{nombre}' "
+                         f"(disponibles: {', '.join(ESTRATEGIAS)})") from None
+
+def descripcion_estrategia(nombre):
+    """Primera línea del docstring de la estrategia"""
+    return (obtener_estrategia(nombre).__doc__ or '').strip().split('\n')[0]
+
+class ResultadoSorteo:
+    """Resultado de una estrategia, comparable con el de cualquier otra
+
+    Attributes:
+        estrategia: Nombre registrado
+        equipo1, equipo2: Listas de Jugador (None si la estrategia no encontró división)
+        info: El info propio de la estrategia
+        ms: Tiempo de la estrategia (sin contar las medidas comunes)
+        diferencia_general: |promedio general 1 - promedio general 2|
+        diferencia_posiciones: Diferencia de puntaje por posición de la misma división
+                               con el arquero y la formación que elige el motor (None
+                               si la plantilla no tiene formaciones para ese tamaño)
+    """
+
+    def __init__(self, estrategia, equipo1, equipo2, info, ms, permitir_fuera_posicion=False):
+        self.estrategia = estrategia
+        self.equipo1 = equipo1
+        self.equipo2 = equipo2
+        self.info = info
+        self.ms = ms
+        self.diferencia_general = None
+        self.diferencia_posiciones = None
+        if self.valido:
+            self.diferencia_general = abs(sum(j.puntaje for j in equipo1) / len(equipo1)
+                                          - sum(j.puntaje for j in equipo2) / len(equipo2))
+            self.diferencia_posiciones = diferencia_posiciones(equipo1, equipo2, permitir_fuera_posicion)
+
+    @property
+    def valido(self):
+        return self.equipo1 is not None and self.equipo2 is not None and self.info is not None
+
+    @property
+    def diferencia(self):
+        """La diferencia que optimiza la propia estrategia (info['diferencia'])"""
+        return self.info['diferencia'] if self.valido else None
+
+    def a_dict(self):
+        """Resumen serializable (nombres en vez de Jugador, sin alternativas)"""
+        resultado = {'estrategia': self.estrategia, 'valido': self.valido, 'ms': round(self.ms, 1)}
+        if not self.valido:
+            return resultado
+        info = {clave: valor for clave, valor in self.info.items() if clave != 'alternativas'}
+        return dict(resultado,
+                    equipo1=[j.nombre for j in self.equipo1],
+                    equipo2=[j.nombre for j in self.equipo2],
+                    diferencia=round(self.diferencia, 3),
+                    diferencia_general=round(self.diferencia_general, 3),
+                    diferencia_posiciones=(round(self.diferencia_posiciones, 3)
+                                           if self.diferencia_posiciones is not None else None),
+                    info=info)
+
+def diferencia_posiciones(equipo1, equipo2, permitir_fuera_posicion=False, con_signo=False):
+    """Diferencia de puntaje por posición de una división según evaluar_division del motor
+
+    Con con_signo=True devuelve puntaje del equipo 1 - puntaje del equipo 2.
+    """
+    if not generar_formaciones_posibles(len(equipo1) - 1) or len(equipo1) != len(equipo2):
+        return None
+    mejor, segundo, sorted_gk = _preparar_sorteo(equipo1 + equipo2, permitir_fuera_posicion, mostrar=False)
+    _, _, info = evaluar_division(equipo1, equipo2, mejor, segundo, sorted_gk, permitir_fuera_posicion)
+    if info is None:
+        return None
+    return info['puntaje1'] - info['puntaje2'] if con_signo else info['diferencia']
+
+def sortear(nombre, jugadores, semilla=None, silencioso=True, **opciones):
+    """Corre una estrategia por nombre y devuelve su ResultadoSorteo
+
+    Args:
+        nombre: Estrategia registrada (ver ESTRATEGIAS)
+        jugadores: Jugador o dicts del JSON
+        semilla: Si se indica, se siembra random antes de correr (mismo valor = mismo resultado)
+        silencioso: Si True, no se muestran los mensajes de la estrategia
+        **opciones: permitir_fuera_posicion, num_intentos, margen_error, tiempo_limite_ms y
+                    las demás opciones del motor (cada estrategia usa las que conoce)
+    """
+    estrategia = obtener_estrategia(nombre)
+    jugadores = asegurar_jugadores(list(jugadores))
+    if semilla is not None:
+        random.seed(semilla)
+    salida = contextlib.redirect_stdout(io.StringIO()) if silencioso else contextlib.nullcontext()
+    inicio = time.perf_counter()
+    with salida:
+        equipo1, equipo2, info = estrategia(jugadores, semilla=semilla, **opciones)
+    ms = (time.perf_counter() - inicio) * 1000
+    return ResultadoSorteo(nombre, equipo1, equipo2, info, ms, opciones.get('permitir_fuera_posicion', False))
+
+def comparar_estrategias(jugadores, nombres=None, semilla=0, **opciones):
+    """Corre varias estrategias (por defecto todas) sobre los mismos jugadores y opciones
+
+    Returns:
+        list: ResultadoSorteo en el orden de `nombres`
+    """
+    return [sortear(nombre, jugadores, semilla=semilla, **opciones) for nombre in (nombres or list(ESTRATEGIAS))]
+
+# ===== ESTRATEGIAS =====
+
+@registrar_estrategia('simple')
+def sorteo_simple(jugadores, **opciones):
+    """Arquero al azar para cada equipo y el resto repartido al azar"""
+    if len(jugadores) % 2 != 0:
+        print(f"❌ Error: Número impar de jugadores confirmados ({len(jugadores)})")
+        return None, None, None
+
+    # Mismo chequeo de tamaño que el motor: tiene que haber formaciones para ese tamaño de equipo
+    if not generar_formaciones_posibles(len(jugadores) // 2 - 1):
+        print(f"❌ Error: No hay formaciones para equipos de {len(jugadores) // 2} jugadores "
+              f"(agregarlas en formaciones.json)")
+        return None, None, None
+
+    # Separar arqueros del resto
+    arqueros = [j for j in jugadores if j.puede_jugar('GK')]
+    otros = [j for j in jugadores if not j.puede_jugar('GK')]
+
+    if len(arqueros) < 2:
+        print(f"❌ Error: Se necesitan al menos 2 arqueros (tienes {len(arqueros)})")
+        return None, None, None
+
+    print(f"✅ Arqueros disponibles: {[a.nombre for a in arqueros]}")
+
+    # Asignar un arquero a cada equipo
+    random.shuffle(arqueros)
+    arquero1, arquero2 = arqueros[0], arqueros[1]
+
+    # Distribuir el resto de jugadores
+    otros_disponibles = otros + arqueros[2:]  # Arqueros extra van al pool general
+    random.shuffle(otros_disponibles)
+
+    jugadores_por_equipo = len(jugadores) // 2
+    equipo1 = [arquero1] + otros_disponibles[:jugadores_por_equipo-1]
+    equipo2 = [arquero2] + otros_disponibles[jugadores_por_equipo-1:]
+
+    # Calcular puntajes
+    puntaje1 = sum(j.puntaje for j in equipo1)
+    puntaje2 = sum(j.puntaje for j in equipo2)
+
+    info = {
+        'puntaje1': puntaje1,
+        'puntaje2': puntaje2,
+        'diferencia': abs(puntaje1 - puntaje2),
+        'promedio1': puntaje1 / len(equipo1),
+        'promedio2': puntaje2 / len(equipo2)
+    }
+
+    return equipo1, equipo2, info
+
+@registrar_estrategia('balanceado')
+def sorteo_balanceado(jugadores, num_intentos=1000, **opciones):
+    """Arqueros y delanteros separados y la mejor de N mezclas por promedio general
+
+    Si hay menos de 2 arqueros van al arco los de menor puntaje; si hay menos de 2
+    delanteros se eligen entre todos los que no son arqueros. info['posiciones1/2']
+    trae las categorías de asigna_posiciones_dinamico.
+    """
+    if len(jugadores) % 2 != 0 or len(jugadores) < 4:
+        print(f"❌ Error: Se necesita un número par de al menos 4 jugadores (tienes {len(jugadores)})")
+        return None, None, None
+
+    arqueros = [j for j in jugadores if j.puede_jugar('GK')]
+    if len(arqueros) >= 2:
+        arquero1, arquero2 = random.sample(arqueros, 2)
+    elif len(arqueros) == 1:
+        arquero1 = arqueros[0]
+        arquero2 = min((j for j in jugadores if j is not arquero1), key=lambda j: j.puntaje)
+    else:
+        arquero1, arquero2 = sorted(jugadores, key=lambda j: j.puntaje)[:2]
+
+    delanteros = [j for j in jugadores if j.puede_jugar('CF') and j is not arquero1 and j is not arquero2]
+    if len(delanteros) < 2:
+        delanteros = [j for j in jugadores if j is not arquero1 and j is not arquero2]
+    delantero1, delantero2 = random.sample(delanteros, 2)
+
+    # Completar equipos balanceando promedio
+    elegidos = {arquero1.id, arquero2.id, delantero1.id, delantero2.id}
+    resto = [j for j in jugadores if j.id not in elegidos]
+    n = len(jugadores) // 2
+    mejor = None
+    for _ in range(max(num_intentos, 1)):
+        random.shuffle(resto)
+        equipo1 = [arquero1, delantero1] + resto[:n-2]
+        equipo2 = [arquero2, delantero2] + resto[n-2:]
+        promedio1 = sum(j.puntaje for j in equipo1) / n
+        promedio2 = sum(j.puntaje for j in equipo2) / n
+        if mejor is None or abs(promedio1 - promedio2) < mejor[4]:
+            mejor = (equipo1, equipo2, promedio1, promedio2, abs(promedio1 - promedio2))
+
+    equipo1, equipo2, promedio1, promedio2, diferencia = mejor
+    info = {
+        'promedio1': promedio1,
+        'promedio2': promedio2,
+        'diferencia': diferencia,
+        'posiciones1': asigna_posiciones_dinamico(equipo1),
+        'posiciones2': asigna_posiciones_dinamico(equipo2)
+    }
+    return equipo1, equipo2, info
+
+def _estrategia_motor(modo):
+    """Estrategia que corre sorteo_con_posiciones_especificas en ese modo"""
+    parametros = set(inspect.signature(sorteo_con_posiciones_especificas).parameters)
+
+    def estrategia(jugadores, num_intentos=10000, margen_error=0.3, **opciones):
+        opciones = {clave: valor for clave, valor in opciones.items() if clave in parametros}
+        return sorteo_con_posiciones_especificas(jugadores, num_intentos, len(jugadores) // 2, margen_error,
+                                                 modo=modo, **opciones)
+    estrategia.__doc__ = f"Motor de posiciones específicas en modo '{modo}'"
+    return estrategia
+
+for _modo in MODOS_SORTEO:
+    registrar_estrategia(_modo)(_estrategia_motor(_modo))
+
+# ===== POSICIONES POR CATEGORÍA =====
+
+def _categorias(jugador):
+    """Categorías (Arquero, Defensa, ...) de las posiciones del jugador, en su orden y sin repetir"""
+    categorias = []
+    for posicion in jugador['posicion'].split(','):
+        posicion = posicion.strip()
+        categoria = CATEGORIA_POSICION.get(posicion, posicion.capitalize())
+        if categoria not in categorias:
+            categorias.append(categoria)
+    return categorias
+
+def asigna_posiciones_dinamico(equipo):
+    """Asigna Arquero, Defensa, Mediocampo o Delantero a cada jugador de un equipo
+
+    1. Un arquero fijo por equipo (el primero que pueda atajar, si no el primero del equipo).
+    2. El resto según sus preferencias, hasta 3 por función.
+    3. Si una función quedó vacía se cubre con un jugador sin función (o uno de una
+       función repetida); los que siguen sin función completan hasta 3 por función
+       y, si aún sobran, se reparten en orden aunque se pase el límite.
+
+    Returns:
+        dict: {nombre: categoría}
+    """
+    arquero = next((j for j in equipo if 'Arquero' in _categorias(j)), equipo[0])
+    asignados = {arquero['nombre']: 'Arquero'}
+    max_por_funcion = 3
+    posiciones = ['Arquero', 'Defensa', 'Mediocampo', 'Delantero']
+    conteo = {p: 0 for p in posiciones}
+    conteo['Arquero'] = 1  # Ya se asignó el arquero fijo
+
+    # 1. Asignar hasta 3 por función según preferencias
+    for j in equipo:
+        if j is arquero:
+            continue
+        asignados[j['nombre']] = ''
+        for pref in _categorias(j):
+            # Solo el arquero fijo recibe esa función
+            if pref != 'Arquero' and pref in conteo and conteo[pref] < max_por_funcion:
+                asignados[j['nombre']] = pref
+                conteo[pref] += 1
+                break
+
+    # 2. Si alguna posición quedó sin al menos 1 jugador, reasignar para cubrir todas las posiciones
+    sin_funcion = [n for n, f in asignados.items() if f == '']
+    for pos in posiciones:
+        if conteo[pos] == 0:
+            candidato = None
+            if sin_funcion:
+                candidato = sin_funcion.pop(0)
+            else:
+                # Buscar entre los que tienen función repetida (más de 1 en la misma función)
+                for n, f in asignados.items():
+                    if f and conteo[f] > 1 and f != pos:
+                        candidato = n
+                        conteo[f] -= 1
+                        break
+            if candidato:
+                asignados[candidato] = pos
+                conteo[pos] += 1
+
+    # 3. Si aún quedan sin función, seguir llenando hasta 3 por función
+    for pos in posiciones:
+        while conteo[pos] < max_por_funcion and sin_funcion:
+            asignados[sin_funcion.pop(0)] = pos
+            conteo[pos] += 1
+
+    # 4. Si aún quedan sin función, repartirlos en orden (aunque se sobrepase el límite)
+    for idx, nombre in enumerate(sin_funcion):
+        pos = posiciones[idx % len(posiciones)]
+        asignados[nombre] = pos
+        conteo[pos] += 1
+
+    return asignados
+
+def main():
+    parser = argparse.ArgumentParser(description='Compara estrategias de sorteo con los jugadores confirmados')
+    parser.add_argument('--estrategias', nargs='+', default=list(ESTRATEGIAS), choices=list(ESTRATEGIAS))
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--tiempo-limite-ms', type=int, default=1000)
+    parser.add_argument('--margen-error', type=float, default=0.3)
+    parser.add_argument('--permitir-fuera-posicion', action='store_true')
+    args = parser.parse_args()
+
+    _, confirmados = cargar_confirmados()
+    if len(confirmados) < 2:
+        return
+    print(f"⚖️  Comparando {len(args.estrategias)} estrategias con {len(confirmados)} jugadores (semilla {args.semilla})")
+    resultados = comparar_estrategias(confirmados, args.estrategias, args.semilla,
+                                      tiempo_limite_ms=args.tiempo_limite_ms, margen_error=args.margen_error,
+                                      permitir_fuera_posicion=args.permitir_fuera_posicion)
+    print(f"   {'estrategia':<13} {'ms':>9} {'dif. general':>13} {'dif. posiciones':>16}")
+    for r in resultados:
+        if not r.valido:
+            print(f"   {r.estrategia:<13} {r.ms:>9.1f}   sin división válida")
+            continue
+        posiciones = f"{r.diferencia_posiciones:.3f}" if r.diferencia_posiciones is not None else '-'
+        print(f"   {r.estrategia:<13} {r.ms:>9.1f} {r.diferencia_general:>13.3f} {posiciones:>16}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Filtro grueso del sorteo en dos etapas
+
+Etapa 1: genera lotes grandes de divisiones al azar como una matriz booleana
+(fila = candidato, columna = jugador, True = va al equipo 1) y calcula la suma
+de puntaje general de cada equipo con una sola operación vectorizada. Solo
+sobreviven las divisiones por debajo de un umbral global de desbalance.
+
+Etapa 2 (en sorteo_posiciones_especificas.py): la optimización completa de
+posiciones corre únicamente sobre los sobrevivientes.
+
+El filtro es heurístico: el balance de puntaje general no ve el encaje por
+posiciones. Cuando ya no aparecen divisiones nuevas bajo el umbral, este se
+relaja y la búsqueda sigue; para el óptimo garantizado está el modo 'exhaustivo'.
+
+Usa NumPy si está instalado; si no, el mismo filtro se hace en Python puro.
+"""
+
+import math
+import itertools
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+def nuevos_contadores():
+    """Contadores por etapa que se informan en info['etapas']"""
+    return {
+        'lotes': 0,
+        'generados': 0,            # Etapa 1: divisiones candidatas generadas
+        'descartados_grueso': 0,   # Etapa 1: fuera de la fracción mejor balanceada
+        'duplicados': 0,           # Etapa 1: sobrevivientes que ya se habían evaluado
+        'rechazados_restricciones': 0,  # Etapa 2: no cumplen restricciones.py (sin optimizar)
+        'evaluados': 0,            # Etapa 2: divisiones con optimización completa
+        'sin_formacion': 0         # Etapa 2: descartadas por no tener formación posible
+    }
+
+def _lote_numpy(generador, puntajes, mitad, tamano_lote, base):
+    """Genera un lote como matriz booleana y devuelve (máscaras, desbalance)"""
+    n = len(puntajes)
+    orden = np.argsort(generador.random((tamano_lote, n)), axis=1)
+    lote = np.zeros((tamano_lote, n), dtype=bool)
+    np.put_along_axis(lote, orden[:, :mitad], True, axis=1)
+
+    suma1 = lote @ puntajes
+    # base = mejor - segundo - suma del resto, así equipo1 - equipo2 = 2·suma1 + base
+    desbalance = np.abs(2 * suma1 + base)
+    pesos = np.left_shift(np.int64(1), np.arange(n, dtype=np.int64))
+    return lote @ pesos, desbalance
+
+def _lote_python(rng, puntajes, mitad, tamano_lote, base):
+    """Mismo lote que _lote_numpy pero en Python puro"""
+    indices = list(range(len(puntajes)))
+    mascaras = []
+    desbalance = []
+    for _ in range(tamano_lote):
+        rng.shuffle(indices)
+        mascara = 0
+        suma1 = 0.0
+        for i in indices[:mitad]:
+            mascara |= 1 << i
+            suma1 += puntajes[i]
+        mascaras.append(mascara)
+        desbalance.append(abs(2 * suma1 + base))
+    return mascaras, desbalance
+
+def divisiones_dos_etapas(jugadores, mejor_jugador, segundo_mejor_jugador, rng,
+                          tamano_lote=2000, fraccion_sobrevivientes=0.2, contadores=None):
+    """Genera divisiones que superaron el filtro grueso, mejor balanceadas primero
+
+    El corte es un umbral global de desbalance: el cuantil fraccion_sobrevivientes
+    de los desbalances vistos en el primer lote (todos los lotes salen de la misma
+    distribución). Pasan todas las divisiones nuevas por debajo del umbral, no un
+    tope fijo por lote. Si un lote no aporta ninguna división nueva, el umbral se
+    duplica en fracción, así la búsqueda sigue con divisiones menos parejas en
+    puntaje general en lugar de cortarse. Si todas las divisiones posibles caben en
+    un lote, se enumeran directamente ordenadas por desbalance. Quien consume el generador decide cuándo
+    parar (num_intentos, margen_error o plazo).
+
+    Args:
+        jugadores: Lista de Jugador
+        mejor_jugador, segundo_mejor_jugador: Quedan fijos en equipo 1 y equipo 2
+        rng: random.Random (o el módulo random); con NumPy solo se usa para la semilla
+        tamano_lote: Candidatos por lote en la etapa 1
+        fraccion_sobrevivientes: Fracción (cuantil de desbalance) que pasa a la etapa 2
+        contadores: Dict de nuevos_contadores() que se va actualizando
+
+    Yields:
+        tuple: (equipo1_temp, equipo2_temp). Termina solo cuando ya se entregaron
+               todas las divisiones posibles.
+    """
+    if contadores is None:
+        contadores = nuevos_contadores()
+    otros_jugadores = [j for j in jugadores if j is not mejor_jugador and j is not segundo_mejor_jugador]
+    mitad = len(otros_jugadores) // 2
+    puntajes = [j.puntaje for j in otros_jugadores]
+    base = mejor_jugador.puntaje - segundo_mejor_jugador.puntaje - sum(puntajes)
+    total_divisiones = math.comb(len(otros_jugadores), mitad)
+
+    if NUMPY_AVAILABLE:
+        generador = np.random.default_rng(rng.getrandbits(63))
+        puntajes_np = np.array(puntajes, dtype=float)
+
+    if total_divisiones <= tamano_lote:
+        # El espacio entero cabe en un lote: se enumera una vez y se recorre de más a menos parejo
+        # (equivale a ir relajando el umbral, sin generar duplicados)
+        contadores['lotes'] += 1
+        contadores['generados'] += total_divisiones
+        ordenadas = sorted((abs(2 * sum(puntajes[i] for i in indices) + base), indices)
+                           for indices in itertools.combinations(range(len(otros_jugadores)), mitad))
+        for _, indices in ordenadas:
+            elegidos = set(indices)
+            yield ([mejor_jugador] + [otros_jugadores[i] for i in indices],
+                   [segundo_mejor_jugador] + [j for i, j in enumerate(otros_jugadores) if i not in elegidos])
+        return
+
+    vistos = set()
+    fraccion = fraccion_sobrevivientes
+    umbral = None
+    while len(vistos) < total_divisiones:
+        if NUMPY_AVAILABLE:
+            mascaras, desbalance = _lote_numpy(generador, puntajes_np, mitad, tamano_lote, base)
+            mascaras, desbalance = mascaras.tolist(), desbalance.tolist()
+        else:
+            mascaras, desbalance = _lote_python(rng, puntajes, mitad, tamano_lote, base)
+        if umbral is None or not fraccion < 1:
+            umbral = _cuantil(desbalance, fraccion)
+
+        contadores['lotes'] += 1
+        contadores['generados'] += tamano_lote
+
+        elegidos = sorted((d, m) for d, m in zip(desbalance, mascaras) if d <= umbral)
+        contadores['descartados_grueso'] += tamano_lote - len(elegidos)
+        nuevos = 0
+        for _, mascara in elegidos:
+            if mascara in vistos:
+                contadores['duplicados'] += 1
+                continue
+            vistos.add(mascara)
+            nuevos += 1
+            equipo1_temp = [mejor_jugador] + [j for i, j in enumerate(otros_jugadores) if mascara >> i & 1]
+            equipo2_temp = [segundo_mejor_jugador] + [j for i, j in enumerate(otros_jugadores) if not mascara >> i & 1]
+            yield equipo1_temp, equipo2_temp
+
+        if not nuevos and fraccion < 1:
+            # Lo mejor balanceado ya se evaluó: se abre el filtro a divisiones menos parejas
+            fraccion = min(1.0, fraccion * 2)
+            umbral = _cuantil(desbalance, fraccion)
+
+def _cuantil(valores, fraccion):
+    """Valor en la posición `fraccion` de los valores ordenados (1 = el máximo)"""
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, max(0, int(len(ordenados) * fraccion) - 1))]
+
+def balance_grueso(jugadores, rng, tamano_lote=256):
+    """Mejor desbalance de puntaje general en un lote de divisiones al azar
+
+    Estimación barata de qué tan parejos pueden quedar esos jugadores (sin optimizar
+    posiciones), con los 2 mejores en equipos distintos como en el sorteo. Sirve
+    para comparar subconjuntos de jugadores antes de sortear en serio.
+    """
+    ordenados = sorted(jugadores, key=lambda j: j.puntaje, reverse=True)
+    otros_jugadores = ordenados[2:]
+    mitad = len(otros_jugadores) // 2
+    puntajes = [j.puntaje for j in otros_jugadores]
+    base = ordenados[0].puntaje - ordenados[1].puntaje - sum(puntajes)
+    if NUMPY_AVAILABLE:
+        generador = np.random.default_rng(rng.getrandbits(63))
+        _, desbalance = _lote_numpy(generador, np.array(puntajes, dtype=float), mitad, tamano_lote, base)
+        return float(desbalance.min())
+    _, desbalance = _lote_python(rng, puntajes, mitad, tamano_lote, base)
+    return min(desbalance)
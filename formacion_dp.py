@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Formación y asignación óptimas en una sola pasada (programación dinámica por máscaras)
+
+optimizar_posiciones_equipo probaba cada formación y resolvía una asignación
+completa para cada una, aunque muchas formaciones comparten líneas enteras
+(3-2-0 y 3-1-1 tienen la misma defensa). Acá la formación es una variable más:
+
+    f(línea, usados) = max sobre cantidad c, ocupación legal P de la línea y
+                       subconjunto S de jugadores no usados con |S| = c de
+                       mejor_linea(P, S) + f(línea + 1, usados | S)
+
+con f(fin, todos) = 0. Las reglas de la plantilla (mínimos, máximos y
+ocupaciones simétricas de formaciones.py) son restricciones de la recursión.
+mejor_linea(P, S) se memoriza entre llamadas: durante un sorteo los mismos
+tríos de jugadores aparecen en muchos equipos distintos.
+
+Devuelve el mismo óptimo que el recorrido por formaciones con el algoritmo
+húngaro. Los empates se resuelven igual: primero la formación que aparece antes
+en generar_formaciones y luego la asignación lexicográficamente menor. (El
+recorrido compara sumas en punto flotante entre formaciones, así que si dos
+formaciones empatan salvo en el último bit puede quedarse con la otra.)
+"""
+
+import itertools
+
+from formaciones import generar_formaciones, obtener_plantilla, ocupaciones_linea, posicion_base
+from plantel import INDICE_POSICION, BIT_POSICION
+
+# Memo de mejor_linea entre llamadas; se vacía al superar este tamaño
+MAXIMO_MEMO_LINEAS = 500000
+_memo_lineas = {}
+
+# Posiciones por línea hasta las que conviene la DP (ver conviene_dp)
+MAXIMO_POSICIONES_LINEA = 3
+_compiladas_por_tamano = {}
+
+def _lineas_compiladas(jugadores_campo):
+    """Por línea: [mínimo, máximo, [(cantidad, índice, ocupación, bases), ...], mínimo y máximo del resto]
+
+    Se calcula una vez por tamaño y plantilla (la plantilla se recarga con cargar_plantilla).
+    """
+    plantilla = obtener_plantilla(jugadores_campo)
+    clave = (jugadores_campo, id(plantilla))
+    if clave in _compiladas_por_tamano:
+        return _compiladas_por_tamano[clave]
+    lineas = plantilla['lineas']
+    compiladas = []
+    for linea in lineas:
+        minimo = linea.get('min', 0)
+        maximo = linea.get('max', len(linea['posiciones']))
+        opciones = []
+        for cantidad in range(minimo, maximo + 1):
+            for indice, ocupacion in enumerate(ocupaciones_linea(linea, cantidad)):
+                bases = tuple(posicion_base(posicion) for posicion in ocupacion)
+                opciones.append((cantidad, indice, ocupacion, bases))
+        compiladas.append([minimo, maximo, opciones])
+    # Cuántos jugadores pueden absorber, como mínimo y como máximo, las líneas siguientes
+    minimo_resto = maximo_resto = 0
+    for linea in reversed(compiladas):
+        linea += [minimo_resto, maximo_resto]
+        minimo_resto += linea[0]
+        maximo_resto += linea[1]
+    _compiladas_por_tamano[clave] = compiladas
+    return compiladas
+
+def conviene_dp(jugadores_campo):
+    """True si la programación dinámica le gana al recorrido por formaciones para ese tamaño
+
+    La DP enumera subconjuntos de jugadores por línea y permuta dentro de cada línea,
+    así que solo conviene con líneas cortas (hasta MAXIMO_POSICIONES_LINEA posiciones,
+    como la plantilla por defecto) y más de una formación para elegir. Con una sola
+    formación o líneas de 4-5 posiciones (carrileros) el húngaro por formación es más rápido.
+    """
+    if len(generar_formaciones(jugadores_campo)) < 2:
+        return False
+    lineas = obtener_plantilla(jugadores_campo)['lineas']
+    return all(len(linea['posiciones']) <= MAXIMO_POSICIONES_LINEA for linea in lineas)
+
+def mejor_linea(bases, jugadores, permitir_fuera_posicion=False):
+    """Mejor asignación de esos jugadores a las posiciones de una ocupación de línea
+
+    Returns:
+        tuple | None: (puntaje entero, orden) donde orden[k] es el índice en jugadores
+                      que ocupa la posición k; ante empate el orden lexicográfico menor.
+                      None si no hay asignación válida.
+    """
+    clave = (bases, bool(permitir_fuera_posicion), jugadores)
+    if clave in _memo_lineas:
+        return _memo_lineas[clave]
+
+    columnas = [INDICE_POSICION[base] for base in bases]
+    bits = [BIT_POSICION[base] for base in bases]
+    mejor = None
+    for orden in itertools.permutations(range(len(jugadores))):
+        puntaje = 0
+        for k, i in enumerate(orden):
+            jugador = jugadores[i]
+            if not permitir_fuera_posicion and not jugador.elegibles & bits[k]:
+                break
+            puntaje += jugador.puntajes_enteros[columnas[k]]
+        else:
+            # permutations() sale en orden lexicográfico: solo se reemplaza si mejora
+            if mejor is None or puntaje > mejor[0]:
+                mejor = (puntaje, orden)
+
+    if len(_memo_lineas) >= MAXIMO_MEMO_LINEAS:
+        _memo_lineas.clear()
+    _memo_lineas[clave] = mejor
+    return mejor
+
+def _mejor_desde_linea(lineas, l, jugadores, permitir_fuera_posicion):
+    """f(línea, usados) del módulo, con los no usados como tupla de jugadores
+
+    Se memoriza entre llamadas: el resultado solo depende de qué jugadores quedan y
+    de su orden relativo, así el mediocampo y la delantera de un equipo se reutilizan
+    en todos los equipos que comparten esos jugadores.
+
+    Returns:
+        tuple | None: (puntaje, cantidades, índices de ocupación, orden, ocupaciones) donde
+                      orden son posiciones dentro de jugadores, en el orden de las posiciones
+                      de las ocupaciones. None si no hay forma legal de ubicarlos.
+    """
+    if l == len(lineas):
+        return (0, (), (), (), ()) if not jugadores else None
+    clave = (id(lineas), l, permitir_fuera_posicion, jugadores)
+    if clave in _memo_lineas:
+        return _memo_lineas[clave]
+
+    n = len(jugadores)
+    minimo_resto, maximo_resto = lineas[l][3], lineas[l][4]
+    mejor = None
+    for cantidad, indice, ocupacion, bases in lineas[l][2]:
+        if not minimo_resto <= n - cantidad <= maximo_resto:
+            continue
+        for subconjunto in itertools.combinations(range(n), cantidad):
+            linea = mejor_linea(bases, tuple([jugadores[i] for i in subconjunto]), permitir_fuera_posicion)
+            if linea is None:
+                continue
+            resto = [i for i in range(n) if i not in subconjunto]
+            siguiente = _mejor_desde_linea(lineas, l + 1, tuple([jugadores[i] for i in resto]),
+                                           permitir_fuera_posicion)
+            if siguiente is None:
+                continue
+            puntaje = linea[0] + siguiente[0]
+            if mejor is not None and puntaje < mejor[0]:
+                continue
+            orden = tuple([subconjunto[k] for k in linea[1]] + [resto[k] for k in siguiente[3]])
+            candidato = (puntaje, (cantidad,) + siguiente[1], (indice,) + siguiente[2], orden,
+                         (ocupacion,) + siguiente[4])
+            # Mayor puntaje; ante empate, la formación generada antes y el orden menor
+            if mejor is None or puntaje > mejor[0] or candidato[1:4] < mejor[1:4]:
+                mejor = candidato
+
+    if len(_memo_lineas) >= MAXIMO_MEMO_LINEAS:
+        _memo_lineas.clear()
+    _memo_lineas[clave] = mejor
+    return mejor
+
+def optimizar_formacion_dp(jugadores_campo, permitir_fuera_posicion=False):
+    """Mejor formación y asignación para los jugadores de campo en una sola pasada
+
+    Args:
+        jugadores_campo: Lista de Jugador (sin el arquero)
+        permitir_fuera_posicion: Si True, cualquier jugador puede ir a cualquier posición
+
+    Returns:
+        tuple: (formacion, puntaje, asignacion) con el mismo formato que el recorrido por
+               formaciones. Si ninguna formación es posible devuelve la primera formación
+               con puntaje 0 y asignación vacía, igual que ese recorrido.
+    """
+    n = len(jugadores_campo)
+    lineas = _lineas_compiladas(n)
+    resultado = _mejor_desde_linea(lineas, 0, tuple(jugadores_campo), bool(permitir_fuera_posicion))
+
+    if resultado is not None:
+        posiciones = [posicion for ocupacion in resultado[4] for posicion in ocupacion]
+        por_posicion = dict(zip(posiciones, resultado[3]))
+        # Mismo orden de posiciones que los dicts de generar_formaciones
+        formacion = {posicion: int(posicion in por_posicion)
+                     for linea in obtener_plantilla(n)['lineas'] for posicion in linea['posiciones']}
+
+        # Asignación en el orden de las posiciones de la formación, como asignar_flexible
+        puntaje_total = 0
+        asignacion = []
+        for posicion, cantidad in formacion.items():
+            if cantidad:
+                jugador = jugadores_campo[por_posicion[posicion]]
+                puntaje = jugador.puntajes[INDICE_POSICION[posicion_base(posicion)]]
+                puntaje_total += puntaje
+                asignacion.append((jugador.nombre, posicion, puntaje))
+        if puntaje_total > 0:
+            return formacion, puntaje_total, asignacion
+
+    formaciones = generar_formaciones(n)
+    return (formaciones[0] if formaciones else None), 0, []
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Generador de formaciones a partir de reglas declarativas
+
+Las formaciones ya no son listas escritas a mano: se derivan de una plantilla
+de líneas (defensa, mediocampo, delantera...) con sus posiciones ordenadas de
+izquierda a derecha. Las reglas son:
+    - Cada posición tiene máximo 1 jugador
+    - Cada línea tiene entre 'min' y 'max' jugadores
+    - En una línea 'simetrica' los ocupados deben ser simétricos: 1 jugador va al
+      centro, 2 jugadores van Izq + Der, 3 van Izq + Centro + Der, etc.
+Las formaciones se calculan una sola vez por cantidad de jugadores de campo.
+
+La plantilla se puede cambiar en formaciones.json sin tocar código. Por ejemplo,
+para fútbol 9 con carrileros:
+    {
+      "lineas": [
+        {"nombre": "defensa", "posiciones": ["LWB", "LCB", "CB", "RCB", "RWB"], "min": 2},
+        {"nombre": "mediocampo", "posiciones": ["LM", "CM", "RM"], "min": 1},
+        {"nombre": "delantera", "posiciones": ["CF"], "min": 0}
+      ],
+      "equivalencias": {"LWB": "LM", "RWB": "RM"}
+    }
+Las equivalencias dicen qué puntaje y qué lista de posiciones del jugador se usan
+para una posición que no está en jugadores_posiciones_especificas.json.
+Con "por_jugadores_campo": {"8": {...}} se usa otra plantilla solo para ese tamaño.
+"""
+
+import os
+import json
+import hashlib
+import itertools
+
+from plantel import POSICIONES
+
+ARCHIVO_FORMACIONES = 'formaciones.json'
+
+PLANTILLA_POR_DEFECTO = {
+    'lineas': [
+        {'nombre': 'defensa', 'posiciones': ['LCB', 'CB', 'RCB'], 'min': 1, 'simetrica': True},
+        {'nombre': 'mediocampo', 'posiciones': ['LM', 'CM', 'RM'], 'min': 1, 'simetrica': True},
+        {'nombre': 'delantera', 'posiciones': ['CF'], 'min': 0, 'simetrica': True}
+    ],
+    'equivalencias': {}
+}
+
+_plantilla = None
+_formaciones_por_tamano = {}
+
+def cargar_plantilla(archivo=ARCHIVO_FORMACIONES):
+    """Carga la plantilla de formaciones (la de por defecto si no hay archivo) y limpia la caché"""
+    global _plantilla
+    plantilla = PLANTILLA_POR_DEFECTO
+    if archivo and os.path.exists(archivo):
+        try:
+            with open(archivo, 'r', encoding='utf-8') as f:
+                plantilla = json.load(f)
+        except Exception as e:
+            print(f"⚠️  Error leyendo {archivo}: {e}. Se usa la plantilla por defecto")
+    _validar_plantilla(plantilla)
+    _plantilla = plantilla
+    _formaciones_por_tamano.clear()
+    return plantilla
+
+def obtener_plantilla(jugadores_campo=None):
+    """Plantilla vigente (cargada una sola vez), o la específica para esa cantidad de jugadores"""
+    if _plantilla is None:
+        cargar_plantilla()
+    if jugadores_campo is not None:
+        especificas = _plantilla.get('por_jugadores_campo', {})
+        if str(jugadores_campo) in especificas:
+            return dict(_plantilla, **especificas[str(jugadores_campo)])
+    return _plantilla
+
+def _validar_plantilla(plantilla):
+    """Verifica que toda posición de la plantilla tenga puntaje (propio o por equivalencia)"""
+    for datos in [plantilla] + list(plantilla.get('por_jugadores_campo', {}).values()):
+        equivalencias = dict(plantilla.get('equivalencias', {}), **datos.get('equivalencias', {}))
+        for linea in datos.get('lineas', plantilla['lineas']):
+            for posicion in linea['posiciones']:
+                if equivalencias.get(posicion, posicion) not in POSICIONES:
+                    raise ValueError(f"Posición '{posicion}' sin equivalencia en {POSICIONES}")
+
+def posicion_base(posicion):
+    """Posición de jugadores_posiciones_especificas.json que se usa para puntuar una posición"""
+    return obtener_plantilla().get('equivalencias', {}).get(posicion, posicion)
+
+def huella_plantilla():
+    """Huella de la plantilla vigente (para invalidar cachés si cambia)"""
+    contenido = json.dumps(obtener_plantilla(), sort_keys=True)
+    return hashlib.sha1(contenido.encode('utf-8')).hexdigest()[:8]
+
+def ocupaciones_linea(linea, cantidad):
+    """Subconjuntos legales de posiciones de una línea para esa cantidad de jugadores"""
+    posiciones = linea['posiciones']
+    total = len(posiciones)
+    for indices in itertools.combinations(range(total), cantidad):
+        if linea.get('simetrica', True) and set(indices) != {total - 1 - i for i in indices}:
+            continue
+        yield [posiciones[i] for i in indices]
+
+def generar_formaciones(jugadores_campo):
+    """Todas las formaciones legales para esa cantidad de jugadores de campo (calculadas una vez)
+
+    Cada formación es un dict {posición: 0 o 1} con las posiciones de la plantilla en orden.
+    """
+    if jugadores_campo in _formaciones_por_tamano:
+        return _formaciones_por_tamano[jugadores_campo]
+
+    lineas = obtener_plantilla(jugadores_campo)['lineas']
+    rangos = [range(linea.get('min', 0), linea.get('max', len(linea['posiciones'])) + 1) for linea in lineas]
+    todas_las_posiciones = [posicion for linea in lineas for posicion in linea['posiciones']]
+
+    formaciones = []
+    for cantidades in itertools.product(*rangos):
+        if sum(cantidades) != jugadores_campo:
+            continue
+        opciones = [list(ocupaciones_linea(linea, cantidad)) for linea, cantidad in zip(lineas, cantidades)]
+        for ocupacion in itertools.product(*opciones):
+            ocupadas = {posicion for posiciones in ocupacion for posicion in posiciones}
+            formaciones.append({posicion: int(posicion in ocupadas) for posicion in todas_las_posiciones})
+
+    _formaciones_por_tamano[jugadores_campo] = formaciones
+    return formaciones
+
+def jugadores_por_linea(formacion):
+    """Cantidad de jugadores de cada línea de la plantilla en una formación"""
+    lineas = obtener_plantilla(sum(formacion.values()))['lineas']
+    return [sum(formacion.get(posicion, 0) for posicion in linea['posiciones']) for linea in lineas]
+
+def formatear_formacion(formacion):
+    """Convierte la formación a string legible, por ejemplo '1-3-2-1' (arquero primero)"""
+    return '-'.join(str(cantidad) for cantidad in [1] + jugadores_por_linea(formacion))
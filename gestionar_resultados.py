@@ -9,6 +9,9 @@ import json
 import datetime
 from pathlib import Path
 
+from coocurrencia import registrar_resultado as registrar_coocurrencia
+from ratings_elo import registrar_resultado as registrar_ratings
+
 def cargar_historial():
     """Cargar historial de partidos"""
     archivo = Path('historial_partidos.json')
@@ -111,6 +114,8 @@ def agregar_resultado():
         historial = cargar_historial()
         historial.append(nuevo_partido)
         guardar_historial(historial)
+        registrar_coocurrencia(nuevo_partido)
+        registrar_ratings(nuevo_partido)
         print("✅ Resultado guardado correctamente!")
         
         # Mostrar estadísticas actualizadas
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Perfil por fases del sorteo: tiempos y contadores en un reporte estructurado
+
+Cuando un sorteo tarda, las líneas "Intento N" no dicen dónde se va el tiempo.
+Con un PerfilSorteo, iterar_mejoras y evaluar_division acumulan:
+
+    tiempos (ms): divisiones (generarlas), arqueros (elegir el arquero de cada
+                  equipo), formaciones (optimizar formación y asignación) y
+                  validacion (restricciones y orientación de colores)
+    contadores:   divisiones, equipos evaluados, optimizaciones hechas (equipos
+                  que no estaban en caché), asignaciones resueltas, equipos sin
+                  formación posible, aciertos y fallos de caché
+    motivo_fin:   margen, cero, intentos, plazo, detener, agotado o interrumpido
+
+Sin perfil (perfil=None, lo normal) el motor solo hace un `is not None` por
+fase, así que el costo es despreciable.
+"""
+
+import json
+import time
+
+class PerfilSorteo:
+    """Acumulador de tiempos por fase y contadores de un sorteo"""
+
+    def __init__(self):
+        self.tiempos = dict.fromkeys(('divisiones', 'arqueros', 'formaciones', 'validacion'), 0.0)
+        self.contadores = dict.fromkeys(('divisiones', 'equipos_evaluados', 'optimizaciones', 'asignaciones',
+                                         'sin_formacion', 'aciertos_cache', 'fallos_cache'), 0)
+        self.motivo_fin = None
+        self._inicio = time.perf_counter()
+        self._total = None
+
+    def sumar(self, fase, desde):
+        """Suma a la fase el tiempo transcurrido desde `desde` y devuelve el instante actual"""
+        ahora = time.perf_counter()
+        self.tiempos[fase] += ahora - desde
+        return ahora
+
+    def terminar(self, motivo):
+        """Registra por qué terminó la búsqueda (solo el primer motivo cuenta)"""
+        if self.motivo_fin is None:
+            self.motivo_fin = motivo
+            self._total = time.perf_counter() - self._inicio
+
+    def reporte(self):
+        """Reporte como dict serializable (tiempos en ms)"""
+        total = self._total if self._total is not None else time.perf_counter() - self._inicio
+        medido = sum(self.tiempos.values())
+        return {
+            'total_ms': round(total * 1000, 2),
+            'fases_ms': {fase: round(t * 1000, 2) for fase, t in self.tiempos.items()},
+            'otros_ms': round(max(total - medido, 0.0) * 1000, 2),
+            'contadores': dict(self.contadores),
+            'motivo_fin': self.motivo_fin
+        }
+
+    def guardar(self, archivo):
+        """Escribe el reporte en un archivo JSON"""
+        try:
+            with open(archivo, 'w', encoding='utf-8') as f:
+                json.dump(self.reporte(), f, ensure_ascii=False, indent=2)
+            return True
+        except Exception as e:
+            print(f"⚠️  Error guardando {archivo}: {e}")
+            return False
+
+    def resumen(self):
+        """Una línea legible con lo principal del reporte"""
+        reporte = self.reporte()
+        fases = ', '.join(f"{fase} {ms:.1f}" for fase, ms in reporte['fases_ms'].items())
+        c = reporte['contadores']
+        return (f"{reporte['total_ms']:.1f} ms ({fases}); {c['divisiones']} divisiones, "
+                f"{c['optimizaciones']} optimizaciones, {c['asignaciones']} asignaciones, "
+                f"{c['sin_formacion']} sin formación, caché {c['aciertos_cache']}/{c['fallos_cache']}; "
+                f"fin: {reporte['motivo_fin']}")
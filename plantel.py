@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Modelo compacto del plantel para el motor de sorteo
+
+Convierte jugadores_posiciones_especificas.json una sola vez en objetos Jugador
+con __slots__, ids enteros, la fila de puntajes [GK..CF] como tupla y una máscara
+de bits con las posiciones en que cada jugador puede jugar. Así los caminos
+calientes del sorteo no vuelven a partir jugador['posicion'] ni buscan en dicts.
+
+Los Jugador siguen aceptando jugador['nombre'], jugador['puntaje'], etc. para
+que el código que trabaja con los dicts del JSON funcione sin cambios.
+"""
+
+import json
+
+from cache_evaluaciones import version_puntajes
+
+POSICIONES = ('GK', 'LCB', 'CB', 'RCB', 'LM', 'CM', 'RM', 'CF')
+INDICE_POSICION = {posicion: i for i, posicion in enumerate(POSICIONES)}
+BIT_POSICION = {posicion: 1 << i for i, posicion in enumerate(POSICIONES)}
+TODAS_LAS_POSICIONES = (1 << len(POSICIONES)) - 1
+
+# Línea de la cancha a la que pertenece cada posición
+LINEAS = ('arco', 'defensa', 'mediocampo', 'delantera')
+LINEA_POSICION = {
+    'GK': 'arco',
+    'LCB': 'defensa', 'CB': 'defensa', 'RCB': 'defensa',
+    'LM': 'mediocampo', 'CM': 'mediocampo', 'RM': 'mediocampo',
+    'CF': 'delantera'
+}
+
+# Los puntajes se comparan como enteros escalados para que el óptimo sea exacto
+ESCALA_PUNTAJE = 10 ** 6
+
+def mascara_posiciones(texto_posiciones):
+    """Convierte 'GK, CM, LM' en la máscara de bits de esas posiciones"""
+    mascara = 0
+    for posicion in texto_posiciones.split(','):
+        mascara |= BIT_POSICION.get(posicion.strip(), 0)
+    return mascara
+
+class Jugador:
+    """Jugador del plantel con datos precalculados para el sorteo"""
+
+    __slots__ = ('id', 'nombre', 'posicion', 'puntaje', 'puntajes_posicion',
+                 'puntajes', 'puntajes_enteros', 'elegibles')
+
+    def __init__(self, id, datos):
+        self.id = id
+        self.nombre = datos['nombre']
+        self.posicion = datos['posicion']
+        self.puntaje = datos['puntaje']
+        self.puntajes_posicion = datos['puntajes_posicion']
+        self.puntajes = tuple(self.puntajes_posicion[p] for p in POSICIONES)
+        self.puntajes_enteros = tuple(round(p * ESCALA_PUNTAJE) for p in self.puntajes)
+        self.elegibles = mascara_posiciones(self.posicion)
+
+    def __getitem__(self, clave):
+        """Compatibilidad con el formato dict del JSON (jugador['nombre'], ...)"""
+        if clave in ('nombre', 'posicion', 'puntaje', 'puntajes_posicion'):
+            return getattr(self, clave)
+        raise KeyError(clave)
+
+    def puede_jugar(self, posicion):
+        """True si la posición está en la lista de posiciones válidas del jugador"""
+        return bool(self.elegibles & BIT_POSICION[posicion])
+
+    def a_dict(self):
+        """Devuelve el jugador en el formato del JSON"""
+        return {
+            'nombre': self.nombre,
+            'posicion': self.posicion,
+            'puntaje': self.puntaje,
+            'puntajes_posicion': self.puntajes_posicion
+        }
+
+    def __repr__(self):
+        return f"Jugador({self.id}, {self.nombre!r}, {self.puntaje})"
+
+class Plantel:
+    """Plantel completo: lista de Jugador más sus datos en forma de arreglos
+
+    Atributos:
+        jugadores: Lista de Jugador; jugadores[i].id == i
+        puntajes: Matriz [jugador][posición] con el orden de POSICIONES
+        elegibles: Máscara de posiciones válidas por jugador
+        version: Huella de los puntajes (para invalidar cachés)
+    """
+
+    def __init__(self, datos_jugadores):
+        self.jugadores = [Jugador(i, datos) for i, datos in enumerate(datos_jugadores)]
+        self.puntajes = [j.puntajes for j in self.jugadores]
+        self.elegibles = [j.elegibles for j in self.jugadores]
+        self.version = version_puntajes(self.jugadores)
+        self._por_nombre = {j.nombre.lower(): j for j in self.jugadores}
+
+    @classmethod
+    def desde_archivo(cls, archivo='jugadores_posiciones_especificas.json'):
+        """Carga el plantel desde el JSON de puntajes por posición"""
+        try:
+            with open(archivo, 'r', encoding='utf-8-sig') as f:
+                return cls(json.load(f))
+        except FileNotFoundError:
+            print(f"❌ Error: No se encontró el archivo {archivo}")
+            return cls([])
+
+    def __len__(self):
+        return len(self.jugadores)
+
+    def __iter__(self):
+        return iter(self.jugadores)
+
+    def buscar(self, nombre):
+        """Busca un jugador por nombre (sin distinguir mayúsculas); None si no existe"""
+        return self._por_nombre.get(nombre.strip().lower())
+
+def asegurar_jugadores(jugadores):
+    """Devuelve la lista como objetos Jugador, convirtiendo dicts del JSON si hace falta
+
+    Si ya son Jugador se devuelve la misma lista (sin copiar).
+    """
+    if all(isinstance(j, Jugador) for j in jugadores):
+        return jugadores
+    datos = [j.a_dict() if isinstance(j, Jugador) else j for j in jugadores]
+    return Plantel(datos).jugadores
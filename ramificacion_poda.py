@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sorteo exacto por ramificación y poda (branch and bound)
+
+Asigna los jugadores a los equipos de a uno, de mayor a menor puntaje general,
+y descarta toda rama cuya cota optimista de |puntaje1 - puntaje2| no puede
+mejorar la mejor división encontrada. Al terminar sin plazo vencido la
+división devuelta es la óptima (probado), no solo la mejor vista.
+
+Cota admisible: en cualquier división válida cada jugador de campo aporta el
+puntaje de alguna posición de su lista, así que su aporte está entre su menor y
+su mayor puntaje en esas posiciones; el arquero cambia ese aporte por su
+puntaje de GK, lo que corre el rango del equipo según quién pueda atajar. Con
+esos intervalos la diferencia final D = equipo1 - equipo2 queda acotada; para
+los que faltan asignar, el reparto que minimiza (o maximiza) D se obtiene
+ordenándolos por (mínimo + máximo). Si el intervalo de D no contiene el 0, la
+cota es el extremo más cercano a 0.
+
+La cota es floja cuando la mejor diferencia ya está cerca de 0 (lo normal con
+planteles reales): entonces poda sobre todo ramas desparejas y ramas sin
+arquero posible, y la garantía de optimalidad es lo que se gana.
+
+Reglas del sorteo que se respetan:
+    - Los 2 mejores jugadores van en equipos distintos (fijos en equipo 1 y 2)
+    - Cada equipo tiene al menos un arquero válido y como mucho un jugador que
+      solo puede ir al arco (salvo permitir_fuera_posicion)
+    - Las hojas se evalúan con evaluar_division, igual que el resto del motor;
+      las divisiones donde algún equipo no tiene formación posible no cuentan.
+      A diferencia del modo 'exhaustivo', tampoco cuentan las divisiones con un
+      equipo sin arquero válido (allá se admiten con el arquero penalizado)
+"""
+
+import time
+
+from alternativas import mascara_equipo
+from plantel import POSICIONES, INDICE_POSICION, asegurar_jugadores
+from restricciones import RestriccionesCompiladas, compilar_restricciones
+
+COLUMNA_GK = INDICE_POSICION['GK']
+TOLERANCIA = 1e-9
+INF = float('inf')
+
+def intervalo_campo(jugador, permitir_fuera_posicion=False):
+    """(mínimo, máximo) que el jugador puede aportar jugando de campo
+
+    Un jugador que solo puede ir al arco no tiene posición de campo: su intervalo es su
+    puntaje de GK (si no va al arco la división no tiene formación y no cuenta).
+    """
+    campo = [jugador.puntajes[i] for i, posicion in enumerate(POSICIONES)
+             if posicion != 'GK' and (permitir_fuera_posicion or jugador.elegibles >> i & 1)]
+    if not campo:
+        return jugador.puntajes[COLUMNA_GK], jugador.puntajes[COLUMNA_GK]
+    return min(campo), max(campo)
+
+def sorteo_ramificacion_poda(jugadores, permitir_fuera_posicion=False, cache=None, tiempo_limite_ms=None,
+                             restricciones=None):
+    """Busca la división de menor diferencia con garantía de optimalidad
+
+    Args:
+        jugadores: Lista de jugadores (número par; el tamaño de equipo debe tener formaciones)
+        permitir_fuera_posicion: Si True, permite jugadores en posiciones que no están en su lista
+        cache: CacheEvaluaciones opcional para las evaluaciones de las hojas
+        tiempo_limite_ms: Plazo opcional; si vence se devuelve la mejor encontrada sin garantía
+        restricciones: Reglas de restricciones.py (dict o compiladas); el óptimo es entre las que cumplen
+
+    Returns:
+        tuple: (equipo1, equipo2, info). info['ramificacion'] informa nodos explorados, podados
+               por cota y por arqueros, hojas evaluadas y si el óptimo quedó probado.
+    """
+    from sorteo_posiciones_especificas import (
+        _preparar_sorteo, _verificar_separacion, evaluar_division, generar_formaciones_posibles
+    )
+
+    if len(jugadores) % 2 != 0:
+        print("❌ Error: Número impar de jugadores")
+        return None, None, None
+    if not generar_formaciones_posibles(len(jugadores) // 2 - 1):
+        print(f"❌ Error: No hay formaciones para equipos de {len(jugadores) // 2} (ver formaciones.py)")
+        return None, None, None
+
+    jugadores = asegurar_jugadores(jugadores)
+    if cache is not None:
+        cache.preparar(jugadores)
+    mejor_jugador, segundo_mejor_jugador, jugadores_sorted_gk = _preparar_sorteo(
+        jugadores, permitir_fuera_posicion, mostrar=False)
+    if restricciones is not None and not isinstance(restricciones, RestriccionesCompiladas):
+        restricciones = compilar_restricciones(restricciones, jugadores)
+
+    # Orden de ramificación: los 2 mejores (fijos) y después de mayor a menor puntaje
+    resto = sorted((j for j in jugadores if j is not mejor_jugador and j is not segundo_mejor_jugador),
+                   key=lambda j: j.puntaje, reverse=True)
+    orden = [mejor_jugador, segundo_mejor_jugador] + resto
+    n = len(orden)
+    tamano = n // 2
+
+    intervalos = [intervalo_campo(j, permitir_fuera_posicion) for j in orden]
+    arquero = [permitir_fuera_posicion or j.puede_jugar('GK') for j in orden]
+    solo_arquero = [not permitir_fuera_posicion and not any(
+        j.elegibles >> i & 1 for i, posicion in enumerate(POSICIONES) if posicion != 'GK') for j in orden]
+    # Si el jugador va al arco el equipo suma su GK en vez de su aporte de campo:
+    # el puntaje del equipo queda entre suma(mínimos) + GK - mínimo y suma(máximos) + GK - máximo
+    ajustes = [(j.puntajes[COLUMNA_GK] - minimo, j.puntajes[COLUMNA_GK] - maximo)
+               for j, (minimo, maximo) in zip(orden, intervalos)]
+
+    # Para cada profundidad d (quedan orden[d:]): sumas (mín + máx) ordenadas y acumuladas,
+    # y el rango de ajustes de arquero de los que quedan
+    acumuladas = []
+    suma_minimos = []
+    suma_maximos = []
+    arqueros_restantes = []
+    ajuste_minimo_restante = []
+    ajuste_maximo_restante = []
+    for d in range(n + 1):
+        sumas = sorted(intervalos[i][0] + intervalos[i][1] for i in range(d, n))
+        prefijo = [0.0]
+        for valor in sumas:
+            prefijo.append(prefijo[-1] + valor)
+        acumuladas.append(prefijo)
+        suma_minimos.append(sum(intervalos[i][0] for i in range(d, n)))
+        suma_maximos.append(sum(intervalos[i][1] for i in range(d, n)))
+        arqueros_restantes.append(sum(arquero[d:]))
+        ajuste_minimo_restante.append(min((ajustes[i][0] for i in range(d, n) if arquero[i]), default=INF))
+        ajuste_maximo_restante.append(max((ajustes[i][1] for i in range(d, n) if arquero[i]), default=-INF))
+
+    estadisticas = {'nodos': 0, 'podados_cota': 0, 'podados_arquero': 0, 'hojas': 0, 'hojas_sin_formacion': 0,
+                    'rechazadas_restricciones': 0}
+    mejor = {'diferencia': INF, 'resultado': None}
+    inicio = time.perf_counter()
+    plazo = inicio + tiempo_limite_ms / 1000 if tiempo_limite_ms is not None else None
+    vencido = [False]
+
+    equipos = ([], [])
+    minimos = [0.0, 0.0]
+    maximos = [0.0, 0.0]
+    arqueros = [0, 0]
+    solos = [0, 0]
+    ajuste_minimo = [INF, INF]
+    ajuste_maximo = [-INF, -INF]
+
+    def rango_equipo(t, d):
+        """(mínimo, máximo) del puntaje final del equipo t sin contar a los que faltan asignar"""
+        if solos[t]:
+            return minimos[t], maximos[t]  # El que solo ataja va al arco: su intervalo ya es su GK
+        if len(equipos[t]) == tamano:
+            bajo, alto = ajuste_minimo[t], ajuste_maximo[t]
+        else:
+            bajo = min(ajuste_minimo[t], ajuste_minimo_restante[d])
+            alto = max(ajuste_maximo[t], ajuste_maximo_restante[d])
+        return minimos[t] + bajo, maximos[t] + alto
+
+    def cota(d):
+        """Menor |D| posible al completar la rama desde la profundidad d"""
+        faltan1 = tamano - len(equipos[0])
+        prefijo = acumuladas[d]
+        minimo1, maximo1 = rango_equipo(0, d)
+        minimo2, maximo2 = rango_equipo(1, d)
+        d_minimo = minimo1 - maximo2 + prefijo[faltan1] - suma_maximos[d]
+        d_maximo = maximo1 - minimo2 + (prefijo[-1] - prefijo[len(prefijo) - 1 - faltan1]) - suma_minimos[d]
+        if d_minimo <= 0 <= d_maximo:
+            return 0.0
+        return min(abs(d_minimo), abs(d_maximo))
+
+    def explorar(d):
+        if vencido[0] or mejor['diferencia'] == 0:
+            return
+        estadisticas['nodos'] += 1
+        if plazo is not None and estadisticas['nodos'] % 256 == 0 and time.perf_counter() >= plazo:
+            vencido[0] = True
+            return
+
+        if d == n:
+            if restricciones and not restricciones.cumple(mascara_equipo(equipos[0])):
+                estadisticas['rechazadas_restricciones'] += 1
+                return
+            estadisticas['hojas'] += 1
+            equipo1, equipo2, info = evaluar_division(list(equipos[0]), list(equipos[1]), mejor_jugador,
+                                                      segundo_mejor_jugador, jugadores_sorted_gk,
+                                                      permitir_fuera_posicion, cache)
+            if (info is None or len(info['asignacion1']) != len(equipo1)
+                    or len(info['asignacion2']) != len(equipo2)):
+                estadisticas['hojas_sin_formacion'] += 1
+                return
+            if info['diferencia'] < mejor['diferencia']:
+                mejor['diferencia'] = info['diferencia']
+                mejor['resultado'] = (equipo1, equipo2, info)
+            return
+
+        # Arqueros: cada equipo necesita uno válido y admite un solo "solo arquero"
+        if not permitir_fuera_posicion:
+            faltan = sum(1 for t in (0, 1) if not arqueros[t])
+            if faltan > arqueros_restantes[d] or any(
+                    not arqueros[t] and len(equipos[t]) == tamano for t in (0, 1)):
+                estadisticas['podados_arquero'] += 1
+                return
+
+        if cota(d) >= mejor['diferencia'] - TOLERANCIA:
+            estadisticas['podados_cota'] += 1
+            return
+
+        jugador = orden[d]
+        if d < 2:
+            destinos = (d,)  # El mejor va al equipo 1 y el segundo al equipo 2
+        else:
+            # Primero el equipo más flojo hasta ahora: encuentra antes divisiones parejas
+            destinos = (0, 1) if minimos[0] + maximos[0] <= minimos[1] + maximos[1] else (1, 0)
+
+        minimo, maximo = intervalos[d]
+        for t in destinos:
+            if len(equipos[t]) == tamano:
+                continue
+            if solo_arquero[d] and solos[t]:
+                estadisticas['podados_arquero'] += 1
+                continue
+            guardado = (ajuste_minimo[t], ajuste_maximo[t])
+            equipos[t].append(jugador)
+            minimos[t] += minimo
+            maximos[t] += maximo
+            arqueros[t] += arquero[d]
+            solos[t] += solo_arquero[d]
+            if arquero[d]:
+                ajuste_minimo[t] = min(ajuste_minimo[t], ajustes[d][0])
+                ajuste_maximo[t] = max(ajuste_maximo[t], ajustes[d][1])
+            explorar(d + 1)
+            equipos[t].pop()
+            minimos[t] -= minimo
+            maximos[t] -= maximo
+            arqueros[t] -= arquero[d]
+            solos[t] -= solo_arquero[d]
+            ajuste_minimo[t], ajuste_maximo[t] = guardado
+
+    explorar(0)
+
+    if mejor['resultado'] is None:
+        print("❌ Error: Ninguna división tiene formaciones posibles para ambos equipos")
+        return None, None, None
+
+    equipo1, equipo2, info = mejor['resultado']
+    if restricciones:
+        equipo1, equipo2, info = restricciones.orientar(equipo1, equipo2, info)
+    estadisticas['optimo_probado'] = not vencido[0]
+    estadisticas['ms'] = round((time.perf_counter() - inicio) * 1000, 1)
+    info = dict(info, ramificacion=estadisticas)
+
+    estado = "óptimo probado" if estadisticas['optimo_probado'] else "plazo vencido, sin garantía"
+    print(f"🌳 Ramificación y poda: diferencia {info['diferencia']:.3f} ({estado})")
+    print(f"   {estadisticas['nodos']} nodos, {estadisticas['podados_cota']} podados por cota, "
+          f"{estadisticas['podados_arquero']} por arqueros, {estadisticas['hojas']} hojas evaluadas")
+    _verificar_separacion(mejor_jugador, segundo_mejor_jugador, equipo1, equipo2)
+    return equipo1, equipo2, info
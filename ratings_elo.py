@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Ratings tipo Elo aprendidos de los resultados guardados
+
+Los puntajes de jugadores_posiciones_especificas.json se editan a mano; este
+módulo aprende una fuerza por jugador a partir de quién ganó cada partido:
+
+    fuerza del equipo  = promedio de los ratings de sus jugadores
+    P(gana el equipo 1) = 1 / (1 + 10^((R2 - R1) / 400))
+    rating nuevo       = rating + K · max(1, ln(1 + |goles1 - goles2|)) · (resultado - P)
+
+donde resultado es 1, 0.5 o 0 (empate = 0.5). El multiplicador por goles vale 1
+con 0 o 1 gol de diferencia y crece con el logaritmo desde 2 goles. Todos los
+jugadores del equipo reciben el mismo ajuste. Un jugador sin partidos arranca
+con un rating derivado de su puntaje general (rating_previo), así el modelo
+parte de lo que ya se sabe a mano.
+
+Los ratings se guardan en ratings_elo.json y se actualizan de a un partido al
+guardar un resultado (registrar_resultado). reentrenar() (o python ratings_elo.py)
+vuelve a recorrer todo el historial de una pasada. Como en coocurrencia.py,
+obtener_ratings detecta con una huella por partido si el historial cambió por
+otro lado y en ese caso reconstruye.
+
+Para el sorteo, compilar_prediccion deja el rating de cada confirmado por id y
+la penalización de una división es peso · |P(gana rojo) - 0.5|.
+
+Uso:
+    python ratings_elo.py     # Reentrena con todo el historial y muestra la tabla
+"""
+
+import json
+import math
+import hashlib
+
+from coocurrencia import equipos_partido
+
+ARCHIVO_RATINGS = 'ratings_elo.json'
+RATING_INICIAL = 1500.0
+K_POR_DEFECTO = 24.0
+# Puntos de rating por punto de puntaje general respecto de PUNTAJE_REFERENCIA (rating previo)
+RATING_POR_PUNTO = 60.0
+PUNTAJE_REFERENCIA = 6.0
+# Puntos de diferencia que cuesta una división con P(gana rojo) = 1 (o 0)
+PESO_PREDICCION_POR_DEFECTO = 10.0
+
+def rating_previo(puntaje):
+    """Rating inicial de un jugador sin partidos a partir de su puntaje general"""
+    if puntaje is None:
+        return RATING_INICIAL
+    return RATING_INICIAL + (puntaje - PUNTAJE_REFERENCIA) * RATING_POR_PUNTO
+
+def probabilidad_victoria(rating1, rating2):
+    """P(gana el equipo con rating1) según la curva logística de Elo"""
+    return 1.0 / (1.0 + 10 ** ((rating2 - rating1) / 400.0))
+
+def _clave_orden(partido):
+    return (partido.get('fecha', ''), partido.get('id', 0))
+
+def _huella(partido):
+    """Huella de fecha, equipos y resultado (lo que usa el modelo)"""
+    rojo, negro = equipos_partido(partido)
+    resultado = partido.get('resultado') or {}
+    contenido = json.dumps([partido.get('fecha', ''), sorted(rojo), sorted(negro),
+                            resultado.get('rojo'), resultado.get('negro')], ensure_ascii=False)
+    return hashlib.sha1(contenido.encode('utf-8')).hexdigest()[:10]
+
+def _resultado_valido(partido):
+    """True si el partido tiene ambos equipos y goles de los dos lados"""
+    rojo, negro = equipos_partido(partido)
+    resultado = partido.get('resultado') or {}
+    return bool(rojo and negro) and isinstance(resultado.get('rojo'), int) and isinstance(resultado.get('negro'), int)
+
+class RatingsElo:
+    """Ratings por jugador (nombre en minúsculas) con actualización de a un partido"""
+
+    def __init__(self, k=K_POR_DEFECTO, previos=None):
+        self.k = k
+        self.previos = previos or {}  # {nombre en minúsculas: puntaje general}
+        self.ratings = {}
+        self.partidos = {}     # {nombre: partidos jugados}
+        self.registrados = {}  # {id de partido: huella}
+        self.ultimo = None
+
+    def rating(self, nombre, puntaje=None):
+        """Rating aprendido, o el previo (por puntaje) si todavía no jugó"""
+        clave = nombre.strip().lower()
+        if clave in self.ratings:
+            return self.ratings[clave]
+        return rating_previo(self.previos.get(clave, puntaje))
+
+    def rating_equipo(self, nombres):
+        """Promedio de ratings de un equipo"""
+        return sum(self.rating(nombre) for nombre in nombres) / len(nombres)
+
+    def probabilidad(self, equipo1, equipo2):
+        """P(gana equipo1) para dos listas de nombres (o Jugador)"""
+        nombres1 = [j if isinstance(j, str) else j['nombre'] for j in equipo1]
+        nombres2 = [j if isinstance(j, str) else j['nombre'] for j in equipo2]
+        return probabilidad_victoria(self.rating_equipo(nombres1), self.rating_equipo(nombres2))
+
+    def registrar_partido(self, partido):
+        """Actualiza los ratings con un partido (posterior a los ya registrados)
+
+        Returns:
+            float | None: P(gana rojo) que predecía el modelo antes del partido
+                          (None si el partido no tiene resultado completo)
+        """
+        self.registrados[str(partido.get('id'))] = _huella(partido)
+        self.ultimo = _clave_orden(partido)
+        if not _resultado_valido(partido):
+            return None
+        rojo, negro = equipos_partido(partido)
+        goles_rojo = partido['resultado']['rojo']
+        goles_negro = partido['resultado']['negro']
+
+        prediccion = probabilidad_victoria(self.rating_equipo(rojo), self.rating_equipo(negro))
+        real = 1.0 if goles_rojo > goles_negro else 0.0 if goles_rojo < goles_negro else 0.5
+        ajuste = self.k * max(1.0, math.log1p(abs(goles_rojo - goles_negro))) * (real - prediccion)
+        for equipo, signo in ((rojo, 1), (negro, -1)):
+            for nombre in equipo:
+                clave = nombre.strip().lower()
+                self.ratings[clave] = self.rating(clave) + signo * ajuste
+                self.partidos[clave] = self.partidos.get(clave, 0) + 1
+        return prediccion
+
+    @classmethod
+    def desde_historial(cls, historial, k=K_POR_DEFECTO, previos=None):
+        """Reentrena de una pasada recorriendo el historial del más antiguo al más reciente"""
+        modelo = cls(k, previos)
+        for partido in sorted(historial, key=_clave_orden):
+            modelo.registrar_partido(partido)
+        return modelo
+
+    def al_dia_con(self, historial):
+        """Partidos que faltan registrar, o None si hay que reentrenar (ver coocurrencia.py)"""
+        actuales = {str(p.get('id')): p for p in historial}
+        for id_partido, huella in self.registrados.items():
+            if id_partido not in actuales or _huella(actuales[id_partido]) != huella:
+                return None
+        nuevos = sorted((p for i, p in actuales.items() if i not in self.registrados), key=_clave_orden)
+        if nuevos and self.ultimo is not None and _clave_orden(nuevos[0]) < tuple(self.ultimo):
+            return None
+        return nuevos
+
+    def guardar(self, archivo=ARCHIVO_RATINGS):
+        """Guarda los ratings en un archivo JSON"""
+        try:
+            with open(archivo, 'w', encoding='utf-8') as f:
+                json.dump({'k': self.k, 'ultimo': self.ultimo, 'registrados': self.registrados,
+                           'partidos': self.partidos,
+                           'ratings': {n: round(r, 2) for n, r in sorted(self.ratings.items())}},
+                          f, ensure_ascii=False, indent=2)
+            return True
+        except Exception as e:
+            print(f"⚠️  Error guardando {archivo}: {e}")
+            return False
+
+    @classmethod
+    def cargar(cls, archivo=ARCHIVO_RATINGS, previos=None):
+        """Ratings guardados, o None si no hay archivo o no se puede leer"""
+        try:
+            with open(archivo, 'r', encoding='utf-8') as f:
+                datos = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"⚠️  Error leyendo {archivo}: {e}")
+            return None
+        modelo = cls(datos.get('k', K_POR_DEFECTO), previos)
+        modelo.ratings = datos.get('ratings', {})
+        modelo.partidos = datos.get('partidos', {})
+        modelo.registrados = datos.get('registrados', {})
+        modelo.ultimo = datos.get('ultimo')
+        return modelo
+
+def puntajes_previos(plantel=None):
+    """{nombre en minúsculas: puntaje general} del plantel (para los ratings previos)"""
+    if plantel is None:
+        from plantel import Plantel
+        try:
+            plantel = Plantel.desde_archivo()
+        except Exception:
+            return {}
+    return {j.nombre.lower(): j.puntaje for j in plantel.jugadores}
+
+def reentrenar(historial=None, archivo=ARCHIVO_RATINGS, k=K_POR_DEFECTO, previos=None):
+    """Recorre todo el historial de una pasada y guarda los ratings"""
+    if historial is None:
+        from seleccion_suplentes import cargar_historial
+        historial = cargar_historial()
+    modelo = RatingsElo.desde_historial(historial, k, puntajes_previos() if previos is None else previos)
+    modelo.guardar(archivo)
+    return modelo
+
+def obtener_ratings(historial=None, archivo=ARCHIVO_RATINGS, k=K_POR_DEFECTO, previos=None):
+    """Ratings al día con el historial: los guardados, completados o reentrenados si hace falta"""
+    if historial is None:
+        from seleccion_suplentes import cargar_historial
+        historial = cargar_historial()
+    previos = puntajes_previos() if previos is None else previos
+    modelo = RatingsElo.cargar(archivo, previos)
+    nuevos = None
+    if modelo is not None and modelo.k == k:
+        nuevos = modelo.al_dia_con(historial)
+    if nuevos is None:
+        return reentrenar(historial, archivo, k, previos)
+    if nuevos:
+        for partido in nuevos:
+            modelo.registrar_partido(partido)
+        modelo.guardar(archivo)
+    return modelo
+
+def registrar_resultado(partido, archivo=ARCHIVO_RATINGS):
+    """Actualiza ratings_elo.json con un partido recién guardado (sin releer el historial)
+
+    Igual que en coocurrencia.py, un partido editado o fuera de orden no se aplica
+    acá: la próxima obtener_ratings lo detecta y reentrena.
+    """
+    modelo = RatingsElo.cargar(archivo, puntajes_previos())
+    if modelo is None:
+        return False
+    if str(partido.get('id')) in modelo.registrados:
+        return False
+    if modelo.ultimo is not None and _clave_orden(partido) < tuple(modelo.ultimo):
+        return False
+    modelo.registrar_partido(partido)
+    return modelo.guardar(archivo)
+
+class PrediccionElo:
+    """Probabilidad de victoria de cualquier división de un conjunto fijo de jugadores
+
+    Attributes:
+        ratings: {id de jugador: rating}
+        peso: Puntos de diferencia por unidad de |P(gana equipo 1) - 0.5|
+    """
+
+    def __init__(self, ratings, peso):
+        self.ratings = ratings
+        self.peso = peso
+
+    def probabilidad(self, mascara1):
+        """P(gana el equipo 1) de la división cuyo equipo 1 tiene esa máscara de ids"""
+        suma1 = suma2 = 0.0
+        n1 = n2 = 0
+        for id_jugador, rating in self.ratings.items():
+            if mascara1 >> id_jugador & 1:
+                suma1 += rating
+                n1 += 1
+            else:
+                suma2 += rating
+                n2 += 1
+        return probabilidad_victoria(suma1 / n1, suma2 / n2)
+
+    def penalizacion(self, mascara1):
+        """peso · |P(gana equipo 1) - 0.5|"""
+        return self.peso * abs(self.probabilidad(mascara1) - 0.5)
+
+    def __bool__(self):
+        return self.peso > 0
+
+def compilar_prediccion(modelo, jugadores, peso=PESO_PREDICCION_POR_DEFECTO):
+    """Prepara la predicción para los jugadores de un sorteo (ver PrediccionElo)"""
+    return PrediccionElo({j.id: modelo.rating(j.nombre, j.puntaje) for j in jugadores}, peso)
+
+def main():
+    modelo = reentrenar()
+    print(f"📈 Ratings reentrenados con {len(modelo.registrados)} partidos del historial")
+    for nombre, rating in sorted(modelo.ratings.items(), key=lambda r: -r[1]):
+        print(f"   {nombre:<20} {rating:7.1f}  ({modelo.partidos.get(nombre, 0)} partidos)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Reparación de un sorteo ya publicado cuando alguien se baja o se suma
+
+En vez de volver a sortear desde cero (y cambiar todos los equipos), parte de
+equipos.json, saca a los que se bajan, ubica a los que entran en los lugares
+libres y busca solo en el vecindario chico de la división publicada:
+    - 0 intercambios: los que entran ocupan los lugares libres
+    - 1 intercambio: además se cambian de equipo un jugador rojo y uno negro
+    - 2 intercambios: dos jugadores de cada equipo
+Se queda con el nivel más bajo que deja la diferencia dentro de margen_error
+(o, si ninguno lo logra, con la mejor diferencia, y ante empate la de menos
+cambios). Siempre se respeta que los 2 mejores jugadores queden separados y
+las reglas de restricciones.json.
+
+Uso:
+    python reparar_sorteo.py "Sale1,Sale2" "Entra1,Entra2"
+"""
+
+import sys
+import json
+import time
+import itertools
+
+from alternativas import mascara_equipo
+from cache_evaluaciones import CacheEvaluaciones
+from plantel import Plantel
+from restricciones import cargar_restricciones, compilar_restricciones
+
+ARCHIVO_EQUIPOS = 'equipos.json'
+
+def cargar_equipos_publicados(archivo=ARCHIVO_EQUIPOS):
+    """Lee equipos.json; None si no existe o no se puede leer"""
+    try:
+        with open(archivo, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        print(f"❌ Error: No se encontró el archivo {archivo}")
+    except Exception as e:
+        print(f"❌ Error leyendo {archivo}: {e}")
+    return None
+
+def _buscar_todos(plantel, nombres):
+    """Jugadores del plantel para esos nombres; lanza ValueError si alguno no existe"""
+    jugadores = []
+    for nombre in nombres:
+        jugador = plantel.buscar(nombre)
+        if jugador is None:
+            raise ValueError(f"Jugador no encontrado: {nombre}")
+        jugadores.append(jugador)
+    return jugadores
+
+def _division_valida(info, equipo1, equipo2):
+    """True si ambos equipos tienen formación (todos los jugadores quedaron ubicados)"""
+    return (info is not None and len(info['asignacion1']) == len(equipo1)
+            and len(info['asignacion2']) == len(equipo2))
+
+def reparar_sorteo(salen=(), entran=(), archivo=ARCHIVO_EQUIPOS, permitir_fuera_posicion=False,
+                   margen_error=0.3, max_intercambios=2, plantel=None, cache=None, restricciones=None):
+    """Rearma la división publicada con los cambios de plantel y el mínimo de intercambios
+
+    Args:
+        salen: Nombres de los jugadores que se bajan
+        entran: Nombres de los jugadores que se suman (misma cantidad que salen)
+        archivo: equipos.json con la división publicada ('rojo' y 'negro')
+        permitir_fuera_posicion: Si True, permite jugadores en posiciones que no están en su lista
+        margen_error: Diferencia aceptable; se prefiere el menor nivel de intercambios que la cumpla
+        max_intercambios: Intercambios rojo-negro como máximo (0, 1 o 2)
+        plantel: Plantel a usar (por defecto se carga jugadores_posiciones_especificas.json)
+        cache: CacheEvaluaciones opcional
+        restricciones: Reglas de restricciones.py como dict (por defecto restricciones.json)
+
+    Returns:
+        tuple: (equipo1, equipo2, info) con equipo1 = rojo; info['reparacion'] detalla los
+               cambios. (None, None, None) si los datos no permiten reparar.
+    """
+    from sorteo_posiciones_especificas import _preparar_sorteo, evaluar_division
+
+    inicio = time.perf_counter()
+    datos = cargar_equipos_publicados(archivo)
+    if datos is None:
+        return None, None, None
+    if len(salen) != len(entran):
+        print("❌ Error: Deben entrar tantos jugadores como salen (si no, hace falta un sorteo nuevo)")
+        return None, None, None
+
+    plantel = plantel or Plantel.desde_archivo()
+    try:
+        rojo = _buscar_todos(plantel, datos['rojo'])
+        negro = _buscar_todos(plantel, datos['negro'])
+        salientes = _buscar_todos(plantel, salen)
+        entrantes = _buscar_todos(plantel, entran)
+    except (KeyError, ValueError) as e:
+        print(f"❌ Error: {e}")
+        return None, None, None
+
+    publicados = set(rojo) | set(negro)
+    for jugador in salientes:
+        if jugador not in publicados:
+            print(f"❌ Error: {jugador.nombre} no está en los equipos publicados")
+            return None, None, None
+    for jugador in entrantes:
+        if jugador in publicados and jugador not in salientes:
+            print(f"❌ Error: {jugador.nombre} ya está en los equipos publicados")
+            return None, None, None
+
+    base1 = [j for j in rojo if j not in salientes]
+    base2 = [j for j in negro if j not in salientes]
+    libres1 = len(rojo) - len(base1)
+
+    jugadores = base1 + base2 + entrantes
+    mejor_jugador, segundo_mejor_jugador, jugadores_sorted_gk = _preparar_sorteo(
+        jugadores, permitir_fuera_posicion, mostrar=False)
+    reglas = compilar_restricciones(cargar_restricciones() if restricciones is None else restricciones, jugadores)
+    if cache is None:
+        cache = CacheEvaluaciones()
+    cache.preparar(plantel.jugadores)
+
+    evaluadas = 0
+    por_nivel = []  # Mejor candidato de cada nivel de intercambios
+    for nivel in range(max_intercambios + 1):
+        mejor_nivel = None
+        for a_rojo in itertools.combinations(entrantes, libres1):
+            colocados1 = base1 + list(a_rojo)
+            colocados2 = base2 + [j for j in entrantes if j not in a_rojo]
+            for desde1 in itertools.combinations(colocados1, nivel):
+                for desde2 in itertools.combinations(colocados2, nivel):
+                    equipo1_temp = [j for j in colocados1 if j not in desde1] + list(desde2)
+                    equipo2_temp = [j for j in colocados2 if j not in desde2] + list(desde1)
+                    if (mejor_jugador in equipo1_temp) == (segundo_mejor_jugador in equipo1_temp):
+                        continue  # Los 2 mejores siempre separados
+                    if reglas and not reglas.cumple(mascara_equipo(equipo1_temp), espejo=False):
+                        continue  # Los colores ya están publicados: rojo sigue siendo el equipo 1
+                    evaluadas += 1
+                    equipo1, equipo2, info = evaluar_division(
+                        equipo1_temp, equipo2_temp, mejor_jugador, segundo_mejor_jugador,
+                        jugadores_sorted_gk, permitir_fuera_posicion, cache)
+                    if not _division_valida(info, equipo1, equipo2):
+                        continue
+                    if mejor_nivel is None or info['diferencia'] < mejor_nivel[2]['diferencia']:
+                        cambios = [(j.nombre, 'rojo → negro') for j in desde1] + \
+                                  [(j.nombre, 'negro → rojo') for j in desde2]
+                        mejor_nivel = (equipo1, equipo2, info, cambios)
+        if mejor_nivel is not None:
+            por_nivel.append(mejor_nivel)
+            if mejor_nivel[2]['diferencia'] <= margen_error:
+                break  # Alcanza con este nivel: no hace falta mover más jugadores
+
+    if not por_nivel:
+        print("❌ Error: Ningún intercambio deja formaciones válidas; hace falta un sorteo nuevo")
+        return None, None, None
+
+    # El primero que cumple el margen, o el de menor diferencia (min se queda con el de menos cambios)
+    equipo1, equipo2, info, cambios = next(
+        (c for c in por_nivel if c[2]['diferencia'] <= margen_error),
+        min(por_nivel, key=lambda c: c[2]['diferencia']))
+
+    info = dict(info, reparacion={
+        'salen': [j.nombre for j in salientes],
+        'entran': [j.nombre for j in entrantes],
+        'intercambios': cambios,
+        'diferencia_publicada': datos.get('diferencia'),
+        'evaluadas': evaluadas,
+        'ms': round((time.perf_counter() - inicio) * 1000, 1)
+    })
+
+    print(f"🩹 Reparación: {len(salientes)} salen, {len(entrantes)} entran, {len(cambios) // 2} intercambio(s)")
+    for nombre, direccion in cambios:
+        print(f"   🔀 {nombre}: {direccion}")
+    print(f"   Diferencia {info['diferencia']:.3f} (publicada: {datos.get('diferencia')}), "
+          f"{evaluadas} divisiones evaluadas en {info['reparacion']['ms']:.0f} ms")
+    return equipo1, equipo2, info
+
+def main():
+    if len(sys.argv) < 3:
+        print('Uso: python reparar_sorteo.py "Sale1,Sale2" "Entra1,Entra2"')
+        return
+
+    salen = [nombre.strip() for nombre in sys.argv[1].split(',') if nombre.strip()]
+    entran = [nombre.strip() for nombre in sys.argv[2].split(',') if nombre.strip()]
+
+    equipo1, equipo2, info = reparar_sorteo(salen, entran)
+    if equipo1 is None:
+        return
+
+    from sorteo_posiciones_especificas import guardar_equipos, actualizar_archivos_html
+    datos = cargar_equipos_publicados()
+    info_partido = {'fecha': datos.get('fecha'), 'hora': datos.get('hora'), 'cancha': datos.get('cancha')}
+    guardar_equipos(equipo1, equipo2, info, info_partido, len(equipo1))
+    print(f"\n✅ Equipos reparados y guardados en {ARCHIVO_EQUIPOS}")
+    actualizar_archivos_html()
+
+if __name__ == "__main__":
+    main()
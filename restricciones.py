@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Restricciones entre jugadores para el sorteo, compiladas a máscaras de bits
+
+Hasta ahora la única regla era "los 2 mejores en equipos distintos". Con
+restricciones.json (o el mismo formato enviado por la API) se pueden pedir:
+    {
+      "separar": [["Arquero A", "Arquero B"]],
+      "juntos": [["Hermano 1", "Hermano 2"]],
+      "equipo_fijo": {"Jugador X": "negro"}
+    }
+Cada regla se compila una vez a máscaras con los ids del plantel, y una
+división (máscara del equipo 1) se acepta o rechaza con operaciones de bits,
+antes de optimizar posiciones. Los jugadores que no vinieron se ignoran.
+
+Los colores se eligen al final: una división y su espejo son la misma, así que
+equipo_fijo exige que los fijos rojos queden de un lado y los negros del otro,
+y orientar() da vuelta los equipos si hace falta para que el rojo sea equipo 1.
+"""
+
+import os
+import json
+
+ARCHIVO_RESTRICCIONES = 'restricciones.json'
+COLORES = ('rojo', 'negro')
+
+def cargar_restricciones(archivo=ARCHIVO_RESTRICCIONES):
+    """Lee las restricciones declarativas; dict vacío si no hay archivo"""
+    if not archivo or not os.path.exists(archivo):
+        return {}
+    try:
+        with open(archivo, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"⚠️  Error leyendo {archivo}: {e}. Se sortea sin restricciones")
+        return {}
+
+def _mascara_nombres(nombres, por_nombre):
+    """Máscara con los ids de los nombres presentes en el plantel del sorteo"""
+    mascara = 0
+    for nombre in nombres:
+        jugador = por_nombre.get(nombre.strip().lower())
+        if jugador is not None:
+            mascara |= 1 << jugador.id
+    return mascara
+
+class RestriccionesCompiladas:
+    """Predicados de bits sobre la máscara del equipo 1"""
+
+    def __init__(self, separar, juntos, fijos_rojo, fijos_negro):
+        self.separar = separar  # [máscara del par]: exactamente un bit en el equipo 1
+        self.juntos = juntos  # [máscara del grupo]: todos o ninguno en el equipo 1
+        self.fijos_rojo = fijos_rojo
+        self.fijos_negro = fijos_negro
+        self.rechazadas = 0
+
+    def __bool__(self):
+        return bool(self.separar or self.juntos or self.fijos_rojo or self.fijos_negro)
+
+    def cumple(self, mascara1, espejo=True):
+        """True si la división con ese equipo 1 respeta todas las restricciones
+
+        Con espejo=False el equipo 1 tiene que ser el rojo (por ejemplo al reparar un sorteo
+        ya publicado, donde los colores no se pueden dar vuelta).
+        """
+        for par in self.separar:
+            if (mascara1 & par) in (0, par):
+                self.rechazadas += 1
+                return False
+        for grupo in self.juntos:
+            if (mascara1 & grupo) not in (0, grupo):
+                self.rechazadas += 1
+                return False
+        if self.fijos_rojo or self.fijos_negro:
+            # Rojos de un lado y negros del otro, en cualquiera de las dos orientaciones
+            directa = (mascara1 & self.fijos_rojo) == self.fijos_rojo and not mascara1 & self.fijos_negro
+            invertida = espejo and not mascara1 & self.fijos_rojo and (mascara1 & self.fijos_negro) == self.fijos_negro
+            if not (directa or invertida):
+                self.rechazadas += 1
+                return False
+        return True
+
+    def orientar(self, equipo1, equipo2, info):
+        """Da vuelta la división si los fijos rojos quedaron en el equipo 2 (rojo = equipo 1)"""
+        mascara1 = 0
+        for jugador in equipo1:
+            mascara1 |= 1 << jugador.id
+        if (self.fijos_rojo and not mascara1 & self.fijos_rojo) or (self.fijos_negro and mascara1 & self.fijos_negro):
+            if info is not None:
+                info = dict(info)
+                for clave in ('formacion', 'puntaje', 'asignacion'):
+                    info[clave + '1'], info[clave + '2'] = info[clave + '2'], info[clave + '1']
+            return equipo2, equipo1, info
+        return equipo1, equipo2, info
+
+def compilar_restricciones(datos, jugadores):
+    """Compila restricciones declarativas para los jugadores de un sorteo
+
+    Args:
+        datos: dict con 'separar', 'juntos' y/o 'equipo_fijo' (ver el módulo), o None
+        jugadores: Lista de Jugador del sorteo (sus ids definen los bits)
+
+    Returns:
+        RestriccionesCompiladas (vacía y falsa si no hay reglas que apliquen)
+    """
+    datos = datos or {}
+    por_nombre = {j.nombre.lower(): j for j in jugadores}
+    for nombre in [n for grupo in datos.get('separar', []) + datos.get('juntos', []) for n in grupo] + \
+            list(datos.get('equipo_fijo', {})):
+        if nombre.strip().lower() not in por_nombre:
+            print(f"ℹ️  Restricción ignorada para {nombre}: no está entre los jugadores del sorteo")
+
+    separar = []
+    for grupo in datos.get('separar', []):
+        if len(grupo) != 2:
+            raise ValueError(f"'separar' admite pares de jugadores (con 2 equipos no se separan 3): {grupo}")
+        par = _mascara_nombres(grupo, por_nombre)
+        if par.bit_count() == 2:
+            separar.append(par)
+    juntos = [m for m in (_mascara_nombres(grupo, por_nombre) for grupo in datos.get('juntos', []))
+              if m.bit_count() > 1]
+
+    fijos = {color: [] for color in COLORES}
+    for nombre, color in datos.get('equipo_fijo', {}).items():
+        if color not in COLORES:
+            raise ValueError(f"Equipo fijo '{color}' para {nombre}: debe ser 'rojo' o 'negro'")
+        fijos[color].append(nombre)
+    return RestriccionesCompiladas(separar, juntos, _mascara_nombres(fijos['rojo'], por_nombre),
+                                   _mascara_nombres(fijos['negro'], por_nombre))
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Elección de suplentes dentro del sorteo (cuando confirman más de los que juegan)
+
+Antes se quedaban los 2 primeros arqueros y los primeros de campo en el orden
+del archivo, y el resto quedaba afuera antes de balancear. Ahora el banco es
+parte de la búsqueda:
+
+1. Se recorren los bancos posibles (todos si son pocos, una muestra si no),
+   descartando los que dejan menos de 2 arqueros válidos.
+2. Cada banco recibe un puntaje barato: el mejor balance de puntaje general de
+   un lote de divisiones al azar (filtro_grueso.balance_grueso) más, si se
+   pide, una penalización por dejar afuera a los que vienen siempre.
+3. Solo los mejores candidatos_finales bancos pasan al sorteo completo, y gana
+   el de menor diferencia + penalización.
+
+La asistencia sale de historial_partidos.json: fracción de los últimos partidos
+en que el jugador confirmó, con más peso para los más recientes.
+"""
+
+import json
+import math
+import random
+import itertools
+
+from filtro_grueso import balance_grueso
+from plantel import asegurar_jugadores
+
+ARCHIVO_HISTORIAL = 'historial_partidos.json'
+
+# Puntos de diferencia que cuesta dejar en el banco a alguien que vino a todos los partidos recientes
+PESO_ASISTENCIA_POR_DEFECTO = 0.3
+
+def cargar_historial(archivo=ARCHIVO_HISTORIAL):
+    """Partidos del historial ordenados del más reciente al más antiguo ([] si no hay)"""
+    try:
+        with open(archivo, 'r', encoding='utf-8-sig') as f:
+            partidos = json.load(f)
+    except FileNotFoundError:
+        return []
+    except Exception as e:
+        print(f"⚠️  Error leyendo {archivo}: {e}")
+        return []
+    return sorted(partidos, key=lambda p: (p.get('fecha', ''), p.get('id', 0)), reverse=True)
+
+def asistencia_reciente(historial=None, ventana=10, decaimiento=0.85):
+    """Asistencia ponderada por recencia de cada jugador, entre 0 y 1
+
+    Args:
+        historial: Partidos del más reciente al más antiguo (por defecto cargar_historial())
+        ventana: Cantidad de partidos recientes que se miran
+        decaimiento: Peso relativo de cada partido respecto del siguiente más nuevo
+
+    Returns:
+        dict: {nombre en minúsculas: asistencia}
+    """
+    partidos = (cargar_historial() if historial is None else historial)[:ventana]
+    total = sum(decaimiento ** k for k in range(len(partidos)))
+    asistencia = {}
+    for k, partido in enumerate(partidos):
+        presentes = set(partido.get('jugadores_confirmados', [])) | \
+            set(partido.get('equipo_rojo', [])) | set(partido.get('equipo_negro', []))
+        for nombre in presentes:
+            clave = nombre.strip().lower()
+            asistencia[clave] = asistencia.get(clave, 0.0) + decaimiento ** k / total
+    return asistencia
+
+def _bancos_posibles(jugadores, tamano_banco, max_bancos, rng):
+    """Todos los bancos si son a lo sumo max_bancos; si no, una muestra sin repetir"""
+    if math.comb(len(jugadores), tamano_banco) <= max_bancos:
+        yield from itertools.combinations(jugadores, tamano_banco)
+        return
+    vistos = set()
+    while len(vistos) < max_bancos:
+        banco = tuple(sorted(rng.sample(jugadores, tamano_banco), key=lambda j: j.id))
+        if banco not in vistos:
+            vistos.add(banco)
+            yield banco
+
+def sorteo_con_suplentes(confirmados, jugadores_por_equipo, num_intentos=1000, margen_error=0.3,
+                         permitir_fuera_posicion=False, peso_asistencia=0.0, asistencia=None,
+                         candidatos_finales=5, max_bancos=3000, muestras_grueso=256, rng=None, modo='aleatorio',
+                         cache=None, restricciones=None):
+    """Elige quiénes juegan y sortea los equipos en una sola búsqueda
+
+    Args:
+        confirmados: Lista de jugadores confirmados (más de 2 * jugadores_por_equipo)
+        jugadores_por_equipo: Jugadores por equipo
+        num_intentos, margen_error, permitir_fuera_posicion, modo, cache, restricciones:
+            Como en sorteo_con_posiciones_especificas (cada banco finalista se sortea con iterar_mejoras,
+            así que modo debe estar en MODOS_PROGRESIVOS)
+        peso_asistencia: Puntos de diferencia que "cuesta" dejar afuera a alguien con asistencia 1
+                         (0 = solo importa el balance)
+        asistencia: dict {nombre en minúsculas: 0..1}; por defecto asistencia_reciente()
+        candidatos_finales: Bancos que pasan al sorteo completo
+        max_bancos: Máximo de bancos a puntuar con el filtro grueso
+        muestras_grueso: Divisiones al azar por banco para estimar el balance
+        rng: random.Random a usar (por defecto el módulo random)
+
+    Returns:
+        tuple: (equipo1, equipo2, info) con info['suplentes'] (nombres) e info['seleccion']
+               (bancos puntuados, bancos sorteados, penalización). (None, None, None) si
+               ningún banco deja un sorteo válido.
+    """
+    from sorteo_posiciones_especificas import (MODOS_PROGRESIVOS, iterar_mejoras, puede_jugar_posicion,
+                                               sorteo_con_posiciones_especificas)
+
+    if modo not in MODOS_PROGRESIVOS:
+        print(f"❌ Error: El sorteo con suplentes solo admite los modos {', '.join(MODOS_PROGRESIVOS)}")
+        return None, None, None
+    rng = rng or random
+    jugadores = asegurar_jugadores(confirmados)
+    tamano_banco = len(jugadores) - 2 * jugadores_por_equipo
+    if tamano_banco <= 0:
+        equipo1, equipo2, info = sorteo_con_posiciones_especificas(
+            jugadores, num_intentos, jugadores_por_equipo, margen_error, permitir_fuera_posicion, modo,
+            cache, restricciones=restricciones)
+        return equipo1, equipo2, (dict(info, suplentes=[]) if info is not None else None)
+
+    if peso_asistencia and asistencia is None:
+        asistencia = asistencia_reciente()
+    asistencia = asistencia or {}
+    if cache is not None:
+        cache.preparar(jugadores)  # Una vez con todos: la caché sirve para cualquier banco
+
+    def penalizacion(banco):
+        return peso_asistencia * sum(asistencia.get(j.nombre.lower(), 0.0) for j in banco)
+
+    # Etapa 1: puntaje barato de cada banco
+    puntuados = []
+    considerados = 0
+    for banco in _bancos_posibles(jugadores, tamano_banco, max_bancos, rng):
+        considerados += 1
+        titulares = [j for j in jugadores if j not in banco]
+        if sum(1 for j in titulares if puede_jugar_posicion(j, 'GK', permitir_fuera_posicion)) < 2:
+            continue
+        puntuados.append((balance_grueso(titulares, rng, muestras_grueso) + penalizacion(banco), banco))
+    puntuados.sort(key=lambda c: c[0])
+
+    print(f"🪑 Banco de {tamano_banco}: {len(puntuados)} de {considerados} bancos posibles puntuados, "
+          f"{min(candidatos_finales, len(puntuados))} pasan al sorteo completo")
+
+    # Etapa 2: sorteo completo solo para los mejores bancos
+    mejor = None
+    for estimado, banco in puntuados[:candidatos_finales]:
+        titulares = [j for j in jugadores if j not in banco]
+        mejora = None
+        for mejora in iterar_mejoras(titulares, num_intentos, margen_error, permitir_fuera_posicion, modo,
+                                     cache=cache, rng=rng, restricciones=restricciones):
+            pass  # Cada mejora reemplaza a la anterior: queda la mejor división de este banco
+        if mejora is None:
+            continue
+        objetivo = mejora['diferencia'] + penalizacion(banco)
+        if mejor is None or objetivo < mejor[0]:
+            mejor = (objetivo, mejora['equipo1'], mejora['equipo2'], mejora['info'], banco)
+
+    if mejor is None:
+        print("❌ Error: Ningún banco deja un sorteo válido")
+        return None, None, None
+
+    objetivo, equipo1, equipo2, info, banco = mejor
+    info = dict(info, suplentes=[j.nombre for j in banco], seleccion={
+        'bancos_considerados': considerados,
+        'bancos_puntuados': len(puntuados),
+        'bancos_sorteados': min(candidatos_finales, len(puntuados)),
+        'penalizacion_asistencia': round(penalizacion(banco), 3),
+        'objetivo': round(objetivo, 3)
+    })
+    print(f"🪑 Suplentes: {', '.join(info['suplentes'])} (diferencia {info['diferencia']:.3f}, "
+          f"penalización por asistencia {info['seleccion']['penalizacion_asistencia']:.3f})")
+    return equipo1, equipo2, info
@@ -13,6 +13,9 @@ from datetime import datetime
 import logging
 from pathlib import Path
 
+from coocurrencia import registrar_resultado as registrar_coocurrencia
+from ratings_elo import registrar_resultado as registrar_ratings
+
 # Importar el gestor de base de datos
 try:
     from database_manager import DatabaseManager
@@ -78,10 +81,10 @@ def guardar_historial(historial):
         return False
 
 def guardar_partido(partido):
-    """Guarda un partido individual"""
+    """Guarda un partido individual (y actualiza coocurrencia.py y los ratings de ratings_elo.py)"""
     if DB_AVAILABLE and db_manager.use_postgres:
         print(f"🗄️  Guardando partido en PostgreSQL")
-        return db_manager.save_partido(partido)
+        return db_manager.save_partido(partido)  # Ya actualiza coocurrencia y ratings
     
     # Fallback: usar método antiguo con JSON
     print("📁 Guardando partido en archivo JSON")
@@ -95,7 +98,12 @@ def guardar_partido(partido):
     else:
         historial.append(partido)
     
-    return guardar_historial(historial)
+    if not guardar_historial(historial):
+        return False
+    # Matriz de compañeros y ratings al día sin reconstruir
+    registrar_coocurrencia(partido)
+    registrar_ratings(partido)
+    return True
 
 # ===== API ENDPOINTS =====
 
@@ -333,6 +341,172 @@ def debug_json():
     except Exception as e:
         return jsonify({'error': f'Error leyendo archivo: {str(e)}'})
 
+@app.route('/api/probabilidad-victoria', methods=['POST'])
+def probabilidad_victoria():
+    """API: Probabilidad de victoria de dos equipos según los ratings de ratings_elo.py
+
+    Body: {"rojo": ["Nombre", ...], "negro": ["Nombre", ...]}
+    """
+    try:
+        from ratings_elo import obtener_ratings
+
+        datos = request.json or {}
+        if not datos.get('rojo') or not datos.get('negro'):
+            return jsonify({'error': 'Se necesitan los equipos "rojo" y "negro"'}), 400
+        modelo = obtener_ratings(cargar_historial())
+        prob_rojo = modelo.probabilidad(datos['rojo'], datos['negro'])
+        return jsonify({
+            'rojo': round(prob_rojo, 4),
+            'negro': round(1 - prob_rojo, 4),
+            'rating_rojo': round(modelo.rating_equipo(datos['rojo']), 1),
+            'rating_negro': round(modelo.rating_equipo(datos['negro']), 1)
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/simular-partido', methods=['POST'])
+def simular_partido():
+    """API: Reporte de equidad de una división simulando partidos (ver simulador_partidos.py)
+
+    Body: {"rojo": ["Nombre", ...], "negro": ["Nombre", ...], "simulaciones": 10000}
+    """
+    try:
+        from simulador_partidos import simular_partido as simular, parametros_jugadores
+
+        datos = request.json or {}
+        if not datos.get('rojo') or not datos.get('negro'):
+            return jsonify({'error': 'Se necesitan los equipos "rojo" y "negro"'}), 400
+        simulaciones = min(int(datos.get('simulaciones', 10000)), 100000)
+        return jsonify(simular(datos['rojo'], datos['negro'], simulaciones,
+                               parametros_jugadores(cargar_historial())))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/sorteo-estrategias', methods=['GET', 'POST'])
+def sorteo_estrategias():
+    """API: Corre una o varias estrategias de sorteo por nombre (ver estrategias_sorteo.py)
+
+    GET: lista de estrategias registradas con su descripción.
+    POST body: {"jugadores": ["Nombre", ...], "estrategias": ["simple", "exhaustivo", ...],
+                "tiempo_limite_ms": 300, "permitir_fuera_posicion": false, "semilla": 0}
+    Sin "estrategias" se corren todas, con los mismos jugadores y la misma semilla.
+    """
+    try:
+        from estrategias_sorteo import ESTRATEGIAS, buscar_jugadores, comparar_estrategias, descripcion_estrategia
+        from plantel import Plantel
+
+        if request.method == 'GET':
+            return jsonify({nombre: descripcion_estrategia(nombre) for nombre in ESTRATEGIAS})
+
+        datos = request.json or {}
+        nombres = datos.get('estrategias') or list(ESTRATEGIAS)
+        desconocidas = [nombre for nombre in nombres if nombre not in ESTRATEGIAS]
+        if desconocidas:
+            return jsonify({'error': f'Estrategias desconocidas: {", ".join(desconocidas)}'}), 400
+        jugadores, no_encontrados = buscar_jugadores(Plantel.desde_archivo().jugadores, datos.get('jugadores', []))
+        if no_encontrados:
+            return jsonify({'error': f'Jugadores no encontrados: {", ".join(no_encontrados)}'}), 400
+        if len(jugadores) < 4 or len(jugadores) % 2:
+            return jsonify({'error': 'Se necesita un número par de al menos 4 jugadores'}), 400
+
+        # Como en sorteo-progresivo, el plazo total de la petición se acota a 10 s
+        tiempo_limite_ms = min(int(datos.get('tiempo_limite_ms', 300)), 10000 // len(nombres))
+        resultados = comparar_estrategias(jugadores, nombres, int(datos.get('semilla', 0)),
+                                          tiempo_limite_ms=tiempo_limite_ms,
+                                          permitir_fuera_posicion=bool(datos.get('permitir_fuera_posicion', False)))
+        return jsonify({'resultados': [r.a_dict() for r in resultados]})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/sorteo-progresivo', methods=['POST'])
+def sorteo_progresivo():
+    """API: Sorteo con plazo; transmite cada mejora como una línea JSON (NDJSON)
+
+    Body: {"jugadores": ["Nombre", ...], "tiempo_limite_ms": 300,
+           "permitir_fuera_posicion": false, "modo": "aleatorio",
+           "restricciones": {"separar": [...], "juntos": [...], "equipo_fijo": {...}},
+           "pesos_lineas": {"total": 1, "defensa": 0.5, ...}, "peso_repeticion": 0.05,
+           "peso_prediccion": 10, "perfil": false}
+    Sin "restricciones" se usan las de restricciones.json (si existe). Con
+    "pesos_lineas" se balancea también por línea (ver balance_lineas.py), con
+    "peso_repeticion" se penalizan las duplas que vienen jugando juntas (ver coocurrencia.py)
+    y con "peso_prediccion" se balancea la probabilidad de victoria (ver ratings_elo.py).
+    Con "perfil": true la última línea trae tiempos por fase y contadores (ver perfil_sorteo.py).
+    """
+    try:
+        from plantel import Plantel
+        from sorteo_posiciones_especificas import MODOS_PROGRESIVOS, iterar_mejoras
+        from restricciones import cargar_restricciones, compilar_restricciones
+
+        datos = request.json or {}
+        modo = datos.get('modo', 'aleatorio')
+        if modo not in MODOS_PROGRESIVOS:
+            # Los demás modos no entregan mejoras de a una (usar /api/sorteo-estrategias)
+            return jsonify({'error': f'Modo no disponible para el sorteo progresivo: {modo} '
+                                     f'(disponibles: {", ".join(MODOS_PROGRESIVOS)})'}), 400
+        plantel = Plantel.desde_archivo()
+        jugadores = []
+        for nombre in datos.get('jugadores', []):
+            jugador = plantel.buscar(nombre)
+            if jugador is None:
+                return jsonify({'error': f'Jugador no encontrado: {nombre}'}), 400
+            jugadores.append(jugador)
+        if len(jugadores) not in (12, 14):
+            return jsonify({'error': 'Se necesitan 12 o 14 jugadores'}), 400
+
+        try:
+            restricciones = compilar_restricciones(datos.get('restricciones', cargar_restricciones()), jugadores)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        repeticion = None
+        if float(datos.get('peso_repeticion', 0)) > 0:
+            from coocurrencia import obtener_coocurrencia, compilar_penalizacion
+            repeticion = compilar_penalizacion(obtener_coocurrencia(cargar_historial()), jugadores,
+                                               float(datos['peso_repeticion']))
+        prediccion = None
+        if float(datos.get('peso_prediccion', 0)) > 0:
+            from ratings_elo import obtener_ratings, compilar_prediccion
+            prediccion = compilar_prediccion(obtener_ratings(cargar_historial()), jugadores,
+                                             float(datos['peso_prediccion']))
+
+        perfil = None
+        if datos.get('perfil'):
+            from perfil_sorteo import PerfilSorteo
+            perfil = PerfilSorteo()
+
+        # El plazo se acota para que una petición no ocupe el worker indefinidamente
+        tiempo_limite_ms = min(int(datos.get('tiempo_limite_ms', 300)), 10000)
+        mejoras = iterar_mejoras(jugadores,
+                                 permitir_fuera_posicion=bool(datos.get('permitir_fuera_posicion', False)),
+                                 modo=modo,
+                                 tiempo_limite_ms=tiempo_limite_ms,
+                                 restricciones=restricciones,
+                                 pesos_lineas=datos.get('pesos_lineas'),
+                                 repeticion=repeticion,
+                                 prediccion=prediccion,
+                                 perfil=perfil)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+    def generar():
+        for mejora in mejoras:
+            yield json.dumps({
+                'equipo1': [j.nombre for j in mejora['equipo1']],
+                'equipo2': [j.nombre for j in mejora['equipo2']],
+                'diferencia': mejora['diferencia'],
+                'intento': mejora['intento'],
+                'ms': round(mejora['ms'], 1),
+                'info': mejora['info']
+            }, ensure_ascii=False) + '\n'
+        fin = {'fin': True}
+        if perfil is not None:
+            fin['perfil'] = perfil.reporte()
+        yield json.dumps(fin, ensure_ascii=False) + '\n'
+
+    # Si el cliente se desconecta, Flask cierra el generador y la búsqueda se detiene
+    return app.response_class(generar(), mimetype='application/x-ndjson')
+
 # ===== SERVIR ARCHIVOS ESTÁTICOS =====
 
 @app.route('/')
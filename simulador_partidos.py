@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Simulador Monte Carlo de partidos para medir qué tan pareja es una división
+
+Cada jugador tiene un factor de ataque (goles que hace su equipo respecto del
+promedio) y uno de defensa (goles que recibe su equipo respecto del promedio),
+calculados del historial con contracción hacia 1 para los que jugaron poco:
+
+    ataque  = (goles a favor  + PARTIDOS_PREVIOS · media) / ((partidos + PARTIDOS_PREVIOS) · media)
+    defensa = (goles en contra + PARTIDOS_PREVIOS · media) / ((partidos + PARTIDOS_PREVIOS) · media)
+
+Los goles del rojo en un partido simulado siguen una Poisson de media
+    λ_rojo = media · ataque medio del rojo · defensa media del negro
+(y al revés para el negro). Con NumPy (está en requirements.txt) se sortean
+todas las simulaciones de una vez; si no está instalado se usa el mismo modelo
+en Python puro, bastante más lento.
+
+El reporte da la distribución de la diferencia de goles (rojo - negro), las
+probabilidades de victoria, empate y derrota y un índice de desequilibrio
+|P(gana rojo) - P(gana negro)|, que el sorteo puede usar para desempatar entre
+las mejores divisiones.
+
+Uso:
+    python simulador_partidos.py    # Reporte de la división de equipos.json
+"""
+
+import json
+import math
+import random
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+from alternativas import valor_objetivo
+from coocurrencia import equipos_partido
+
+SIMULACIONES_POR_DEFECTO = 10000
+# Partidos "imaginarios" con rendimiento promedio que se suman a cada jugador
+PARTIDOS_PREVIOS = 5
+# Goles por equipo y partido si no hay historial con resultados
+MEDIA_GOLES_POR_DEFECTO = 5.0
+
+def parametros_jugadores(historial=None):
+    """Media de goles por equipo y factores {nombre en minúsculas: (ataque, defensa)}"""
+    if historial is None:
+        from seleccion_suplentes import cargar_historial
+        historial = cargar_historial()
+
+    goles_favor, goles_contra, partidos = {}, {}, {}
+    total_goles = 0
+    equipos_con_resultado = 0
+    for partido in historial:
+        resultado = partido.get('resultado') or {}
+        rojo, negro = equipos_partido(partido)
+        if not (rojo and negro) or not isinstance(resultado.get('rojo'), int) or not isinstance(resultado.get('negro'), int):
+            continue
+        for equipo, favor, contra in ((rojo, resultado['rojo'], resultado['negro']),
+                                      (negro, resultado['negro'], resultado['rojo'])):
+            total_goles += favor
+            equipos_con_resultado += 1
+            for nombre in equipo:
+                clave = nombre.strip().lower()
+                goles_favor[clave] = goles_favor.get(clave, 0) + favor
+                goles_contra[clave] = goles_contra.get(clave, 0) + contra
+                partidos[clave] = partidos.get(clave, 0) + 1
+
+    media = total_goles / equipos_con_resultado if equipos_con_resultado else MEDIA_GOLES_POR_DEFECTO
+    factores = {}
+    for clave, jugados in partidos.items():
+        previos = PARTIDOS_PREVIOS * media
+        denominador = (jugados + PARTIDOS_PREVIOS) * media
+        factores[clave] = ((goles_favor[clave] + previos) / denominador,
+                           (goles_contra[clave] + previos) / denominador)
+    return media, factores
+
+def goles_esperados(rojo, negro, media, factores):
+    """(λ_rojo, λ_negro) para dos listas de nombres; un jugador sin historial vale (1, 1)"""
+    def promedio(nombres, indice):
+        return sum(factores.get(n.strip().lower(), (1.0, 1.0))[indice] for n in nombres) / len(nombres)
+    return (media * promedio(rojo, 0) * promedio(negro, 1),
+            media * promedio(negro, 0) * promedio(rojo, 1))
+
+def _poisson(rng, lam):
+    """Un valor Poisson(lam) en Python puro (método de Knuth, suficiente para λ chicos)"""
+    limite = math.exp(-lam)
+    k, producto = 0, rng.random()
+    while producto > limite:
+        k += 1
+        producto *= rng.random()
+    return k
+
+def simular_partido(rojo, negro, simulaciones=SIMULACIONES_POR_DEFECTO, parametros=None, semilla=None):
+    """Simula muchos partidos entre dos equipos y resume la diferencia de goles
+
+    Args:
+        rojo, negro: Listas de nombres (o Jugador)
+        simulaciones: Cantidad de partidos simulados
+        parametros: (media, factores) de parametros_jugadores(); por defecto se calculan
+                    del historial
+        semilla: Semilla opcional (mismo valor = mismo reporte)
+
+    Returns:
+        dict: lambda_rojo/negro, prob_rojo, prob_empate, prob_negro, desequilibrio,
+              diferencia_media, percentiles (10, 50, 90) y distribucion {diferencia: frecuencia}
+    """
+    rojo = [j if isinstance(j, str) else j['nombre'] for j in rojo]
+    negro = [j if isinstance(j, str) else j['nombre'] for j in negro]
+    media, factores = parametros if parametros is not None else parametros_jugadores()
+    lambda_rojo, lambda_negro = goles_esperados(rojo, negro, media, factores)
+
+    if NUMPY_AVAILABLE:
+        generador = np.random.default_rng(semilla)
+        diferencias = generador.poisson(lambda_rojo, simulaciones) - generador.poisson(lambda_negro, simulaciones)
+        valores, cuentas = np.unique(diferencias, return_counts=True)
+        distribucion = {int(v): int(c) for v, c in zip(valores, cuentas)}
+        percentiles = [int(p) for p in np.percentile(diferencias, (10, 50, 90), method='nearest')]
+        diferencia_media = float(diferencias.mean())
+    else:
+        rng = random.Random(semilla)
+        diferencias = sorted(_poisson(rng, lambda_rojo) - _poisson(rng, lambda_negro) for _ in range(simulaciones))
+        distribucion = {}
+        for diferencia in diferencias:
+            distribucion[diferencia] = distribucion.get(diferencia, 0) + 1
+        percentiles = [diferencias[min(simulaciones - 1, int(p * simulaciones))] for p in (0.1, 0.5, 0.9)]
+        diferencia_media = sum(diferencias) / simulaciones
+
+    prob_rojo = sum(c for d, c in distribucion.items() if d > 0) / simulaciones
+    prob_negro = sum(c for d, c in distribucion.items() if d < 0) / simulaciones
+    return {
+        'simulaciones': simulaciones,
+        'lambda_rojo': round(lambda_rojo, 3),
+        'lambda_negro': round(lambda_negro, 3),
+        'prob_rojo': round(prob_rojo, 4),
+        'prob_empate': round(1 - prob_rojo - prob_negro, 4),
+        'prob_negro': round(prob_negro, 4),
+        'desequilibrio': round(abs(prob_rojo - prob_negro), 4),
+        'diferencia_media': round(diferencia_media, 3),
+        'percentiles': dict(zip(('p10', 'p50', 'p90'), percentiles)),
+        'distribucion': {str(d): c for d, c in sorted(distribucion.items())}
+    }
+
+def desempatar_por_simulacion(alternativas, tolerancia=0.0, simulaciones=SIMULACIONES_POR_DEFECTO,
+                              parametros=None, semilla=0):
+    """Entre las alternativas casi tan buenas como la mejor, la de partido simulado más parejo
+
+    Args:
+        alternativas: [(equipo1, equipo2, info), ...] de menor a mayor objetivo (TopDivisiones.ordenadas())
+        tolerancia: Objetivo extra sobre la mejor que todavía cuenta como empate
+
+    Returns:
+        tuple: (equipo1, equipo2, info) elegida, con info['simulacion'] (el reporte) e
+               info['desempate'] (cuántas se simularon y en qué posición estaba la elegida)
+    """
+    parametros = parametros if parametros is not None else parametros_jugadores()
+    limite = valor_objetivo(alternativas[0][2]) + max(tolerancia, 0.0)
+    candidatas = [a for a in alternativas if valor_objetivo(a[2]) <= limite]
+    reportes = [simular_partido(e1, e2, simulaciones, parametros, semilla) for e1, e2, _ in candidatas]
+    posicion = min(range(len(candidatas)), key=lambda i: reportes[i]['desequilibrio'])
+    equipo1, equipo2, info = candidatas[posicion]
+    info = dict(info, simulacion=reportes[posicion],
+                desempate={'simuladas': len(candidatas), 'posicion': posicion})
+    return equipo1, equipo2, info
+
+def main():
+    try:
+        with open('equipos.json', 'r', encoding='utf-8') as f:
+            equipos = json.load(f)
+    except Exception as e:
+        print(f"❌ Error leyendo equipos.json: {e}")
+        return
+    reporte = simular_partido(equipos['rojo'], equipos['negro'])
+    print(f"🎲 {reporte['simulaciones']} partidos simulados ({'NumPy' if NUMPY_AVAILABLE else 'Python puro'})")
+    print(f"   Goles esperados: rojo {reporte['lambda_rojo']:.2f}, negro {reporte['lambda_negro']:.2f}")
+    print(f"   🔴 {reporte['prob_rojo']:.1%}  🤝 {reporte['prob_empate']:.1%}  ⚫ {reporte['prob_negro']:.1%}")
+    print(f"   Diferencia de goles: media {reporte['diferencia_media']:+.2f}, "
+          f"p10 {reporte['percentiles']['p10']:+d}, p50 {reporte['percentiles']['p50']:+d}, "
+          f"p90 {reporte['percentiles']['p90']:+d}")
+
+if __name__ == "__main__":
+    main()
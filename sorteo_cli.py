@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sorteo por línea de comandos, sin preguntas: para cron, el servidor o CI
+
+Todas las opciones salen de flags o de un JSON de configuración (nunca de
+input()), y la estrategia se elige por nombre del registro de
+estrategias_sorteo.py. Cada sorteo escribe una línea JSON (NDJSON) en la salida;
+los mensajes para humanos van a stderr, así la salida se puede encadenar.
+
+En modo lote una sola invocación sortea varias fechas o listas de confirmados.
+El plantel, la caché de evaluaciones, la matriz de coocurrencia y los ratings
+se cargan una vez y se reutilizan en todos los sorteos.
+
+Configuración (--config), todas las claves opcionales:
+    {
+        "estrategia": "exhaustivo", "num_intentos": 1000, "margen_error": 0.3,
+        "permitir_fuera_posicion": false, "tiempo_limite_ms": 1000, "semilla": 0,
+        "archivo_jugadores": "jugadores_posiciones_especificas.json",
+        "pesos_lineas": {...}, "peso_repeticion": 0.05, "peso_prediccion": 10,
+        "restricciones": {...}, "num_alternativas": 0, "desempate_simulacion": 0,
+        "lote": [
+            {"fecha": "2026-05-07"},
+            {"confirmados": "confirmados_martes.txt", "estrategia": "local"},
+            {"jugadores": ["Erik", "Pablo", ...], "nombre": "prueba"}
+        ]
+    }
+Cada elemento del lote puede pisar cualquier opción. Sin lote se hace un solo
+sorteo con los confirmados de siempre (ver estrategias_sorteo.jugadores_confirmados).
+Sin "restricciones" se usan las de restricciones.json (si existe).
+
+Uso:
+    python sorteo_cli.py                                     # Un sorteo, NDJSON por stdout
+    python sorteo_cli.py --estrategia exhaustivo --guardar   # Además guarda equipos.json
+    python sorteo_cli.py --fechas todas --salida sorteos.ndjson
+    python sorteo_cli.py --confirmados martes.txt jueves.txt --semilla 1
+    python sorteo_cli.py --config sorteo.json
+    python sorteo_cli.py --listar                            # Estrategias disponibles
+
+Código de salida: 0 si todos los sorteos dieron una división válida, 1 si no,
+2 si la configuración es inválida.
+"""
+
+import io
+import sys
+import json
+import time
+import random
+import argparse
+import contextlib
+
+from cache_evaluaciones import CacheEvaluaciones, ARCHIVO_CACHE
+from estrategias_sorteo import (ESTRATEGIAS, ResultadoSorteo, buscar_jugadores, descripcion_estrategia,
+                                jugadores_confirmados, leer_nombres_confirmados, sortear)
+from plantel import Plantel
+from restricciones import cargar_restricciones
+from sorteo_posiciones_especificas import MODOS_PROGRESIVOS, MODOS_SORTEO
+
+ARCHIVO_JUGADORES = 'jugadores_posiciones_especificas.json'
+ARCHIVO_CONFIRMACIONES = 'confirmaciones_automaticas.json'
+
+OPCIONES_POR_DEFECTO = {
+    'estrategia': 'aleatorio',
+    'num_intentos': 1000,
+    'margen_error': 0.3,
+    'permitir_fuera_posicion': False,
+    'tiempo_limite_ms': None,
+    'semilla': None,
+    'archivo_jugadores': ARCHIVO_JUGADORES,
+    'pesos_lineas': None,
+    'peso_repeticion': 0.0,
+    'peso_prediccion': 0.0,
+    'restricciones': None,
+    'num_alternativas': 0,
+    'desempate_simulacion': 0
+}
+
+# Claves que eligen a los jugadores de un sorteo (no son opciones de la estrategia)
+SELECTORES = ('fecha', 'confirmados', 'jugadores', 'nombre')
+
+# Estrategias que pueden además elegir el banco (seleccion_suplentes.py)
+MODOS_CON_SUPLENTES = MODOS_PROGRESIVOS  # El banco se elige con iterar_mejoras
+
+class RecursosLote:
+    """Plantel, caché y modelos del historial, cargados una sola vez para todo el lote"""
+
+    def __init__(self):
+        self.planteles = {}
+        self.caches = {}
+        self._coocurrencia = None
+        self._ratings = None
+
+    def plantel(self, archivo):
+        if archivo not in self.planteles:
+            self.planteles[archivo] = Plantel.desde_archivo(archivo)
+        return self.planteles[archivo]
+
+    def cache(self, archivo):
+        """Caché de evaluaciones del plantel; la del plantel por defecto persiste en disco"""
+        if archivo not in self.caches:
+            cache = CacheEvaluaciones(archivo=ARCHIVO_CACHE if archivo == ARCHIVO_JUGADORES else None)
+            cache.preparar(self.plantel(archivo).jugadores)
+            self.caches[archivo] = cache
+        return self.caches[archivo]
+
+    def coocurrencia(self):
+        if self._coocurrencia is None:
+            from coocurrencia import obtener_coocurrencia
+            self._coocurrencia = obtener_coocurrencia()
+        return self._coocurrencia
+
+    def ratings(self):
+        if self._ratings is None:
+            from ratings_elo import obtener_ratings
+            self._ratings = obtener_ratings()
+        return self._ratings
+
+    def guardar(self):
+        for cache in self.caches.values():
+            if cache.archivo:
+                cache.guardar_en_disco()
+
+def cargar_config(archivo):
+    """Lee el JSON de configuración (ValueError si no se puede)"""
+    try:
+        with open(archivo, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    except Exception as e:
+        raise ValueError(f"Error leyendo {archivo}: {e}")
+    if not isinstance(config, dict):
+        raise ValueError(f"{archivo} debe tener un objeto JSON")
+    return config
+
+def armar_trabajos(config, args):
+    """Lista de trabajos (dicts con opciones y selectores) del config y los flags
+
+    Prioridad de opciones: por defecto < config < flags < cada elemento del lote.
+    """
+    base = dict(OPCIONES_POR_DEFECTO)
+    base.update({clave: valor for clave, valor in config.items() if clave != 'lote'})
+    for clave in ('estrategia', 'num_intentos', 'margen_error', 'tiempo_limite_ms', 'semilla', 'archivo_jugadores',
+                  'peso_repeticion', 'peso_prediccion', 'num_alternativas', 'desempate_simulacion'):
+        if getattr(args, clave) is not None:
+            base[clave] = getattr(args, clave)
+    if args.permitir_fuera_posicion:
+        base['permitir_fuera_posicion'] = True
+
+    lote = list(config.get('lote', []))
+    if args.fechas:
+        fechas = args.fechas
+        if fechas == ['todas']:
+            with open(ARCHIVO_CONFIRMACIONES, 'r', encoding='utf-8') as f:
+                fechas = sorted(json.load(f))
+        lote += [{'fecha': fecha} for fecha in fechas]
+    if args.confirmados:
+        lote += [{'confirmados': archivo} for archivo in args.confirmados]
+
+    trabajos = [dict(base, **trabajo) for trabajo in lote] or [base]
+    for trabajo in trabajos:
+        desconocidas = set(trabajo) - set(OPCIONES_POR_DEFECTO) - set(SELECTORES) - {'perfilar'}
+        if desconocidas:
+            raise ValueError(f"Opciones desconocidas: {', '.join(sorted(desconocidas))}")
+        if trabajo['estrategia'] not in ESTRATEGIAS:
+            raise ValueError(f"Estrategia desconocida '{trabajo['estrategia']}' (disponibles: {', '.join(ESTRATEGIAS)})")
+    return trabajos
+
+def origen_trabajo(trabajo):
+    """Texto que identifica de dónde salen los jugadores de un trabajo"""
+    if 'nombre' in trabajo:
+        return trabajo['nombre']
+    if 'jugadores' in trabajo:
+        return 'lista'
+    if 'fecha' in trabajo:
+        return trabajo['fecha']
+    return trabajo.get('confirmados', 'confirmados')
+
+def jugadores_trabajo(trabajo, plantel):
+    """(confirmados, no_encontrados) según el selector del trabajo"""
+    if 'jugadores' in trabajo:
+        return buscar_jugadores(plantel.jugadores, trabajo['jugadores'])
+    if 'fecha' in trabajo or 'confirmados' in trabajo:
+        if 'fecha' in trabajo:
+            nombres = leer_nombres_confirmados(ARCHIVO_CONFIRMACIONES, trabajo['fecha'])
+        else:
+            nombres = leer_nombres_confirmados(trabajo['confirmados'])
+        if not nombres:
+            raise ValueError(f"No hay confirmados para {origen_trabajo(trabajo)}")
+        return buscar_jugadores(plantel.jugadores, nombres)
+    return jugadores_confirmados(plantel.jugadores), []
+
+def jugadores_por_equipo(cantidad):
+    """Tamaño de equipo como en sorteo_posiciones_especificas.main (7 desde 14 confirmados)"""
+    if cantidad >= 14:
+        return 7
+    if cantidad >= 12:
+        return 6
+    return cantidad // 2
+
+def sortear_con_suplentes(trabajo, confirmados, por_equipo, cache, silencioso):
+    """Sorteo eligiendo también el banco (más confirmados que lugares)
+
+    Como en sorteo_posiciones_especificas.main, con seleccion_suplentes.sorteo_con_suplentes:
+    aplican num_intentos, margen_error, permitir_fuera_posicion y restricciones, no los pesos.
+    """
+    from seleccion_suplentes import sorteo_con_suplentes, PESO_ASISTENCIA_POR_DEFECTO
+
+    if trabajo['estrategia'] not in MODOS_CON_SUPLENTES:
+        raise ValueError(f"Con suplentes solo se puede usar {', '.join(MODOS_CON_SUPLENTES)}")
+    if trabajo['semilla'] is not None:
+        random.seed(trabajo['semilla'])
+    salida = contextlib.redirect_stdout(io.StringIO()) if silencioso else contextlib.nullcontext()
+    inicio = time.perf_counter()
+    with salida:
+        equipo1, equipo2, info = sorteo_con_suplentes(
+            confirmados, por_equipo, trabajo['num_intentos'], trabajo['margen_error'],
+            trabajo['permitir_fuera_posicion'], peso_asistencia=PESO_ASISTENCIA_POR_DEFECTO,
+            modo=trabajo['estrategia'], cache=cache, restricciones=trabajo['restricciones'])
+    ms = (time.perf_counter() - inicio) * 1000
+    return ResultadoSorteo(trabajo['estrategia'], equipo1, equipo2, info, ms, trabajo['permitir_fuera_posicion'])
+
+def correr_trabajo(trabajo, recursos, silencioso=True):
+    """Un sorteo del lote
+
+    Returns:
+        tuple: (ResultadoSorteo, confirmados, no_encontrados)
+    """
+    plantel = recursos.plantel(trabajo['archivo_jugadores'])
+    if not plantel.jugadores:
+        raise ValueError(f"Plantel vacío: {trabajo['archivo_jugadores']}")
+    confirmados, no_encontrados = jugadores_trabajo(trabajo, plantel)
+    por_equipo = jugadores_por_equipo(len(confirmados))
+    if por_equipo < 2:
+        raise ValueError(f"Muy pocos jugadores confirmados ({len(confirmados)})")
+
+    opciones = {clave: valor for clave, valor in trabajo.items() if clave not in SELECTORES}
+    if opciones['restricciones'] is None:
+        opciones['restricciones'] = cargar_restricciones() or None
+    cache = recursos.cache(trabajo['archivo_jugadores'])
+    if len(confirmados) > 2 * por_equipo:
+        return sortear_con_suplentes(opciones, confirmados, por_equipo, cache, silencioso), confirmados, no_encontrados
+
+    if opciones['peso_repeticion'] > 0:
+        opciones['matriz_coocurrencia'] = recursos.coocurrencia()
+    if opciones['peso_prediccion'] > 0:
+        opciones['modelo_ratings'] = recursos.ratings()
+    nombre = opciones.pop('estrategia')
+    semilla = opciones.pop('semilla')
+    resultado = sortear(nombre, confirmados, semilla=semilla, silencioso=silencioso, cache=cache, **opciones)
+    return resultado, confirmados, no_encontrados
+
+def guardar_resultado(resultado, confirmados):
+    """Guarda equipos.json con el formato de sorteo_posiciones_especificas.guardar_equipos"""
+    from sorteo_posiciones_especificas import cargar_info_partido, guardar_equipos
+
+    info_partido, _ = cargar_info_partido()
+    return guardar_equipos(resultado.equipo1, resultado.equipo2, resultado.info, info_partido,
+                           jugadores_por_equipo(len(confirmados)))
+
+def main():
+    parser = argparse.ArgumentParser(description='Sorteo sin preguntas, con salida NDJSON')
+    parser.add_argument('--config', help='JSON con opciones y, opcionalmente, un "lote" de sorteos')
+    parser.add_argument('--estrategia', help=f"Una de: {', '.join(ESTRATEGIAS)} (por defecto aleatorio)")
+    parser.add_argument('--intentos', dest='num_intentos', type=int)
+    parser.add_argument('--margen-error', type=float)
+    parser.add_argument('--permitir-fuera-posicion', action='store_true')
+    parser.add_argument('--tiempo-limite-ms', type=int)
+    parser.add_argument('--semilla', type=int)
+    parser.add_argument('--jugadores', dest='archivo_jugadores', help=f'Plantel (por defecto {ARCHIVO_JUGADORES})')
+    parser.add_argument('--peso-repeticion', type=float)
+    parser.add_argument('--peso-prediccion', type=float)
+    parser.add_argument('--alternativas', dest='num_alternativas', type=int)
+    parser.add_argument('--desempate-simulacion', type=int)
+    parser.add_argument('--fechas', nargs='+', help=f'Fechas de {ARCHIVO_CONFIRMACIONES} (o "todas")')
+    parser.add_argument('--confirmados', nargs='+', help='Archivos de confirmados, un sorteo por archivo')
+    parser.add_argument('--salida', help='Archivo NDJSON (por defecto stdout)')
+    parser.add_argument('--guardar', action='store_true',
+                        help='Guarda equipos.json (solo con un sorteo y un modo del motor)')
+    parser.add_argument('--detalle', action='store_true', help='Muestra en stderr los mensajes de cada estrategia')
+    parser.add_argument('--listar', action='store_true', help='Lista las estrategias y termina')
+    args = parser.parse_args()
+
+    if args.listar:
+        for nombre in ESTRATEGIAS:
+            print(f"{nombre:<13} {descripcion_estrategia(nombre)}")
+        return 0
+
+    try:
+        trabajos = armar_trabajos(cargar_config(args.config) if args.config else {}, args)
+    except (ValueError, OSError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+    if args.guardar and len(trabajos) > 1:
+        print("❌ --guardar solo se puede usar con un sorteo", file=sys.stderr)
+        return 2
+    if args.guardar and trabajos[0]['estrategia'] not in MODOS_SORTEO:
+        # equipos.json lleva formación y posiciones, que solo asignan los modos del motor
+        print(f"❌ --guardar necesita una estrategia que asigne posiciones ({', '.join(MODOS_SORTEO)})",
+              file=sys.stderr)
+        return 2
+
+    destino = open(args.salida, 'w', encoding='utf-8') if args.salida else sys.stdout
+    recursos = RecursosLote()
+    fallidos = 0
+    try:
+        # Los mensajes para humanos van a stderr; por la salida solo sale NDJSON
+        with contextlib.redirect_stdout(sys.stderr):
+            for numero, trabajo in enumerate(trabajos, 1):
+                linea = {'trabajo': numero, 'origen': origen_trabajo(trabajo)}
+                try:
+                    resultado, confirmados, no_encontrados = correr_trabajo(trabajo, recursos, not args.detalle)
+                    linea.update(resultado.a_dict(), jugadores=len(confirmados), no_encontrados=no_encontrados)
+                    if not resultado.valido:
+                        fallidos += 1
+                    elif args.guardar:
+                        guardar_resultado(resultado, confirmados)
+                    print(f"{'✅' if resultado.valido else '❌'} {numero}/{len(trabajos)} {linea['origen']}: "
+                          f"{resultado.estrategia} en {resultado.ms:.0f} ms")
+                except Exception as e:
+                    fallidos += 1
+                    linea['error'] = str(e)
+                    print(f"❌ {numero}/{len(trabajos)} {linea['origen']}: {e}")
+                destino.write(json.dumps(linea, ensure_ascii=False) + '\n')
+                destino.flush()
+            recursos.guardar()
+    finally:
+        if destino is not sys.stdout:
+            destino.close()
+    return 1 if fallidos else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
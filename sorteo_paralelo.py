@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sorteo con posiciones específicas en paralelo (varios núcleos)
+
+Reparte los intentos aleatorios, o las divisiones del modo exhaustivo, entre
+procesos de un ProcessPoolExecutor. Cada worker usa su propia semilla derivada
+de la semilla del sorteo, y los resultados se combinan en un mejor global.
+
+REPRODUCIBLE: con la misma semilla y el mismo número de workers el resultado
+es siempre idéntico, así un sorteo discutido se puede repetir. El corte por
+margen de error es compartido: cada intento tiene un índice global y los
+workers solo se detienen al pasar el primer índice que cumplió el margen, de
+modo que el resultado no depende de qué proceso terminó antes.
+"""
+
+import os
+import random
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from cache_evaluaciones import CacheEvaluaciones
+from plantel import asegurar_jugadores
+from sorteo_posiciones_especificas import (
+    _preparar_sorteo, _verificar_separacion, evaluar_division, iterar_divisiones
+)
+
+# Modos que se reparten entre workers (los demás corren en un solo proceso)
+MODOS_PARALELOS = ('aleatorio', 'exhaustivo')
+
+# Índice global del primer intento que cumplió el margen (compartido entre workers)
+_limite_compartido = None
+
+def _inicializar_worker(limite):
+    """Recibe la señal de cancelación compartida al arrancar cada worker"""
+    global _limite_compartido
+    _limite_compartido = limite
+
+def _marcar_limite(indice):
+    """Publica un índice global que cumple el margen (se queda con el menor)"""
+    with _limite_compartido.get_lock():
+        if indice < _limite_compartido.value:
+            _limite_compartido.value = indice
+
+def semilla_worker(semilla, worker):
+    """Semilla reproducible de cada worker (no depende de PYTHONHASHSEED)"""
+    return f"{semilla}:{worker}"
+
+def _resumen(indice, equipo1, equipo2, info):
+    """Resultado serializable de un worker (los equipos viajan como ids)"""
+    return (info['diferencia'], indice, [j.id for j in equipo1], [j.id for j in equipo2], info)
+
+def _worker_aleatorio(worker, num_workers, semilla, num_intentos, jugadores, margen_error, permitir_fuera_posicion):
+    """Ejecuta los intentos con índice global worker, worker + num_workers, ..."""
+    rng = random.Random(semilla_worker(semilla, worker))
+    mejor_jugador, segundo_mejor_jugador, jugadores_sorted_gk = _preparar_sorteo(
+        jugadores, permitir_fuera_posicion, mostrar=False)
+    cache = CacheEvaluaciones()
+    cache.preparar(jugadores)
+
+    otros_base = [j for j in jugadores if j is not mejor_jugador and j is not segundo_mejor_jugador]
+    mitad = len(otros_base) // 2
+    mejor = None
+    evaluados = 0
+
+    for indice in range(worker, num_intentos, num_workers):
+        if indice > _limite_compartido.value:
+            break  # Otro worker ya cumplió el margen en un intento anterior
+
+        otros_jugadores = list(otros_base)
+        rng.shuffle(otros_jugadores)
+        equipo1, equipo2, info = evaluar_division(
+            [mejor_jugador] + otros_jugadores[:mitad], [segundo_mejor_jugador] + otros_jugadores[mitad:],
+            mejor_jugador, segundo_mejor_jugador, jugadores_sorted_gk, permitir_fuera_posicion, cache)
+        evaluados += 1
+        if info is None:
+            continue
+
+        if mejor is None or info['diferencia'] < mejor[0]:
+            mejor = _resumen(indice, equipo1, equipo2, info)
+            if info['diferencia'] <= margen_error:
+                _marcar_limite(indice)
+                break
+
+    return mejor, evaluados
+
+def _worker_exhaustivo(worker, num_workers, jugadores, permitir_fuera_posicion):
+    """Evalúa las divisiones cuyo número de orden es worker, worker + num_workers, ..."""
+    mejor_jugador, segundo_mejor_jugador, jugadores_sorted_gk = _preparar_sorteo(
+        jugadores, permitir_fuera_posicion, mostrar=False)
+    cache = CacheEvaluaciones()
+    cache.preparar(jugadores)
+
+    mejor = None
+    evaluados = 0
+
+    for indice, (equipo1_temp, equipo2_temp) in enumerate(iterar_divisiones(jugadores, mejor_jugador, segundo_mejor_jugador)):
+        if indice % num_workers != worker:
+            continue
+        if indice > _limite_compartido.value:
+            break  # Ya hay una división con diferencia 0 antes que esta
+
+        equipo1, equipo2, info = evaluar_division(
+            equipo1_temp, equipo2_temp, mejor_jugador, segundo_mejor_jugador,
+            jugadores_sorted_gk, permitir_fuera_posicion, cache)
+        evaluados += 1
+        if info is None:
+            continue
+
+        if mejor is None or info['diferencia'] < mejor[0]:
+            mejor = _resumen(indice, equipo1, equipo2, info)
+            if info['diferencia'] == 0:
+                _marcar_limite(indice)
+                break
+
+    return mejor, evaluados
+
+def sorteo_paralelo(jugadores, num_intentos=10000, margen_error=0.3, permitir_fuera_posicion=False,
+                    modo='aleatorio', num_workers=None, semilla=None):
+    """Sorteo con posiciones específicas repartido entre varios procesos
+
+    Args:
+        jugadores: Lista de jugadores (dicts del JSON o Jugador)
+        num_intentos: Intentos aleatorios totales, repartidos entre los workers
+        margen_error: Diferencia aceptable; el primer intento (en orden global) que la cumple gana
+        permitir_fuera_posicion: Si True, permite jugadores en posiciones que no están en su lista
+        modo: 'aleatorio' o 'exhaustivo' (reparte las divisiones entre los workers)
+        num_workers: Procesos a usar (por defecto, núcleos disponibles)
+        semilla: Semilla del sorteo; si es None se elige una y se informa en info['semilla']
+
+    Returns:
+        tuple: (equipo1, equipo2, info) igual que sorteo_con_posiciones_especificas.
+               info incluye 'semilla', 'num_workers', 'intento' y 'evaluados' para repetir el sorteo.
+    """
+    if len(jugadores) % 2 != 0:
+        print("❌ Error: Número impar de jugadores")
+        return None, None, None
+
+    jugadores = asegurar_jugadores(jugadores)
+    num_workers = num_workers or os.cpu_count() or 1
+    if semilla is None:
+        semilla = random.randrange(10 ** 9)
+
+    mejor_jugador, segundo_mejor_jugador, _ = _preparar_sorteo(jugadores, permitir_fuera_posicion)
+    print(f"🔄 Sorteo paralelo ({modo}) con {num_workers} workers, semilla {semilla}...")
+
+    # El límite arranca "sin acierto": mayor que cualquier índice posible
+    limite = multiprocessing.Value('q', 2 ** 62)
+    with ProcessPoolExecutor(max_workers=num_workers, initializer=_inicializar_worker, initargs=(limite,)) as executor:
+        if modo == 'exhaustivo':
+            futuros = [executor.submit(_worker_exhaustivo, w, num_workers, jugadores, permitir_fuera_posicion)
+                       for w in range(num_workers)]
+        elif modo == 'aleatorio':
+            futuros = [executor.submit(_worker_aleatorio, w, num_workers, semilla, num_intentos, jugadores,
+                                       margen_error, permitir_fuera_posicion)
+                       for w in range(num_workers)]
+        else:
+            print(f"❌ Error: Modo de sorteo desconocido '{modo}'")
+            return None, None, None
+        resultados = [futuro.result() for futuro in futuros]
+
+    evaluados = sum(n for _, n in resultados)
+    candidatos = [mejor for mejor, _ in resultados if mejor is not None]
+    if not candidatos:
+        return None, None, None
+
+    if modo == 'aleatorio':
+        aciertos = [c for c in candidatos if c[0] <= margen_error]
+        # Con acierto gana el primero en orden global; si no, la menor diferencia (y el menor índice)
+        diferencia, indice, ids1, ids2, info = (min(aciertos, key=lambda c: c[1]) if aciertos
+                                                else min(candidatos, key=lambda c: (c[0], c[1])))
+    else:
+        diferencia, indice, ids1, ids2, info = min(candidatos, key=lambda c: (c[0], c[1]))
+
+    por_id = {j.id: j for j in jugadores}
+    equipo1 = [por_id[i] for i in ids1]
+    equipo2 = [por_id[i] for i in ids2]
+    info.update({'semilla': semilla, 'num_workers': num_workers, 'intento': indice + 1, 'evaluados': evaluados})
+
+    print(f"✅ Mejor diferencia = {diferencia:.3f} (intento {indice + 1}, {evaluados} evaluaciones)")
+    _verificar_separacion(mejor_jugador, segundo_mejor_jugador, equipo1, equipo2)
+    return equipo1, equipo2, info
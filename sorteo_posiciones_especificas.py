@@ -20,6 +20,20 @@ import random
 import itertools
 from datetime import datetime
 import os
+import time
+
+from alternativas import TopDivisiones, mascara_equipo
+from balance_lineas import desglose_lineas, evaluar_balance, objetivos_lote
+from cache_evaluaciones import CacheEvaluaciones, ARCHIVO_CACHE
+from perfil_sorteo import PerfilSorteo
+from filtro_grueso import NUMPY_AVAILABLE, divisiones_dos_etapas, nuevos_contadores
+from formaciones import generar_formaciones, posicion_base, formatear_formacion
+from formacion_dp import conviene_dp, optimizar_formacion_dp
+from restricciones import RestriccionesCompiladas, compilar_restricciones, cargar_restricciones
+from plantel import Plantel, Jugador, asegurar_jugadores, INDICE_POSICION, BIT_POSICION
+
+COLUMNA_GK = INDICE_POSICION['GK']
+BIT_GK = BIT_POSICION['GK']
 
 def convertir_fecha_formato_completo(fecha_corta):
     """Convierte fecha DD/MM a formato completo con día de semana y mes en palabras"""
@@ -165,202 +179,99 @@ def cargar_info_partido():
         return info_default, False  # False = modo interactivo
 
 def jugadores_confirmados(todos_jugadores):
-    """Filtra jugadores confirmados basado en jugadores_confirmados.txt o confirmaciones_automaticas.json"""
-    
-    # Prioridad 1: Intentar leer desde jugadores_confirmados.txt
-    try:
-        if os.path.exists('jugadores_confirmados.txt'):
-            print("📄 Leyendo jugadores desde jugadores_confirmados.txt")
-            with open('jugadores_confirmados.txt', 'r', encoding='utf-8') as f:
-                contenido = f.read().strip()
-            
-            # Buscar la sección después de "---"
-            lineas = contenido.split('\n')
-            en_seccion_jugadores = False
-            nombres_confirmados = []
-            
-            for linea in lineas:
-                if linea.strip() == '---':
-                    en_seccion_jugadores = True
-                    continue
-                
-                if en_seccion_jugadores and linea.strip():
-                    # Limpiar el nombre (quitar espacios extra)
-                    nombre = linea.strip()
-                    if nombre:
-                        nombres_confirmados.append(nombre)
-            
-            # Buscar jugadores en la base de datos
-            confirmados = []
-            for nombre in nombres_confirmados:
-                jugador = next((j for j in todos_jugadores if j['nombre'].lower() == nombre.lower()), None)
-                if jugador:
-                    confirmados.append(jugador)
-                else:
-                    print(f"⚠️  Jugador '{nombre}' no encontrado en la base de datos")
-            
-            print(f"✅ {len(confirmados)} jugadores confirmados cargados desde jugadores_confirmados.txt")
-            if confirmados:
-                return confirmados
-                
-    except Exception as e:
-        print(f"⚠️ Error leyendo jugadores_confirmados.txt: {e}")
-    
-    # Prioridad 2: Fallback a confirmaciones_automaticas.json (código original)
-    try:
-        print("📄 Fallback: leyendo jugadores desde confirmaciones_automaticas.json")
-        with open('confirmaciones_automaticas.json', 'r', encoding='utf-8') as f:
-            confirmaciones = json.load(f)
-        
-        # Buscar confirmaciones para hoy
-        fecha_hoy = datetime.now().strftime('%Y-%m-%d')
-        
-        if fecha_hoy in confirmaciones and 'jugadores' in confirmaciones[fecha_hoy]:
-            nombres_confirmados = confirmaciones[fecha_hoy]['jugadores']
-        else:
-            # Buscar la fecha más reciente disponible
-            fechas_disponibles = sorted(confirmaciones.keys(), reverse=True)
-            if fechas_disponibles:
-                fecha_reciente = fechas_disponibles[0]
-                nombres_confirmados = confirmaciones[fecha_reciente]['jugadores']
-                print(f"⚠️  Usando confirmaciones de {fecha_reciente} (no hay para hoy)")
-            else:
-                print("❌ Error: No hay confirmaciones disponibles")
-                return []
-        
-        confirmados = []
-        for nombre in nombres_confirmados:
-            jugador = next((j for j in todos_jugadores if j['nombre'].lower() == nombre.lower()), None)
-            if jugador:
-                confirmados.append(jugador)
-            else:
-                print(f"⚠️  Jugador '{nombre}' no encontrado en la base de datos")
-        
-        print(f"✅ {len(confirmados)} jugadores confirmados cargados")
-        return confirmados
-        
-    except FileNotFoundError:
-        print("❌ Error: No se encontró confirmaciones_automaticas.json")
-        return []
-    except json.JSONDecodeError:
-        print("❌ Error: confirmaciones_automaticas.json tiene formato inválido")
-        return []
-    except Exception as e:
-        print(f"❌ Error cargando confirmaciones: {e}")
-        return []
+    """Filtra jugadores confirmados basado en jugadores_confirmados.txt o confirmaciones_automaticas.json
+
+    La lectura y la búsqueda por nombre son las de estrategias_sorteo.py, compartidas
+    con los demás scripts de sorteo.
+    """
+    from estrategias_sorteo import jugadores_confirmados as confirmados_compartidos
+    return confirmados_compartidos(todos_jugadores)
 
 def generar_formaciones_posibles(jugadores_campo=5):
-    """Genera formaciones con posiciones ESPECÍFICAS - Incluye CB y permite hasta 3 defensas
+    """Formaciones con posiciones ESPECÍFICAS para esa cantidad de jugadores de campo
     
     IMPORTANTE: Todas las posiciones (LCB, CB, RCB, LM, CM, RM, CF) tienen máximo 1 jugador.
     Cada jugador ocupa una única posición específica.
     REGLA ESPECIAL: Si hay exactamente 2 defensas o 2 mediocampos, deben ser Izq y Der (no Centro).
-    """
-    formaciones = []
-    
-    if jugadores_campo == 5:
-        # Formaciones para equipos de 6 (1 GK + 5 campo)
-        # REGLA: Cada posición máximo 1 jugador, hasta 3 defensas
-        # IMPORTANTE: 2 defensas = LCB + RCB (no CB), 2 mediocampos = LM + RM (no CM)
-        formaciones_basicas = [
-            # Formaciones con 2 defensas (SIEMPRE Izq + Der) y 2 mediocampos (SIEMPRE Izq + Der)
-            {'LCB': 1, 'CB': 0, 'RCB': 1, 'LM': 1, 'CM': 0, 'RM': 1, 'CF': 1},  # 2-2-1 (def Izq+Der, med Izq+Der)
-            # Formaciones con 2 defensas (SIEMPRE Izq + Der) y 3 mediocampos
-            {'LCB': 1, 'CB': 0, 'RCB': 1, 'LM': 1, 'CM': 1, 'RM': 1, 'CF': 0},  # 2-3-0
-            # Formaciones con 3 defensas y 2 mediocampos (SIEMPRE Izq + Der)
-            {'LCB': 1, 'CB': 1, 'RCB': 1, 'LM': 1, 'CM': 0, 'RM': 1, 'CF': 0},  # 3-2-0 (med Izq+Der)
-            # Formaciones con 3 defensas y 1 mediocampo (SIEMPRE mediocampo central)
-            {'LCB': 1, 'CB': 1, 'RCB': 1, 'LM': 0, 'CM': 1, 'RM': 0, 'CF': 1},  # 3-1-1 (CM central)
-            # Formaciones con 2 defensas y 1 mediocampo (SIEMPRE mediocampo central)
-            {'LCB': 1, 'CB': 0, 'RCB': 1, 'LM': 0, 'CM': 1, 'RM': 0, 'CF': 2},  # 2-1-2 (CM central)
-            # Formaciones con 1 defensa y 3 mediocampos (SIEMPRE defensa central)
-            {'LCB': 0, 'CB': 1, 'RCB': 0, 'LM': 1, 'CM': 1, 'RM': 1, 'CF': 1},  # 1-3-1 (CB central)
-        ]
-    elif jugadores_campo == 6:
-        # Formaciones para equipos de 7 (1 GK + 6 campo)
-        # REGLA: Cada posición máximo 1 jugador, hasta 3 defensas
-        # IMPORTANTE: 2 defensas = LCB + RCB (no CB), 2 mediocampos = LM + RM (no CM)
-        formaciones_basicas = [
-            # Formaciones con 2 defensas (SIEMPRE Izq + Der) y 2 mediocampos (SIEMPRE Izq + Der)
-            {'LCB': 1, 'CB': 0, 'RCB': 1, 'LM': 1, 'CM': 0, 'RM': 1, 'CF': 1},  # 2-2-1 (def Izq+Der, med Izq+Der)
-            {'LCB': 1, 'CB': 0, 'RCB': 1, 'LM': 1, 'CM': 0, 'RM': 1, 'CF': 2},  # 2-2-2 (def Izq+Der, med Izq+Der)
-            # Formaciones con 2 defensas (SIEMPRE Izq + Der) y 3 mediocampos
-            {'LCB': 1, 'CB': 0, 'RCB': 1, 'LM': 1, 'CM': 1, 'RM': 1, 'CF': 1},  # 2-3-1 clásico
-            {'LCB': 1, 'CB': 0, 'RCB': 1, 'LM': 1, 'CM': 1, 'RM': 1, 'CF': 0},  # 2-3-0
-            # Formaciones con 3 defensas y 2 mediocampos (SIEMPRE Izq + Der)
-            {'LCB': 1, 'CB': 1, 'RCB': 1, 'LM': 1, 'CM': 0, 'RM': 1, 'CF': 1},  # 3-2-1 (med Izq+Der)
-            # Formaciones con 3 defensas y 3 mediocampos
-            {'LCB': 1, 'CB': 1, 'RCB': 1, 'LM': 1, 'CM': 1, 'RM': 1, 'CF': 0},  # 3-3-0
-            # Formaciones con 3 defensas y 1 mediocampo (SIEMPRE mediocampo central)
-            {'LCB': 1, 'CB': 1, 'RCB': 1, 'LM': 0, 'CM': 1, 'RM': 0, 'CF': 1},  # 3-1-1 (CM central)
-            # Formaciones con 2 defensas y 1 mediocampo (SIEMPRE mediocampo central)
-            {'LCB': 1, 'CB': 0, 'RCB': 1, 'LM': 0, 'CM': 1, 'RM': 0, 'CF': 2},  # 2-1-2 (CM central)
-            # Formaciones con 1 defensa y 3 mediocampos (SIEMPRE defensa central)
-            {'LCB': 0, 'CB': 1, 'RCB': 0, 'LM': 1, 'CM': 1, 'RM': 1, 'CF': 1},  # 1-3-1 (CB central)
-        ]
-    else:
-        return []
     
-    # ✅ VALIDACIÓN ESTRICTA: Cada posición máximo 1 jugador
-    formaciones_validas = []
-    for formacion in formaciones_basicas:
-        total = sum(formacion.values())
-        
-        # Verificar que TODAS las posiciones tengan máximo 1 jugador
-        if (all(v <= 1 for v in formacion.values()) and
-            total == jugadores_campo):
-            formaciones_validas.append(formacion)
-        else:
-            print(f"⚠️  Formación inválida descartada: {formacion}")
-    
-    return formaciones_validas
+    Las formaciones salen de las reglas de formaciones.py (plantilla en formaciones.json)
+    y se calculan una sola vez por tamaño. Devuelve [] si no hay ninguna.
+    """
+    return generar_formaciones(jugadores_campo)
 
 def calcular_puntaje_formacion(jugadores_asignados, formacion):
     """Calcula el puntaje total de una formación específica considerando solo posiciones válidas"""
+    jugadores_asignados = asegurar_jugadores(jugadores_asignados)
     puntaje_total = 0
     jugadores_usados = []
     
-    posiciones = ['LCB', 'CB', 'RCB', 'LM', 'CM', 'RM', 'CF']
-    
     idx_jugador = 1  # Empezar desde 1 (índice 0 es el arquero)
     
-    for posicion in posiciones:
-        cantidad = formacion[posicion]
+    for posicion, cantidad in formacion.items():
+        base = posicion_base(posicion)
+        columna = INDICE_POSICION[base]
         for _ in range(cantidad):
             if idx_jugador < len(jugadores_asignados):
                 jugador = jugadores_asignados[idx_jugador]
                 
                 # Verificar si el jugador puede jugar en esta posición
-                posiciones_validas = [pos.strip() for pos in jugador['posicion'].split(',')]
-                if posicion in posiciones_validas:
-                    puntaje_posicion = jugador['puntajes_posicion'][posicion]
+                if jugador.elegibles & BIT_POSICION[base]:
+                    puntaje_posicion = jugador.puntajes[columna]
                 else:
                     # Penalizar si no puede jugar en esta posición
-                    puntaje_posicion = jugador['puntajes_posicion'][posicion] * 0.3  # Reducir a 30%
+                    puntaje_posicion = jugador.puntajes[columna] * 0.3  # Reducir a 30%
                 
                 puntaje_total += puntaje_posicion
-                jugadores_usados.append((jugador['nombre'], posicion, puntaje_posicion))
+                jugadores_usados.append((jugador.nombre, posicion, puntaje_posicion))
                 idx_jugador += 1
     
     return puntaje_total, jugadores_usados
 
-def optimizar_posiciones_equipo(jugadores_equipo, permitir_fuera_posicion=False):
-    """Optimiza las posiciones para un equipo específico - FLEXIBLE para 6 o 7 jugadores"""
-    if len(jugadores_equipo) not in [6, 7]:
+def optimizar_posiciones_equipo(jugadores_equipo, permitir_fuera_posicion=False, cache=None):
+    """Optimiza las posiciones para un equipo específico - cualquier tamaño con formaciones en la plantilla
+    
+    Args:
+        jugadores_equipo: Jugadores del equipo, con el arquero en la primera posición
+        permitir_fuera_posicion: Si True, permite jugadores en posiciones que no están en su lista
+        cache: CacheEvaluaciones opcional (ver cache_evaluaciones.py) para no repetir
+               la optimización de un equipo ya evaluado
+    """
+    formaciones_posibles = generar_formaciones_posibles(len(jugadores_equipo) - 1)
+    if not formaciones_posibles:
         return None, 0, []
     
+    jugadores_equipo = asegurar_jugadores(jugadores_equipo)
+    
     # El primer jugador debe ser el mejor arquero
     arquero = jugadores_equipo[0]
     jugadores_campo = jugadores_equipo[1:]
     
-    # Generar formaciones según el número de jugadores de campo
-    if len(jugadores_campo) == 5:  # Equipos de 6 total
-        formaciones_posibles = generar_formaciones_posibles(5)
-    elif len(jugadores_campo) == 6:  # Equipos de 7 total  
-        formaciones_posibles = generar_formaciones_posibles(6)
+    if cache is not None:
+        clave = cache.clave(arquero, jugadores_campo, permitir_fuera_posicion)
+        evaluacion = cache.obtener(clave)
+        if evaluacion is not None:
+            return evaluacion
+        # Orden canónico: el mismo equipo da la misma asignación sin importar el orden de llegada
+        jugadores_campo = cache.ordenar(jugadores_campo)
+    
+    # Formación y asignación juntas (formacion_dp.py) cuando la plantilla lo hace conveniente
+    if conviene_dp(len(jugadores_campo)):
+        mejor_formacion, mejor_puntaje, mejor_asignacion = optimizar_formacion_dp(jugadores_campo, permitir_fuera_posicion)
     else:
-        return None, 0, []
+        mejor_formacion, mejor_puntaje, mejor_asignacion = optimizar_por_formaciones(
+            jugadores_campo, formaciones_posibles, permitir_fuera_posicion)
+    
+    if cache is not None:
+        cache.guardar(clave, (mejor_formacion, mejor_puntaje, mejor_asignacion))
+    
+    return mejor_formacion, mejor_puntaje, mejor_asignacion
+
+def optimizar_por_formaciones(jugadores_campo, formaciones_posibles, permitir_fuera_posicion=False):
+    """Prueba cada formación con asignar_flexible y se queda con la de mayor puntaje
     
+    Returns:
+        tuple: (formacion, puntaje, asignacion)
+    """
     mejor_formacion = None
     mejor_puntaje = -1
     mejor_asignacion = []
@@ -376,92 +287,168 @@ def optimizar_posiciones_equipo(jugadores_equipo, permitir_fuera_posicion=False)
     
     return mejor_formacion, mejor_puntaje, mejor_asignacion
 
-def asignar_flexible(jugadores_campo, formacion, permitir_fuera_posicion=False):
-    """Asigna jugadores a posiciones específicas - MÁXIMO 1 por posición
-    
-    IMPORTANTE: 
-    - Cada jugador solo puede estar en UNA posición específica
-    - Cada POSICIÓN solo puede tener MÁXIMO 1 jugador
-    - Usa permutaciones para garantizar óptimo global
-    - Si permitir_fuera_posicion=False, rechaza asignaciones donde jugadores no pueden jugar en su posición
+def _posiciones_necesarias(formacion, num_jugadores):
+    """Expande la formación a la lista ordenada de posiciones a cubrir
+
+    Returns:
+        list | None: Posiciones en orden, o None si la formación no calza o repite posiciones
     """
     posiciones_necesarias = []
-    
+
     # Crear lista de posiciones necesarias según la formación
     for posicion, cantidad in formacion.items():
         for _ in range(cantidad):
             posiciones_necesarias.append(posicion)
-    
-    if len(posiciones_necesarias) != len(jugadores_campo):
-        return 0, []
-    
+
+    if len(posiciones_necesarias) != num_jugadores:
+        return None
+
     # ✅ VALIDACIÓN CRÍTICA: Verificar que no hay posiciones duplicadas en la formación
     contador_posiciones = {}
     for posicion in posiciones_necesarias:
         contador_posiciones[posicion] = contador_posiciones.get(posicion, 0) + 1
-    
+
     for posicion, cantidad in contador_posiciones.items():
         if cantidad > 1:
             print(f"⚠️  ERROR: Posición {posicion} aparece {cantidad} veces en formación {formacion}")
-            return 0, []  # Formación inválida
-    
-    import itertools
-    mejor_puntaje = 0
-    mejor_asignacion = []
-    
-    # Probar todas las permutaciones (para 5-6 jugadores es factible)
-    for permutacion in itertools.permutations(jugadores_campo):
-        puntaje_total = 0
-        asignacion_temp = []
-        jugadores_usados = set()
-        posiciones_usadas = set()
-        valida = True
-        
-        for i, jugador in enumerate(permutacion):
-            posicion = posiciones_necesarias[i]
-            
-            # ✅ VERIFICACIÓN 1: Cada jugador solo una vez
-            if jugador['nombre'] in jugadores_usados:
-                valida = False
-                break
-            
-            # ✅ VERIFICACIÓN 2: Cada posición solo una vez
-            if posicion in posiciones_usadas:
-                valida = False
-                break
-            
-            # 🆕 VERIFICACIÓN 3: Si no se permiten jugadores fuera de posición, verificar que puede jugar ahí
-            if not permitir_fuera_posicion and not puede_jugar_posicion(jugador, posicion, False):
-                valida = False
+            return None  # Formación inválida
+
+    return posiciones_necesarias
+
+def _hungaro_minimo(costos):
+    """Algoritmo húngaro (Kuhn-Munkres) O(n³) sobre una matriz cuadrada de costos enteros
+
+    Returns:
+        list: asignacion[fila] = columna, minimizando la suma de costos
+    """
+    n = len(costos)
+    infinito = float('inf')
+    u = [0] * (n + 1)
+    v = [0] * (n + 1)
+    p = [0] * (n + 1)
+    camino = [0] * (n + 1)
+
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = [infinito] * (n + 1)
+        usado = [False] * (n + 1)
+        while True:
+            usado[j0] = True
+            i0 = p[j0]
+            fila = costos[i0 - 1]
+            delta = infinito
+            j1 = 0
+            for j in range(1, n + 1):
+                if not usado[j]:
+                    actual = fila[j - 1] - u[i0] - v[j]
+                    if actual < minv[j]:
+                        minv[j] = actual
+                        camino[j] = j0
+                    if minv[j] < delta:
+                        delta = minv[j]
+                        j1 = j
+            for j in range(n + 1):
+                if usado[j]:
+                    u[p[j]] += delta
+                    v[j] -= delta
+                else:
+                    minv[j] -= delta
+            j0 = j1
+            if p[j0] == 0:
                 break
-            
-            jugadores_usados.add(jugador['nombre'])
-            posiciones_usadas.add(posicion)
-            
-            # Usar puntaje de la posición
-            puntaje = jugador['puntajes_posicion'][posicion]
-            puntaje_total += puntaje
-            asignacion_temp.append((jugador['nombre'], posicion, puntaje))
-        
-        # ✅ VERIFICACIÓN FINAL: Todos los jugadores y posiciones fueron usados y asignación es válida
-        if valida and len(jugadores_usados) == len(jugadores_campo) and len(posiciones_usadas) == len(posiciones_necesarias):
-            if puntaje_total > mejor_puntaje:
-                mejor_puntaje = puntaje_total
-                mejor_asignacion = asignacion_temp
-    
-    return mejor_puntaje, mejor_asignacion
+        # Reconstruir el camino aumentante
+        while j0:
+            j1 = camino[j0]
+            p[j0] = p[j1]
+            j0 = j1
+
+    asignacion = [0] * n
+    for j in range(1, n + 1):
+        asignacion[p[j] - 1] = j - 1
+    return asignacion
+
+def asignar_flexible(jugadores_campo, formacion, permitir_fuera_posicion=False):
+    """Asigna jugadores a posiciones específicas - MÁXIMO 1 por posición
+
+    IMPORTANTE:
+    - Cada jugador solo puede estar en UNA posición específica
+    - Cada POSICIÓN solo puede tener MÁXIMO 1 jugador
+    - Resuelve el problema de asignación con el algoritmo húngaro (O(n³)) sobre
+      la matriz posiciones×jugadores, con las celdas no válidas bloqueadas
+    - Si permitir_fuera_posicion=False, rechaza asignaciones donde jugadores no pueden jugar en su posición
+    - Ante empates devuelve la misma asignación que el recorrido de permutaciones
+      (la primera en orden lexicográfico), ver verificar_asignacion.py
+    """
+    posiciones_necesarias = _posiciones_necesarias(formacion, len(jugadores_campo))
+    if posiciones_necesarias is None:
+        return 0, []
+
+    n = len(jugadores_campo)
+    if n == 0:
+        return 0, []
+
+    jugadores_campo = asegurar_jugadores(jugadores_campo)
+    bases = [posicion_base(posicion) for posicion in posiciones_necesarias]
+    columnas_posicion = [INDICE_POSICION[base] for base in bases]
+
+    # Matriz de puntajes enteros (escalados por ESCALA_PUNTAJE) y celdas válidas (posición x jugador)
+    puntajes = [[jugador.puntajes_enteros[columna] for jugador in jugadores_campo] for columna in columnas_posicion]
+    if permitir_fuera_posicion:
+        validas = [[True] * n for _ in posiciones_necesarias]
+    else:
+        validas = [[bool(jugador.elegibles & BIT_POSICION[base]) for jugador in jugadores_campo]
+                   for base in bases]
+
+    # Desempate lexicográfico: la posición i pesa n^(n-1-i), así la permutación
+    # lexicográficamente menor entre las óptimas tiene el menor costo
+    pesos_desempate = [n ** (n - 1 - i) for i in range(n)]
+    multiplicador = n ** n
+    maximo = max(abs(p) for fila in puntajes for p in fila)
+    prohibido = 2 * n * (maximo * multiplicador + multiplicador) + 1
+
+    costos = []
+    for i in range(n):
+        fila = []
+        for j in range(n):
+            if validas[i][j]:
+                fila.append(-puntajes[i][j] * multiplicador + j * pesos_desempate[i])
+            else:
+                fila.append(prohibido)
+        costos.append(fila)
+
+    columnas = _hungaro_minimo(costos)
+
+    puntaje_total = 0
+    asignacion = []
+    for i, j in enumerate(columnas):
+        if not validas[i][j]:
+            return 0, []  # No existe asignación válida para esta formación
+        jugador = jugadores_campo[j]
+        puntaje = jugador.puntajes[columnas_posicion[i]]
+        puntaje_total += puntaje
+        asignacion.append((jugador.nombre, posiciones_necesarias[i], puntaje))
+
+    if puntaje_total <= 0:
+        return 0, []
+
+    return puntaje_total, asignacion
 
 def puede_jugar_posicion(jugador, posicion, permitir_fuera_posicion=False):
     """Verifica si un jugador puede jugar en una posición específica
     
     Args:
         jugador: Diccionario con datos del jugador
-        posicion: Posición a verificar (ej: 'GK', 'LCB', etc.)
+        posicion: Posición a verificar (ej: 'GK', 'LCB', o una de formaciones.json con equivalencia)
         permitir_fuera_posicion: Si True, permite cualquier jugador en cualquier posición
     """
     if permitir_fuera_posicion:
         return True
     
+    posicion = posicion_base(posicion)
+    if isinstance(jugador, Jugador):
+        return bool(jugador.elegibles & BIT_POSICION[posicion])
+    
     posiciones_validas = [pos.strip() for pos in jugador['posicion'].split(',')]
     return posicion in posiciones_validas
 
@@ -510,6 +497,8 @@ def validar_equipos_sin_duplicados(equipo1, equipo2, info_sorteo):
     
     # ✅ VALIDACIÓN ESTRICTA: MÁXIMO 1 jugador por cada posición (sin excepciones)
     posiciones_validas = ['GK', 'LCB', 'CB', 'RCB', 'LM', 'CM', 'RM', 'CF']
+    # Posiciones extra de la plantilla (por ejemplo carrileros) también se validan
+    posiciones_validas += sorted((set(posiciones_eq1) | set(posiciones_eq2)) - set(posiciones_validas))
     
     for posicion in posiciones_validas:
         # Equipo 1
@@ -539,276 +528,621 @@ def validar_equipos_sin_duplicados(equipo1, equipo2, info_sorteo):
         
         # Mostrar distribución de posiciones
         print("   📊 Distribución Equipo Rojo:")
-        for pos in ['GK', 'LCB', 'CB', 'RCB', 'LM', 'CM', 'RM', 'CF']:
+        for pos in posiciones_validas:
             cantidad = len(posiciones_eq1[pos]) if pos in posiciones_eq1 else 0
             print(f"      {pos}: {cantidad} jugador" + ("" if cantidad == 1 else "es"))
         
         print("   📊 Distribución Equipo Negro:")
-        for pos in ['GK', 'LCB', 'CB', 'RCB', 'LM', 'CM', 'RM', 'CF']:
+        for pos in posiciones_validas:
             cantidad = len(posiciones_eq2[pos]) if pos in posiciones_eq2 else 0
             print(f"      {pos}: {cantidad} jugador" + ("" if cantidad == 1 else "es"))
         
         return True
 
-def sorteo_con_posiciones_especificas(jugadores, num_intentos=10000, jugadores_por_equipo=6, margen_error=0.3, permitir_fuera_posicion=False):
-    """Realiza el sorteo optimizando posiciones específicas - FLEXIBLE para 6 o 7 jugadores por equipo
-    
-    REGLA CRÍTICA: Los 2 mejores jugadores SIEMPRE quedan en equipos separados
-    
-    Args:
-        jugadores: Lista de jugadores con sus datos
-        num_intentos: Número máximo de intentos de optimización
-        jugadores_por_equipo: Jugadores por equipo (6 o 7)
-        margen_error: Margen de error aceptable en diferencia de promedios (por ejemplo, 0.3 puntos)
-        permitir_fuera_posicion: Si True, permite jugadores en posiciones que no están en su lista
+def _preparar_sorteo(jugadores, permitir_fuera_posicion=False, mostrar=True):
+    """Identifica los 2 mejores jugadores y ordena los candidatos a arquero
+
+    Returns:
+        tuple: (mejor_jugador, segundo_mejor_jugador, jugadores_sorted_gk)
     """
-    if len(jugadores) % 2 != 0:
-        print("❌ Error: Número impar de jugadores")
-        return None, None, None
-    
     # 🆕 IDENTIFICAR LOS 2 MEJORES JUGADORES
-    jugadores_ordenados = sorted(jugadores, key=lambda j: j['puntaje'], reverse=True)
+    jugadores_ordenados = sorted(jugadores, key=lambda j: j.puntaje, reverse=True)
     mejor_jugador = jugadores_ordenados[0]
     segundo_mejor_jugador = jugadores_ordenados[1]
     
-    print(f"\n👑 Mejores jugadores (deben estar separados):")
-    print(f"   1️⃣  {mejor_jugador['nombre']} (Puntaje: {mejor_jugador['puntaje']})")
-    print(f"   2️⃣  {segundo_mejor_jugador['nombre']} (Puntaje: {segundo_mejor_jugador['puntaje']})")
-    print(f"   Se garantizará que queden en equipos DIFERENTES\n")
+    if mostrar:
+        print(f"\n👑 Mejores jugadores (deben estar separados):")
+        print(f"   1️⃣  {mejor_jugador.nombre} (Puntaje: {mejor_jugador.puntaje})")
+        print(f"   2️⃣  {segundo_mejor_jugador.nombre} (Puntaje: {segundo_mejor_jugador.puntaje})")
+        print(f"   Se garantizará que queden en equipos DIFERENTES\n")
     
     # Identificar mejores arqueros que PUEDEN jugar en GK
     arqueros_validos = [j for j in jugadores if puede_jugar_posicion(j, 'GK', permitir_fuera_posicion)]
     if len(arqueros_validos) < 2:
-        if not permitir_fuera_posicion:
+        if not permitir_fuera_posicion and mostrar:
             print("⚠️  Advertencia: Menos de 2 arqueros válidos disponibles")
-        jugadores_sorted_gk = sorted(jugadores, key=lambda j: j['puntajes_posicion']['GK'], reverse=True)
+        jugadores_sorted_gk = sorted(jugadores, key=lambda j: j.puntajes[COLUMNA_GK], reverse=True)
     else:
-        jugadores_sorted_gk = sorted(arqueros_validos, key=lambda j: j['puntajes_posicion']['GK'], reverse=True)
+        jugadores_sorted_gk = sorted(arqueros_validos, key=lambda j: j.puntajes[COLUMNA_GK], reverse=True)
     
-    mejor_diferencia = float('inf')
-    mejor_equipo1 = None
-    mejor_equipo2 = None
-    mejor_info = None
+    return mejor_jugador, segundo_mejor_jugador, jugadores_sorted_gk
+
+def evaluar_division(equipo1_temp, equipo2_temp, mejor_jugador, segundo_mejor_jugador, jugadores_sorted_gk, permitir_fuera_posicion=False, cache=None, perfil=None):
+    """Elige arqueros y optimiza formaciones para una división ya hecha de los jugadores
     
-    print(f"🔄 Generando equipos con posiciones específicas ({num_intentos} intentos)...")
+    Args:
+        perfil: PerfilSorteo opcional (ver perfil_sorteo.py) que acumula tiempos y contadores
     
-    for intento in range(num_intentos):
-        # 🆕 GARANTIZAR SEPARACIÓN DE MEJORES JUGADORES
-        # Asignar mejor_jugador al equipo 1 y segundo_mejor_jugador al equipo 2
-        equipo1_temp = [mejor_jugador]
-        equipo2_temp = [segundo_mejor_jugador]
-        
-        # Obtener los otros jugadores (sin los 2 mejores)
-        otros_jugadores = [j for j in jugadores if j not in [mejor_jugador, segundo_mejor_jugador]]
-        random.shuffle(otros_jugadores)
-        
-        # Distribuir los jugadores restantes de forma balanceada
-        mitad = len(otros_jugadores) // 2
-        equipo1_temp.extend(otros_jugadores[:mitad])
-        equipo2_temp.extend(otros_jugadores[mitad:])
-        
-        # Asegurar que cada equipo tenga un buen arquero (si no es ya un mejor jugador)
-        mejores_arqueros = jugadores_sorted_gk[:6]  # Top 6 arqueros
-        
-        arquero1 = None
-        arquero2 = None
-        
-        # Si el mejor o segundo mejor jugador puede jugar en GK, usarlos
-        if puede_jugar_posicion(mejor_jugador, 'GK', permitir_fuera_posicion) and mejor_jugador in equipo1_temp:
-            arquero1 = mejor_jugador
-        elif puede_jugar_posicion(segundo_mejor_jugador, 'GK', permitir_fuera_posicion) and segundo_mejor_jugador in equipo2_temp:
-            arquero2 = segundo_mejor_jugador
-        
-        # Buscar arqueros para equipos que los necesitan
-        for jugador in mejores_arqueros:
-            if arquero1 is None and jugador in equipo1_temp and puede_jugar_posicion(jugador, 'GK', permitir_fuera_posicion):
-                arquero1 = jugador
-            elif arquero2 is None and jugador in equipo2_temp and puede_jugar_posicion(jugador, 'GK', permitir_fuera_posicion):
-                arquero2 = jugador
-        
-        # Si no encontramos arqueros válidos, usar los mejores disponibles
-        if arquero1 is None:
-            candidatos = [j for j in equipo1_temp if puede_jugar_posicion(j, 'GK', permitir_fuera_posicion)]
-            if candidatos:
-                arquero1 = max(candidatos, key=lambda j: j['puntajes_posicion']['GK'])
-            else:
-                arquero1 = max(equipo1_temp, key=lambda j: j['puntajes_posicion']['GK'])
-                
-        if arquero2 is None:
-            candidatos = [j for j in equipo2_temp if puede_jugar_posicion(j, 'GK', permitir_fuera_posicion)]
-            if candidatos:
-                arquero2 = max(candidatos, key=lambda j: j['puntajes_posicion']['GK'])
-            else:
-                arquero2 = max(equipo2_temp, key=lambda j: j['puntajes_posicion']['GK'])
-        
-        # Reorganizar equipos con arqueros al principio
-        equipo1 = [arquero1] + [j for j in equipo1_temp if j != arquero1]
-        equipo2 = [arquero2] + [j for j in equipo2_temp if j != arquero2]
-        
-        # Optimizar posiciones para cada equipo
-        formacion1, puntaje1, asignacion1 = optimizar_posiciones_equipo(equipo1, permitir_fuera_posicion)
-        formacion2, puntaje2, asignacion2 = optimizar_posiciones_equipo(equipo2, permitir_fuera_posicion)
-        
-        # DEBUG: Mostrar información de debug cada 100 intentos
-        if (intento + 1) % 100 == 0:
-            print(f"   Intento {intento + 1}: Formación1={formacion1 is not None}, Formación2={formacion2 is not None}")
-            if formacion1 is None:
-                print(f"      ❌ Equipo1 falló: {[j['nombre'] for j in equipo1]}")
-            if formacion2 is None:
-                print(f"      ❌ Equipo2 falló: {[j['nombre'] for j in equipo2]}")
-        
-        if formacion1 is None or formacion2 is None:
+    Returns:
+        tuple: (equipo1, equipo2, info) con el arquero primero en cada equipo.
+               info es None si algún equipo no tiene formación posible.
+    """
+    if perfil is not None:
+        marca = time.perf_counter()
+    
+    # Máscaras de ids: pertenencia a un equipo en O(1) sin recorrer listas
+    mascara1 = 0
+    for jugador in equipo1_temp:
+        mascara1 |= 1 << jugador.id
+    mascara2 = 0
+    for jugador in equipo2_temp:
+        mascara2 |= 1 << jugador.id
+    bit_gk = 0 if permitir_fuera_posicion else BIT_GK  # 0 = cualquiera puede ir al arco
+    
+    # Asegurar que cada equipo tenga un buen arquero (si no es ya un mejor jugador)
+    mejores_arqueros = jugadores_sorted_gk[:6]  # Top 6 arqueros
+    
+    arquero1 = None
+    arquero2 = None
+    
+    # Si el mejor o segundo mejor jugador puede jugar en GK, usarlos
+    if (not bit_gk or mejor_jugador.elegibles & bit_gk) and mascara1 >> mejor_jugador.id & 1:
+        arquero1 = mejor_jugador
+    elif (not bit_gk or segundo_mejor_jugador.elegibles & bit_gk) and mascara2 >> segundo_mejor_jugador.id & 1:
+        arquero2 = segundo_mejor_jugador
+    
+    # Buscar arqueros para equipos que los necesitan
+    for jugador in mejores_arqueros:
+        if bit_gk and not jugador.elegibles & bit_gk:
             continue
-        
-        # Agregar puntaje del arquero (con penalización si no puede jugar GK)
-        puntaje_arquero1 = arquero1['puntajes_posicion']['GK']
-        puntaje_arquero2 = arquero2['puntajes_posicion']['GK']
-        
-        if not puede_jugar_posicion(arquero1, 'GK', permitir_fuera_posicion):
-            puntaje_arquero1 *= 0.3  # Penalizar si no puede jugar en GK
-        if not puede_jugar_posicion(arquero2, 'GK', permitir_fuera_posicion):
-            puntaje_arquero2 *= 0.3
-            
-        puntaje_total1 = puntaje1 + puntaje_arquero1
-        puntaje_total2 = puntaje2 + puntaje_arquero2
-        
-        diferencia = abs(puntaje_total1 - puntaje_total2)
-        
-        if diferencia < mejor_diferencia:
-            mejor_diferencia = diferencia
-            mejor_equipo1 = equipo1
-            mejor_equipo2 = equipo2
-            mejor_info = {
-                'formacion1': formacion1,
-                'formacion2': formacion2,
-                'puntaje1': puntaje_total1,
-                'puntaje2': puntaje_total2,
-                'asignacion1': [(arquero1['nombre'], 'GK', puntaje_arquero1)] + asignacion1,
-                'asignacion2': [(arquero2['nombre'], 'GK', puntaje_arquero2)] + asignacion2,
-                'diferencia': diferencia
-            }
+        if arquero1 is None and mascara1 >> jugador.id & 1:
+            arquero1 = jugador
+        elif arquero2 is None and mascara2 >> jugador.id & 1:
+            arquero2 = jugador
+    
+    # Si no encontramos arqueros válidos, usar los mejores disponibles
+    if arquero1 is None:
+        candidatos = [j for j in equipo1_temp if not bit_gk or j.elegibles & bit_gk]
+        arquero1 = max(candidatos or equipo1_temp, key=lambda j: j.puntajes[COLUMNA_GK])
             
-            # 🆕 MARGEN DE ERROR: Si estamos dentro del margen aceptable, parar búsqueda
-            if diferencia <= margen_error:
-                print(f"✅ Encontrado equilibrio aceptable en intento {intento + 1}: diferencia = {diferencia:.3f} (≤ {margen_error})")
-                break
-        
-        # Mostrar progreso con mejor diferencia
-        if (intento + 1) % 100 == 0:
-            print(f"   Intento {intento + 1}: Mejor diferencia = {mejor_diferencia:.3f}")
-    
-    # 🆕 VALIDACIÓN FINAL: Verificar que los 2 mejores jugadores quedaron separados
-    mejor_en_eq1 = any(j['nombre'] == mejor_jugador['nombre'] for j in mejor_equipo1)
-    mejor_en_eq2 = any(j['nombre'] == mejor_jugador['nombre'] for j in mejor_equipo2)
-    segundo_en_eq1 = any(j['nombre'] == segundo_mejor_jugador['nombre'] for j in mejor_equipo1)
-    segundo_en_eq2 = any(j['nombre'] == segundo_mejor_jugador['nombre'] for j in mejor_equipo2)
+    if arquero2 is None:
+        candidatos = [j for j in equipo2_temp if not bit_gk or j.elegibles & bit_gk]
+        arquero2 = max(candidatos or equipo2_temp, key=lambda j: j.puntajes[COLUMNA_GK])
+    
+    # Reorganizar equipos con arqueros al principio
+    equipo1 = [arquero1] + [j for j in equipo1_temp if j is not arquero1]
+    equipo2 = [arquero2] + [j for j in equipo2_temp if j is not arquero2]
+    
+    if perfil is not None:
+        marca = perfil.sumar('arqueros', marca)
+        aciertos_previos = cache.aciertos if cache is not None else 0
+    
+    # Optimizar posiciones para cada equipo
+    formacion1, puntaje1, asignacion1 = optimizar_posiciones_equipo(equipo1, permitir_fuera_posicion, cache)
+    formacion2, puntaje2, asignacion2 = optimizar_posiciones_equipo(equipo2, permitir_fuera_posicion, cache)
+    
+    if perfil is not None:
+        perfil.sumar('formaciones', marca)
+        _contar_optimizaciones(perfil, cache, aciertos_previos, len(equipo1) - 1,
+                               (formacion1 is None) + (formacion2 is None))
+    
+    if formacion1 is None or formacion2 is None:
+        return equipo1, equipo2, None
+    
+    # Agregar puntaje del arquero (con penalización si no puede jugar GK)
+    puntaje_arquero1 = arquero1.puntajes[COLUMNA_GK]
+    puntaje_arquero2 = arquero2.puntajes[COLUMNA_GK]
+    
+    if bit_gk and not arquero1.elegibles & bit_gk:
+        puntaje_arquero1 *= 0.3  # Penalizar si no puede jugar en GK
+    if bit_gk and not arquero2.elegibles & bit_gk:
+        puntaje_arquero2 *= 0.3
+        
+    puntaje_total1 = puntaje1 + puntaje_arquero1
+    puntaje_total2 = puntaje2 + puntaje_arquero2
+    
+    info = {
+        'formacion1': formacion1,
+        'formacion2': formacion2,
+        'puntaje1': puntaje_total1,
+        'puntaje2': puntaje_total2,
+        'asignacion1': [(arquero1.nombre, 'GK', puntaje_arquero1)] + asignacion1,
+        'asignacion2': [(arquero2.nombre, 'GK', puntaje_arquero2)] + asignacion2,
+        'diferencia': abs(puntaje_total1 - puntaje_total2)
+    }
+    return equipo1, equipo2, info
+
+def _contar_optimizaciones(perfil, cache, aciertos_previos, jugadores_campo, sin_formacion):
+    """Contadores de perfil de una división: equipos, optimizaciones, asignaciones y caché"""
+    contadores = perfil.contadores
+    aciertos = cache.aciertos - aciertos_previos if cache is not None else 0
+    optimizaciones = 2 - aciertos
+    contadores['equipos_evaluados'] += 2
+    contadores['optimizaciones'] += optimizaciones
+    # Una asignación por formación, o una sola si la DP resuelve formación y asignación juntas
+    por_equipo = 1 if conviene_dp(jugadores_campo) else len(generar_formaciones_posibles(jugadores_campo))
+    contadores['asignaciones'] += optimizaciones * por_equipo
+    contadores['sin_formacion'] += sin_formacion
+    if cache is not None:
+        contadores['aciertos_cache'] += aciertos
+        contadores['fallos_cache'] += optimizaciones
+
+def _verificar_separacion(mejor_jugador, segundo_mejor_jugador, mejor_equipo1, mejor_equipo2):
+    """Verifica que los 2 mejores jugadores hayan quedado en equipos distintos"""
+    mejor_en_eq1 = any(j.nombre == mejor_jugador.nombre for j in mejor_equipo1)
+    mejor_en_eq2 = any(j.nombre == mejor_jugador.nombre for j in mejor_equipo2)
+    segundo_en_eq1 = any(j.nombre == segundo_mejor_jugador.nombre for j in mejor_equipo1)
+    segundo_en_eq2 = any(j.nombre == segundo_mejor_jugador.nombre for j in mejor_equipo2)
     
     if (mejor_en_eq1 and segundo_en_eq1) or (mejor_en_eq2 and segundo_en_eq2):
         print("\n⚠️  ADVERTENCIA: Los 2 mejores jugadores quedaron en el mismo equipo")
         print(f"   Esto NO debería suceder. Revisando...")
-        return mejor_equipo1, mejor_equipo2, mejor_info
     elif mejor_en_eq1 and segundo_en_eq2:
-        print(f"\n✅ Separación correcta: {mejor_jugador['nombre']} en Equipo 1, {segundo_mejor_jugador['nombre']} en Equipo 2")
+        print(f"\n✅ Separación correcta: {mejor_jugador.nombre} en Equipo 1, {segundo_mejor_jugador.nombre} en Equipo 2")
     elif mejor_en_eq2 and segundo_en_eq1:
-        print(f"\n✅ Separación correcta: {segundo_mejor_jugador['nombre']} en Equipo 1, {mejor_jugador['nombre']} en Equipo 2")
+        print(f"\n✅ Separación correcta: {segundo_mejor_jugador.nombre} en Equipo 1, {mejor_jugador.nombre} en Equipo 2")
+
+def iterar_divisiones(jugadores, mejor_jugador, segundo_mejor_jugador):
+    """Recorre cada división distinta de los jugadores exactamente una vez
     
-    return mejor_equipo1, mejor_equipo2, mejor_info
+    Con los 2 mejores jugadores fijos en equipos distintos, para 12 o 14 jugadores
+    hay C(10,5)=252 o C(12,6)=924 divisiones. El orden es determinista.
     
-    for intento in range(num_intentos):
-        # 🆕 GARANTIZAR SEPARACIÓN DE MEJORES JUGADORES
-        # Asignar mejor_jugador al equipo 1 y segundo_mejor_jugador al equipo 2
-        equipo1_temp = [mejor_jugador]
-        equipo2_temp = [segundo_mejor_jugador]
-        
-        arquero1 = None
-        arquero2 = None
-        
-        # Asignar arqueros priorizando los que SÍ pueden jugar en GK
-        for jugador in mejores_arqueros:
-            if jugador in equipo1_temp and arquero1 is None:
-                arquero1 = jugador
-            elif jugador in equipo2_temp and arquero2 is None:
-                arquero2 = jugador
-        
-        # Si no encontramos arqueros válidos, usar los mejores disponibles
-        if arquero1 is None:
-            candidatos = [j for j in equipo1_temp if puede_jugar_posicion(j, 'GK')]
-            if candidatos:
-                arquero1 = max(candidatos, key=lambda j: j['puntajes_posicion']['GK'])
-            else:
-                arquero1 = max(equipo1_temp, key=lambda j: j['puntajes_posicion']['GK'])
-                
-        if arquero2 is None:
-            candidatos = [j for j in equipo2_temp if puede_jugar_posicion(j, 'GK', permitir_fuera_posicion)]
-            if candidatos:
-                arquero2 = max(candidatos, key=lambda j: j['puntajes_posicion']['GK'])
+    Yields:
+        tuple: (equipo1_temp, equipo2_temp)
+    """
+    otros_jugadores = [j for j in jugadores if j is not mejor_jugador and j is not segundo_mejor_jugador]
+    mitad = len(otros_jugadores) // 2
+    
+    for indices in itertools.combinations(range(len(otros_jugadores)), mitad):
+        en_equipo1 = set(indices)
+        equipo1_temp = [mejor_jugador] + [otros_jugadores[i] for i in indices]
+        equipo2_temp = [segundo_mejor_jugador] + [j for i, j in enumerate(otros_jugadores) if i not in en_equipo1]
+        yield equipo1_temp, equipo2_temp
+
+def ranking_divisiones(jugadores, permitir_fuera_posicion=False, cache=None, pesos_lineas=None):
+    """Evalúa TODAS las divisiones posibles una vez y las ordena por diferencia
+    
+    Con pesos_lineas se ordenan por el objetivo de balance_lineas.py, calculado
+    para todo el ranking de una vez (info['objetivo']).
+    
+    Returns:
+        list: [(equipo1, equipo2, info), ...] de menor a mayor diferencia.
+              Ante empates se mantiene el orden de enumeración (resultado reproducible).
+    """
+    if len(jugadores) % 2 != 0:
+        print("❌ Error: Número impar de jugadores")
+        return []
+    
+    jugadores = asegurar_jugadores(jugadores)
+    mejor_jugador, segundo_mejor_jugador, jugadores_sorted_gk = _preparar_sorteo(jugadores, permitir_fuera_posicion)
+    if cache is not None:
+        cache.preparar(jugadores)
+    
+    ranking = []
+    for equipo1_temp, equipo2_temp in iterar_divisiones(jugadores, mejor_jugador, segundo_mejor_jugador):
+        equipo1, equipo2, info = evaluar_division(equipo1_temp, equipo2_temp, mejor_jugador, segundo_mejor_jugador,
+                                                  jugadores_sorted_gk, permitir_fuera_posicion, cache)
+        if info is not None:
+            ranking.append((equipo1, equipo2, info))
+    
+    if pesos_lineas:
+        for (_, _, info), objetivo in zip(ranking, objetivos_lote([r[2] for r in ranking], pesos_lineas)):
+            info['objetivo'] = objetivo
+        ranking.sort(key=lambda r: r[2]['objetivo'])
+    else:
+        ranking.sort(key=lambda r: r[2]['diferencia'])
+    print(f"🧮 {len(ranking)} divisiones distintas evaluadas")
+    return ranking
+
+MODOS_SORTEO = ('aleatorio', 'exhaustivo', 'dos_etapas', 'local', 'ramificacion')
+# Modos que iterar_mejoras recorre división por división; 'local' (busqueda_local.py) y
+# 'ramificacion' (ramificacion_poda.py) tienen su propia búsqueda y no entregan mejoras progresivas
+MODOS_PROGRESIVOS = ('aleatorio', 'exhaustivo', 'dos_etapas')
+
+def iterar_mejoras(jugadores, num_intentos=None, margen_error=None, permitir_fuera_posicion=False, modo='aleatorio',
+                   tiempo_limite_ms=None, cache=None, detener=None, rng=None,
+                   tamano_lote=2000, fraccion_sobrevivientes=0.2, alternativas=None, restricciones=None,
+                   pesos_lineas=None, repeticion=None, prediccion=None, perfil=None):
+    """Búsqueda 'anytime': entrega cada nueva mejor división apenas se encuentra
+    
+    La búsqueda termina al agotar num_intentos, al cumplir margen_error, al vencer
+    tiempo_limite_ms, cuando detener lo indica o cuando quien consume el generador
+    deja de pedir resultados. Así la latencia queda acotada sin importar el plantel.
+    
+    Args:
+        jugadores: Lista de jugadores (número par)
+        num_intentos: Máximo de divisiones a evaluar (None = sin límite de intentos)
+        margen_error: Si una división queda dentro de este margen, se entrega y se termina
+        permitir_fuera_posicion: Si True, permite jugadores en posiciones que no están en su lista
+        modo: 'aleatorio', 'exhaustivo' (recorre todas las divisiones en orden fijo) o
+              'dos_etapas' (filtro grueso por puntaje general antes de optimizar posiciones)
+        tiempo_limite_ms: Plazo en milisegundos, por ejemplo 300 = "lo mejor posible en 300 ms"
+        cache: CacheEvaluaciones opcional
+        detener: threading.Event o función sin argumentos que devuelve True para cortar
+        rng: random.Random a usar en modo aleatorio (por defecto el módulo random)
+        tamano_lote: Candidatos por lote del filtro grueso (modo 'dos_etapas')
+        fraccion_sobrevivientes: Cuantil de desbalance que pasa a la optimización completa (se relaja si no aparecen divisiones nuevas)
+        alternativas: TopDivisiones opcional al que se ofrece cada división evaluada
+        restricciones: dict declarativo o RestriccionesCompiladas (ver restricciones.py); las
+                       divisiones que no cumplen se descartan sin optimizar posiciones
+        pesos_lineas: dict de pesos de balance_lineas.py; si se indica, se compara por
+                      info['objetivo'] (total + diferencias por línea) en vez de la diferencia
+                      total, y margen_error se aplica a ese objetivo
+        repeticion: PenalizacionRepeticion opcional (ver coocurrencia.py); su penalización
+                    por duplas repetidas se suma a lo que se compara (info['repeticion'])
+        prediccion: PrediccionElo opcional (ver ratings_elo.py); suma peso · |P(gana rojo) - 0.5|
+                    y deja info['prob_rojo'] e info['prediccion']
+        perfil: PerfilSorteo opcional (ver perfil_sorteo.py): tiempos por fase, contadores y
+                motivo de fin de la búsqueda
+    
+    Yields:
+        dict: {'equipo1', 'equipo2', 'info', 'diferencia', 'intento', 'ms'} (y 'objetivo'
+              con pesos_lineas, repeticion o prediccion); en modo
+              'dos_etapas' también 'etapas', con los contadores de filtro_grueso.py
+              (el mismo dict se sigue actualizando hasta que termina la búsqueda)
+    
+    Raises:
+        ValueError: Si el modo no está en MODOS_PROGRESIVOS (se avisa al llamar, no al iterar)
+    """
+    if modo not in MODOS_PROGRESIVOS:
+        raise ValueError(f"El modo '{modo}' no entrega mejoras progresivas (disponibles: {', '.join(MODOS_PROGRESIVOS)})")
+    return _iterar_mejoras(jugadores, num_intentos, margen_error, permitir_fuera_posicion, modo, tiempo_limite_ms,
+                           cache, detener, rng, tamano_lote, fraccion_sobrevivientes, alternativas, restricciones,
+                           pesos_lineas, repeticion, prediccion, perfil)
+
+def _iterar_mejoras(jugadores, num_intentos=None, margen_error=None, permitir_fuera_posicion=False, modo='aleatorio',
+                    tiempo_limite_ms=None, cache=None, detener=None, rng=None,
+                    tamano_lote=2000, fraccion_sobrevivientes=0.2, alternativas=None, restricciones=None,
+                    pesos_lineas=None, repeticion=None, prediccion=None, perfil=None):
+    """Generador de iterar_mejoras (con el modo ya validado)"""
+    if len(jugadores) % 2 != 0:
+        return
+    
+    jugadores = asegurar_jugadores(jugadores)
+    mejor_jugador, segundo_mejor_jugador, jugadores_sorted_gk = _preparar_sorteo(jugadores, permitir_fuera_posicion, mostrar=False)
+    if cache is not None:
+        cache.preparar(jugadores)
+    if restricciones is not None and not isinstance(restricciones, RestriccionesCompiladas):
+        restricciones = compilar_restricciones(restricciones, jugadores)
+    if detener is not None and hasattr(detener, 'is_set'):
+        detener = detener.is_set
+    if num_intentos is None and tiempo_limite_ms is None and detener is None and modo != 'exhaustivo':
+        num_intentos = 10000  # Sin ningún límite la búsqueda aleatoria no terminaría
+    rng = rng or random
+    
+    inicio = time.perf_counter()
+    plazo = inicio + tiempo_limite_ms / 1000 if tiempo_limite_ms is not None else None
+    
+    etapas = None
+    if modo == 'exhaustivo':
+        divisiones = iterar_divisiones(jugadores, mejor_jugador, segundo_mejor_jugador)
+    elif modo == 'dos_etapas':
+        etapas = nuevos_contadores()
+        divisiones = divisiones_dos_etapas(jugadores, mejor_jugador, segundo_mejor_jugador, rng,
+                                           tamano_lote, fraccion_sobrevivientes, etapas)
+    else:
+        divisiones = _divisiones_aleatorias(jugadores, mejor_jugador, segundo_mejor_jugador, rng)
+    
+    mejor_valor = float('inf')
+    motivo = 'interrumpido'  # Si quien consume el generador deja de pedir resultados
+    marca = time.perf_counter() if perfil is not None else None
+    try:
+        for intento, (equipo1_temp, equipo2_temp) in enumerate(divisiones, 1):
+            if perfil is not None:
+                marca = perfil.sumar('divisiones', marca)
+                perfil.contadores['divisiones'] += 1
+            # Rechazo en O(1) por restricciones, antes de optimizar posiciones (igual cuenta como intento)
+            rechazada = restricciones and not restricciones.cumple(mascara_equipo(equipo1_temp))
+            if perfil is not None and restricciones:
+                perfil.sumar('validacion', marca)
+            if rechazada:
+                info = None
             else:
-                arquero2 = max(equipo2_temp, key=lambda j: j['puntajes_posicion']['GK'])
-        
-        # Reorganizar equipos con arqueros al principio
-        equipo1 = [arquero1] + [j for j in equipo1_temp if j != arquero1]
-        equipo2 = [arquero2] + [j for j in equipo2_temp if j != arquero2]
-        
-        # Optimizar posiciones para cada equipo
-        formacion1, puntaje1, asignacion1 = optimizar_posiciones_equipo(equipo1, permitir_fuera_posicion)
-        formacion2, puntaje2, asignacion2 = optimizar_posiciones_equipo(equipo2, permitir_fuera_posicion)
-        
-        # DEBUG: Mostrar información de debug cada 100 intentos
-        if (intento + 1) % 100 == 0:
-            print(f"   Intento {intento + 1}: Formación1={formacion1 is not None}, Formación2={formacion2 is not None}")
-            if formacion1 is None:
-                print(f"      ❌ Equipo1 falló: {[j['nombre'] for j in equipo1]}")
-            if formacion2 is None:
-                print(f"      ❌ Equipo2 falló: {[j['nombre'] for j in equipo2]}")
-        
-        if formacion1 is None or formacion2 is None:
-            continue
-        
-        # Agregar puntaje del arquero (con penalización si no puede jugar GK)
-        puntaje_arquero1 = arquero1['puntajes_posicion']['GK']
-        puntaje_arquero2 = arquero2['puntajes_posicion']['GK']
-        
-        if not puede_jugar_posicion(arquero1, 'GK', permitir_fuera_posicion):
-            puntaje_arquero1 *= 0.3  # Penalizar si no puede jugar en GK
-        if not puede_jugar_posicion(arquero2, 'GK', permitir_fuera_posicion):
-            puntaje_arquero2 *= 0.3
+                equipo1, equipo2, info = evaluar_division(equipo1_temp, equipo2_temp, mejor_jugador, segundo_mejor_jugador,
+                                                          jugadores_sorted_gk, permitir_fuera_posicion, cache, perfil)
+                if restricciones:
+                    if perfil is not None:
+                        marca = time.perf_counter()
+                    equipo1, equipo2, info = restricciones.orientar(equipo1, equipo2, info)
+                    if perfil is not None:
+                        perfil.sumar('validacion', marca)
+                if pesos_lineas and info is not None:
+                    info = dict(info, **evaluar_balance(info, pesos_lineas))
+                if repeticion and info is not None:
+                    penalizacion = repeticion.penalizacion(mascara_equipo(equipo1_temp))
+                    info = dict(info, repeticion=penalizacion,
+                                objetivo=info.get('objetivo', info['diferencia']) + penalizacion)
+                if prediccion and info is not None:
+                    prob_rojo = prediccion.probabilidad(mascara_equipo(equipo1))
+                    penalizacion = prediccion.peso * abs(prob_rojo - 0.5)
+                    info = dict(info, prob_rojo=prob_rojo, prediccion=penalizacion,
+                                objetivo=info.get('objetivo', info['diferencia']) + penalizacion)
+            ahora = time.perf_counter()
+            if etapas is not None:
+                if rechazada:
+                    etapas['rechazados_restricciones'] += 1
+                else:
+                    etapas['evaluados'] += 1
+                    if info is None:
+                        etapas['sin_formacion'] += 1
+            if alternativas is not None and info is not None:
+                alternativas.ofrecer(equipo1, equipo2, info)
             
-        puntaje_total1 = puntaje1 + puntaje_arquero1
-        puntaje_total2 = puntaje2 + puntaje_arquero2
-        
-        diferencia = abs(puntaje_total1 - puntaje_total2)
-        
-        if diferencia < mejor_diferencia:
-            mejor_diferencia = diferencia
-            mejor_equipo1 = equipo1
-            mejor_equipo2 = equipo2
-            mejor_info = {
-                'formacion1': formacion1,
-                'formacion2': formacion2,
-                'puntaje1': puntaje_total1,
-                'puntaje2': puntaje_total2,
-                'asignacion1': [(arquero1['nombre'], 'GK', puntaje_arquero1)] + asignacion1,
-                'asignacion2': [(arquero2['nombre'], 'GK', puntaje_arquero2)] + asignacion2,
-                'diferencia': diferencia
-            }
+            valor = None if info is None else info.get('objetivo', info['diferencia'])
+            if valor is not None and valor < mejor_valor:
+                mejor_valor = valor
+                mejora = {
+                    'equipo1': equipo1,
+                    'equipo2': equipo2,
+                    'info': info,
+                    'diferencia': info['diferencia'],
+                    'intento': intento,
+                    'ms': (ahora - inicio) * 1000
+                }
+                if 'objetivo' in info:
+                    mejora['objetivo'] = valor
+                if etapas is not None:
+                    mejora['etapas'] = etapas
+                yield mejora
+                if margen_error is not None and mejor_valor <= margen_error:
+                    motivo = 'margen'
+                    return
+                if modo == 'exhaustivo' and mejor_valor == 0:
+                    motivo = 'cero'
+                    return  # No se puede mejorar una diferencia de 0
             
-            # 🆕 MARGEN DE ERROR: Si estamos dentro del margen aceptable, parar búsqueda
-            if diferencia <= margen_error:
-                print(f"✅ Encontrado equilibrio aceptable en intento {intento + 1}: diferencia = {diferencia:.3f} (≤ {margen_error})")
-                break
-        
-        # Mostrar progreso con mejor diferencia
-        if (intento + 1) % 100 == 0:
-            print(f"   Intento {intento + 1}: Mejor diferencia = {mejor_diferencia:.3f}")
+            if num_intentos is not None and intento >= num_intentos:
+                motivo = 'intentos'
+                return
+            if plazo is not None and ahora >= plazo:
+                motivo = 'plazo'
+                return
+            if detener is not None and detener():
+                motivo = 'detener'
+                return
+            if perfil is not None:
+                marca = time.perf_counter()
+        motivo = 'agotado'
+    finally:
+        if perfil is not None:
+            perfil.terminar(motivo)
+
+def _divisiones_aleatorias(jugadores, mejor_jugador, segundo_mejor_jugador, rng):
+    """Genera divisiones al azar sin fin, con los 2 mejores jugadores en equipos distintos"""
+    # Obtener los otros jugadores (sin los 2 mejores)
+    otros_base = [j for j in jugadores if j is not mejor_jugador and j is not segundo_mejor_jugador]
+    mitad = len(otros_base) // 2
     
-    return mejor_equipo1, mejor_equipo2, mejor_info
+    while True:
+        # 🆕 GARANTIZAR SEPARACIÓN DE MEJORES JUGADORES
+        # Asignar mejor_jugador al equipo 1 y segundo_mejor_jugador al equipo 2
+        otros_jugadores = list(otros_base)
+        rng.shuffle(otros_jugadores)
+        yield [mejor_jugador] + otros_jugadores[:mitad], [segundo_mejor_jugador] + otros_jugadores[mitad:]
+
+def sorteo_anytime(jugadores, tiempo_limite_ms=300, callback=None, **opciones):
+    """Versión con callback de iterar_mejoras: llama callback(mejora) con cada mejora
+    
+    Returns:
+        dict | None: La última (mejor) mejora encontrada dentro del plazo
+    """
+    mejora = None
+    for mejora in iterar_mejoras(jugadores, tiempo_limite_ms=tiempo_limite_ms, **opciones):
+        if callback is not None:
+            callback(mejora)
+    return mejora
 
-def formatear_formacion(formacion):
-    """Convierte la formación a string legible"""
-    defensas = formacion['LCB'] + formacion['RCB']
-    mediocampos = formacion['LM'] + formacion['CM'] + formacion['RM']
-    delanteros = formacion['CF']
-    return f"1-{defensas}-{mediocampos}-{delanteros}"
+def sorteo_con_posiciones_especificas(jugadores, num_intentos=10000, jugadores_por_equipo=6, margen_error=0.3, permitir_fuera_posicion=False, modo='aleatorio', cache=None, num_workers=1, semilla=None, tiempo_limite_ms=None, num_alternativas=0, distancia_minima=0, restricciones=None, pesos_lineas=None, peso_repeticion=0.0, peso_prediccion=0.0, desempate_simulacion=0,
+                                      perfilar=False, archivo_perfil=None, matriz_coocurrencia=None, modelo_ratings=None):
+    """Realiza el sorteo optimizando posiciones específicas - FLEXIBLE para 6 o 7 jugadores por equipo
+    
+    REGLA CRÍTICA: Los 2 mejores jugadores SIEMPRE quedan en equipos separados
+    
+    Args:
+        jugadores: Lista de jugadores con sus datos
+        num_intentos: Número máximo de intentos de optimización (modos 'aleatorio' y 'dos_etapas')
+        jugadores_por_equipo: Jugadores por equipo (6 o 7)
+        margen_error: Margen de error aceptable en diferencia de promedios (por ejemplo, 0.3 puntos)
+        permitir_fuera_posicion: Si True, permite jugadores en posiciones que no están en su lista
+        modo: 'aleatorio' (divisiones al azar hasta num_intentos o margen_error),
+              'exhaustivo' (evalúa cada división distinta una vez y devuelve la mejor,
+              siempre la misma para los mismos jugadores) o 'dos_etapas' (como 'aleatorio',
+              pero solo optimiza las divisiones que pasan el filtro grueso; los
+              contadores de cada etapa quedan en info['etapas']) o 'local' (búsqueda
+              local por intercambios hasta quedar dentro de margen_error, para equipos
+              grandes; ver busqueda_local.py) o
+              'ramificacion' (ramificación y poda: la mejor división con garantía de
+              optimalidad, ver ramificacion_poda.py)
+        cache: CacheEvaluaciones opcional; las divisiones repetidas no se vuelven a optimizar
+        num_workers: Si es mayor que 1, reparte la búsqueda entre procesos (ver sorteo_paralelo.py;
+                     solo modos 'aleatorio' y 'exhaustivo', sin las opciones de balance, plazo,
+                     caché, alternativas, restricciones ni perfil: si se indican se avisa y se ignoran)
+        semilla: Semilla del sorteo paralelo; misma semilla y workers = mismo resultado
+        tiempo_limite_ms: Plazo opcional; al vencer se devuelve la mejor división encontrada
+        num_alternativas: Si es mayor que 0, info['alternativas'] guarda las mejores divisiones
+                          distintas vistas como [(equipo1, equipo2, info), ...] (ver alternativas.py)
+        distancia_minima: Mínimo de jugadores que deben cambiar de equipo entre dos alternativas
+        restricciones: Reglas separar/juntos/equipo_fijo como dict (ver restricciones.py); no
+                       aplican al sorteo paralelo ni a la búsqueda local
+        pesos_lineas: Pesos de balance_lineas.py para balancear también arco, defensa,
+                      mediocampo y delantera (solo modos 'aleatorio', 'exhaustivo' y 'dos_etapas')
+        peso_repeticion: Si es mayor que 0, penaliza las duplas que vienen jugando juntas
+                         según coocurrencia.py (mismos modos que pesos_lineas)
+        peso_prediccion: Si es mayor que 0, balancea también la probabilidad de victoria que
+                         predicen los ratings de ratings_elo.py (mismos modos que pesos_lineas)
+        desempate_simulacion: Si es mayor que 0, simula partidos (simulador_partidos.py) para las
+                              mejores divisiones hasta esa cantidad que quedan dentro de margen_error
+                              de la mejor, y elige la más pareja (info['simulacion'])
+        perfilar: Si True, info['perfil'] trae tiempos por fase y contadores (ver perfil_sorteo.py;
+                  solo modos 'aleatorio', 'exhaustivo' y 'dos_etapas')
+        archivo_perfil: Si se indica, el perfil también se guarda en ese JSON (implica perfilar)
+        matriz_coocurrencia, modelo_ratings: Matriz de coocurrencia.py y ratings de ratings_elo.py ya
+                                             cargados (para no releerlos en cada sorteo de un lote);
+                                             por defecto se obtienen del historial
+    """
+    if len(jugadores) % 2 != 0:
+        print("❌ Error: Número impar de jugadores")
+        return None, None, None
+    
+    if num_workers > 1:
+        from sorteo_paralelo import MODOS_PARALELOS, sorteo_paralelo
+        if modo not in MODOS_PARALELOS:
+            print(f"⚠️  El modo '{modo}' no se reparte entre procesos; se sortea en un solo proceso")
+            num_workers = 1
+    
+    if num_workers > 1:
+        # El sorteo paralelo solo usa intentos, margen, modo y semilla: se avisa de todo lo demás
+        ignoradas = [nombre for nombre, usada in (
+            ('cache', cache is not None),
+            ('tiempo_limite_ms', tiempo_limite_ms is not None),
+            ('num_alternativas', num_alternativas > 0),
+            ('desempate_simulacion', desempate_simulacion > 0),
+            ('restricciones', bool(restricciones)),
+            ('pesos_lineas', bool(pesos_lineas)),
+            ('peso_repeticion', peso_repeticion > 0),
+            ('peso_prediccion', peso_prediccion > 0),
+            ('perfilar', bool(perfilar or archivo_perfil))
+        ) if usada]
+        if ignoradas:
+            print(f"⚠️  El sorteo paralelo no usa {', '.join(ignoradas)}; se ignoran")
+        return sorteo_paralelo(jugadores, num_intentos, margen_error, permitir_fuera_posicion, modo, num_workers, semilla)
+    
+    if restricciones and modo == 'local':
+        print("⚠️  Las restricciones no aplican a la búsqueda local; se ignoran")
+    
+    if modo not in MODOS_SORTEO:
+        print(f"❌ Error: Modo de sorteo desconocido '{modo}'")
+        return None, None, None
+    
+    if not generar_formaciones_posibles(len(jugadores) // 2 - 1):
+        print(f"❌ Error: No hay formaciones para equipos de {len(jugadores) // 2} jugadores "
+              f"(agregarlas en formaciones.json)")
+        return None, None, None
+    
+    if modo == 'local':
+        from busqueda_local import sorteo_busqueda_local
+        print(f"🔄 Generando equipos de {len(jugadores) // 2} por búsqueda local ({tiempo_limite_ms or 500} ms)...")
+        return sorteo_busqueda_local(jugadores, tiempo_limite_ms or 500, permitir_fuera_posicion=permitir_fuera_posicion,
+                                     margen_error=margen_error, cache=cache)
+    
+    if modo == 'ramificacion':
+        from ramificacion_poda import sorteo_ramificacion_poda
+        print(f"🔄 Generando equipos por ramificación y poda (división óptima)...")
+        return sorteo_ramificacion_poda(jugadores, permitir_fuera_posicion, cache, tiempo_limite_ms, restricciones)
+    
+    jugadores = asegurar_jugadores(jugadores)
+    mejor_jugador, segundo_mejor_jugador, _ = _preparar_sorteo(jugadores, permitir_fuera_posicion)
+    if restricciones is not None:
+        restricciones = compilar_restricciones(restricciones, jugadores)
+    perfil = PerfilSorteo() if perfilar or archivo_perfil else None
+    candidatas = max(num_alternativas, desempate_simulacion)
+    top = TopDivisiones(candidatas, distancia_minima) if candidatas > 0 else None
+    repeticion = None
+    if peso_repeticion > 0:
+        from coocurrencia import obtener_coocurrencia, compilar_penalizacion
+        matriz = matriz_coocurrencia if matriz_coocurrencia is not None else obtener_coocurrencia()
+        repeticion = compilar_penalizacion(matriz, jugadores, peso_repeticion)
+        print(f"👥 Penalización por duplas repetidas: {len(repeticion.pares)} pares con historial")
+    prediccion = None
+    if peso_prediccion > 0:
+        from ratings_elo import obtener_ratings, compilar_prediccion
+        modelo = modelo_ratings if modelo_ratings is not None else obtener_ratings()
+        prediccion = compilar_prediccion(modelo, jugadores, peso_prediccion)
+    
+    if modo == 'exhaustivo':
+        print(f"🔄 Generando equipos con posiciones específicas (todas las divisiones)...")
+        mejoras = iterar_mejoras(jugadores, permitir_fuera_posicion=permitir_fuera_posicion, modo='exhaustivo',
+                                 tiempo_limite_ms=tiempo_limite_ms, cache=cache, alternativas=top,
+                                 restricciones=restricciones, pesos_lineas=pesos_lineas, repeticion=repeticion,
+                                 prediccion=prediccion, perfil=perfil)
+    else:
+        print(f"🔄 Generando equipos con posiciones específicas ({num_intentos} intentos)...")
+        if modo == 'dos_etapas':
+            print(f"   Filtro grueso: {'NumPy' if NUMPY_AVAILABLE else 'Python puro'}")
+        mejoras = iterar_mejoras(jugadores, num_intentos, margen_error, permitir_fuera_posicion, modo,
+                                 tiempo_limite_ms=tiempo_limite_ms, cache=cache, alternativas=top,
+                                 restricciones=restricciones, pesos_lineas=pesos_lineas, repeticion=repeticion,
+                                 prediccion=prediccion, perfil=perfil)
+    
+    mejora = None
+    for mejora in mejoras:
+        objetivo = f", objetivo = {mejora['objetivo']:.3f}" if 'objetivo' in mejora else ''
+        print(f"   Intento {mejora['intento']}: Mejor diferencia = {mejora['diferencia']:.3f}{objetivo} ({mejora['ms']:.0f} ms)")
+    
+    if restricciones:
+        print(f"🔒 Restricciones: {restricciones.rechazadas} divisiones rechazadas sin optimizar")
+    
+    if mejora is None:
+        if restricciones:
+            print("❌ Error: Ninguna división cumple las restricciones")
+        return None, None, None
+    
+    # 🆕 MARGEN DE ERROR: Si estamos dentro del margen aceptable, se paró la búsqueda
+    if modo != 'exhaustivo' and mejora['diferencia'] <= margen_error:
+        print(f"✅ Encontrado equilibrio aceptable en intento {mejora['intento']}: diferencia = {mejora['diferencia']:.3f} (≤ {margen_error})")
+    elif modo == 'exhaustivo':
+        print(f"✅ Mejor división: diferencia = {mejora['diferencia']:.3f} (división {mejora['intento']})")
+    
+    if 'lineas' in mejora['info']:
+        lineas = mejora['info']['lineas']
+        print("📐 Por línea (rojo - negro): " + ', '.join(
+            f"{linea} {valor:.1f}-{lineas['negro'][linea]:.1f}" for linea, valor in lineas['rojo'].items()))
+    
+    if 'repeticion' in mejora['info']:
+        print(f"👥 Penalización por duplas repetidas: {mejora['info']['repeticion']:.3f}")
+    if 'prob_rojo' in mejora['info']:
+        print(f"📈 Probabilidad de victoria según ratings: rojo {mejora['info']['prob_rojo']:.1%}, "
+              f"negro {1 - mejora['info']['prob_rojo']:.1%}")
+    
+    if 'etapas' in mejora:
+        etapas = dict(mejora['etapas'])
+        mejora['info']['etapas'] = etapas
+        print(f"🧪 Etapa 1: {etapas['generados']} candidatos, {etapas['descartados_grueso']} descartados por balance grueso, "
+              f"{etapas['duplicados']} repetidos")
+        print(f"🧪 Etapa 2: {etapas['evaluados']} optimizados, {etapas['sin_formacion']} sin formación posible, "
+              f"{etapas['rechazados_restricciones']} rechazados por restricciones")
+    
+    if desempate_simulacion > 0 and len(top):
+        from simulador_partidos import desempatar_por_simulacion
+        equipo1, equipo2, info = desempatar_por_simulacion(top.ordenadas()[:desempate_simulacion],
+                                                           tolerancia=margen_error)
+        mejora = dict(mejora, equipo1=equipo1, equipo2=equipo2, info=info, diferencia=info['diferencia'])
+        simulacion = info['simulacion']
+        print(f"🎲 Desempate por simulación entre {info['desempate']['simuladas']} divisiones: elegida la "
+              f"{info['desempate']['posicion'] + 1}ª (rojo {simulacion['prob_rojo']:.1%}, empate "
+              f"{simulacion['prob_empate']:.1%}, negro {simulacion['prob_negro']:.1%})")
+    
+    if num_alternativas > 0:
+        # Copia: la alternativa 0 es esta misma división y no debe contenerse a sí misma
+        mejora['info'] = dict(mejora['info'], alternativas=top.ordenadas()[:num_alternativas])
+        diferencias = ', '.join(f"{i['diferencia']:.2f}" for _, _, i in mejora['info']['alternativas'])
+        print(f"🔁 {len(mejora['info']['alternativas'])} alternativas guardadas para rotación (diferencias: {diferencias})")
+    
+    if perfil is not None:
+        mejora['info'] = dict(mejora['info'], perfil=perfil.reporte())
+        print(f"⏱️  Perfil: {perfil.resumen()}")
+        if archivo_perfil:
+            perfil.guardar(archivo_perfil)
+    
+    if cache is not None:
+        estadisticas = cache.estadisticas()
+        print(f"💾 Caché: {estadisticas['aciertos']} aciertos, {estadisticas['fallos']} fallos ({estadisticas['entradas']} equipos guardados)")
+    
+    # 🆕 VALIDACIÓN FINAL: Verificar que los 2 mejores jugadores quedaron separados
+    _verificar_separacion(mejor_jugador, segundo_mejor_jugador, mejora['equipo1'], mejora['equipo2'])
+    
+    return mejora['equipo1'], mejora['equipo2'], mejora['info']
 
 def guardar_equipos(equipo1, equipo2, info_sorteo, info_partido, jugadores_por_equipo=6):
     """Guarda los equipos en equipos.json"""
@@ -825,7 +1159,7 @@ def guardar_equipos(equipo1, equipo2, info_sorteo, info_partido, jugadores_por_e
             'RM': 'Mediocampo-Der',
             'CF': 'Delantero-Centro'
         }
-        return conversion.get(posicion_especifica, 'Mediocampo-Centro')
+        return conversion.get(posicion_base(posicion_especifica), 'Mediocampo-Centro')
     
     # Crear diccionarios de posiciones para la visualización del campo
     rojo_posiciones = {}
@@ -868,12 +1202,33 @@ def guardar_equipos(equipo1, equipo2, info_sorteo, info_partido, jugadores_por_e
         "posiciones": {
             "rojo": info_sorteo['asignacion1'],
             "negro": info_sorteo['asignacion2']
+        },
+        # Suma de puntajes por línea (arco, defensa, mediocampo, delantera)
+        "lineas": {
+            "rojo": {linea: round(valor, 2) for linea, valor in desglose_lineas(info_sorteo['asignacion1']).items()},
+            "negro": {linea: round(valor, 2) for linea, valor in desglose_lineas(info_sorteo['asignacion2']).items()}
         }
     }
+    if info_sorteo.get('suplentes'):
+        equipos_data["suplentes"] = info_sorteo['suplentes']
+    if info_sorteo.get('simulacion'):
+        equipos_data["simulacion"] = info_sorteo['simulacion']
     
     with open('equipos.json', 'w', encoding='utf-8') as f:
         json.dump(equipos_data, f, ensure_ascii=False, indent=2)
 
+# Nombres para mostrar; las posiciones nuevas de formaciones.json se muestran con su sigla
+NOMBRE_POSICION = {
+    'GK': 'Arquero',
+    'LCB': 'Defensa Izq',
+    'CB': 'Defensa Centro',
+    'RCB': 'Defensa Der',
+    'LM': 'Mediocampo Izq',
+    'CM': 'Mediocampo Centro',
+    'RM': 'Mediocampo Der',
+    'CF': 'Delantero Centro'
+}
+
 def mostrar_equipos_detallados(equipo1, equipo2, info_sorteo, info_partido, jugadores_por_equipo=6):
     """Muestra los equipos con posiciones específicas detalladas"""
     print(f"\n⚽ Partido {info_partido['fecha']} - {info_partido['hora']} - {info_partido['cancha']}")
@@ -897,19 +1252,8 @@ def mostrar_equipos_detallados(equipo1, equipo2, info_sorteo, info_partido, juga
         else:
             icono = "⚠️"  # Fuera de posición
             
-        pos_nombre = {
-            'GK': 'Arquero',
-            'LCB': 'Defensa Izq',
-            'CB': 'Defensa Centro',
-            'RCB': 'Defensa Der', 
-            'LM': 'Mediocampo Izq',
-            'CM': 'Mediocampo Centro',
-            'RM': 'Mediocampo Der',
-            'CF': 'Delantero Centro'
-        }
-        
         estado = "" if puede_jugar else " (fuera de posición)"
-        print(f"  {icono}{pos_nombre[posicion]:<15} - {nombre:<15} ({puntaje:.1f} pts en pos, {jugador_data['puntaje']:.1f} general){estado}")
+        print(f"  {icono}{NOMBRE_POSICION.get(posicion, posicion):<15} - {nombre:<15} ({puntaje:.1f} pts en pos, {jugador_data['puntaje']:.1f} general){estado}")
     
     # Equipo Negro
     formacion2_str = formatear_formacion(info_sorteo['formacion2'])
@@ -928,19 +1272,8 @@ def mostrar_equipos_detallados(equipo1, equipo2, info_sorteo, info_partido, juga
         else:
             icono = "⚠️"  # Fuera de posición
             
-        pos_nombre = {
-            'GK': 'Arquero',
-            'LCB': 'Defensa Izq',
-            'CB': 'Defensa Centro',
-            'RCB': 'Defensa Der',
-            'LM': 'Mediocampo Izq', 
-            'CM': 'Mediocampo Centro',
-            'RM': 'Mediocampo Der',
-            'CF': 'Delantero Centro'
-        }
-        
         estado = "" if puede_jugar else " (fuera de posición)"
-        print(f"  {icono}{pos_nombre[posicion]:<15} - {nombre:<15} ({puntaje:.1f} pts en pos, {jugador_data['puntaje']:.1f} general){estado}")
+        print(f"  {icono}{NOMBRE_POSICION.get(posicion, posicion):<15} - {nombre:<15} ({puntaje:.1f} pts en pos, {jugador_data['puntaje']:.1f} general){estado}")
     
     print(f"\n📊 Diferencia de promedios (por posición): {info_sorteo['diferencia']:.3f}")
     print(f"📊 Diferencia de promedios (general): {abs(promedio_general_rojo - promedio_general_negro):.3f}")
@@ -989,8 +1322,9 @@ def main():
         print("🤖 Modo automático detectado (desde jugadores_confirmados.txt)")
     print("=" * 60)
     
-    # Cargar jugadores
-    jugadores = cargar_jugadores()
+    # Cargar jugadores (plantel compacto, se convierte una sola vez)
+    plantel = Plantel.desde_archivo()
+    jugadores = plantel.jugadores
     if not jugadores:
         return
     
@@ -1005,41 +1339,23 @@ def main():
     if len(confirmados) == 12:
         print("📊 Configuración: 2 equipos de 6 jugadores (1 GK + 5 campo)")
         jugadores_por_equipo = 6
-        suplentes = []
     elif len(confirmados) == 14:
         print("📊 Configuración: 2 equipos de 7 jugadores (1 GK + 6 campo)")
         jugadores_por_equipo = 7
-        suplentes = []
     elif len(confirmados) > 14:
-        # Más de 14: usar 14 y dejar suplentes
-        arqueros = [j for j in confirmados if puede_jugar_posicion(j, 'GK')]
-        otros = [j for j in confirmados if not puede_jugar_posicion(j, 'GK')]
-        
-        if len(arqueros) >= 2:
-            confirmados_finales = arqueros[:2] + otros[:12]  # 2 arqueros + 12 de campo
-            suplentes = [j['nombre'] for j in confirmados if j not in confirmados_finales]
-            print(f"📊 Configuración: 2 equipos de 7 jugadores de {len(confirmados)} disponibles")
-            print(f"   Suplentes: {suplentes}")
-            confirmados = confirmados_finales
-            jugadores_por_equipo = 7
-        else:
-            print(f"❌ Error: Se necesitan al menos 2 arqueros válidos (tienes {len(arqueros)})")
-            return
+        # Más de 14: juegan 14 y el banco se elige dentro del sorteo (ver seleccion_suplentes.py)
+        print(f"📊 Configuración: 2 equipos de 7 jugadores de {len(confirmados)} disponibles "
+              f"({len(confirmados) - 14} suplentes)")
+        jugadores_por_equipo = 7
     elif len(confirmados) == 13:
-        # 13 jugadores: usar 12 para equipos de 6
-        arqueros = [j for j in confirmados if puede_jugar_posicion(j, 'GK')]
-        otros = [j for j in confirmados if not puede_jugar_posicion(j, 'GK')]
-        
-        if len(arqueros) >= 2:
-            confirmados_finales = arqueros[:2] + otros[:10]  # 2 arqueros + 10 de campo
-            suplentes = [j['nombre'] for j in confirmados if j not in confirmados_finales]
-            print(f"📊 Configuración: 2 equipos de 6 jugadores (1 suplente)")
-            print(f"   Suplente: {suplentes}")
-            confirmados = confirmados_finales
-            jugadores_por_equipo = 6
-        else:
-            print(f"❌ Error: Se necesitan al menos 2 arqueros válidos (tienes {len(arqueros)})")
-            return
+        # 13 jugadores: juegan 12 en equipos de 6 y el suplente se elige dentro del sorteo
+        print(f"📊 Configuración: 2 equipos de 6 jugadores (1 suplente)")
+        jugadores_por_equipo = 6
+    
+    arqueros = [j for j in confirmados if puede_jugar_posicion(j, 'GK')]
+    if len(confirmados) > 2 * jugadores_por_equipo and len(arqueros) < 2:
+        print(f"❌ Error: Se necesitan al menos 2 arqueros válidos (tienes {len(arqueros)})")
+        return
     
     print(f"👥 Jugadores confirmados: {len(confirmados)}")
     for jugador in confirmados:
@@ -1091,8 +1407,24 @@ def main():
         except ValueError:
             permitir_fuera_posicion = False
     
+    # Caché persistente: repetir el sorteo con los mismos puntajes es casi instantáneo
+    cache = CacheEvaluaciones(archivo=ARCHIVO_CACHE)
+    cache.preparar(jugadores)
+    
     # Realizar sorteo
-    equipo1, equipo2, info_sorteo = sorteo_con_posiciones_especificas(confirmados, intentos, jugadores_por_equipo, margen_error, permitir_fuera_posicion)
+    # Reglas separar/juntos/equipo_fijo de restricciones.json (si existe)
+    restricciones = cargar_restricciones()
+    if restricciones:
+        print(f"🔒 Restricciones cargadas: {', '.join(f'{clave} ({len(valor)})' for clave, valor in restricciones.items())}")
+    
+    if len(confirmados) > 2 * jugadores_por_equipo:
+        # Quiénes quedan en el banco se decide junto con el sorteo, con prioridad a los que vienen siempre
+        from seleccion_suplentes import sorteo_con_suplentes, PESO_ASISTENCIA_POR_DEFECTO
+        equipo1, equipo2, info_sorteo = sorteo_con_suplentes(confirmados, jugadores_por_equipo, intentos, margen_error, permitir_fuera_posicion,
+                                                             peso_asistencia=PESO_ASISTENCIA_POR_DEFECTO, cache=cache, restricciones=restricciones)
+    else:
+        equipo1, equipo2, info_sorteo = sorteo_con_posiciones_especificas(confirmados, intentos, jugadores_por_equipo, margen_error, permitir_fuera_posicion, cache=cache, restricciones=restricciones)
+    cache.guardar_en_disco()
     
     if equipo1 is None:
         print("❌ Error: No se pudo generar un sorteo válido")
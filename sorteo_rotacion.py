@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sorteo de 3 o 4 equipos para mini torneos con rotación (18 a 28 confirmados)
+
+Reparte k·m jugadores en k equipos de m y minimiza la distancia entre el mejor
+y el peor equipo (máximo - mínimo del puntaje por posiciones). Cada equipo se
+puntúa igual que en el sorteo de dos: mejor arquero válido más la formación y
+asignación óptimas de optimizar_posiciones_equipo.
+
+Ruptura de simetría: los k mejores jugadores quedan fijos, uno por equipo (la
+generalización de "los 2 mejores separados"). Así cada equipo queda
+identificado por su cabeza de serie y las k! permutaciones de etiquetas de una
+misma partición nunca se exploran: solo se mueven los demás jugadores.
+
+Búsqueda: reparto goloso inicial (arqueros primero, después cada jugador al
+equipo más flojo con lugar) y escalada por intercambios entre pares de equipos,
+aceptando el primero que mejora (máximo - mínimo, y ante empate la dispersión
+de los puntajes). Al atascarse se perturba la mejor partición con intercambios
+al azar, hasta agotar el plazo o empatar todos los equipos. Solo se reevalúan
+los dos equipos que cambian y cada composición de equipo se evalúa una sola vez.
+
+Uso:
+    python sorteo_rotacion.py [cantidad de equipos]
+"""
+
+import sys
+import json
+import random
+import time
+
+from plantel import INDICE_POSICION, asegurar_jugadores
+
+COLUMNA_GK = INDICE_POSICION['GK']
+COLORES_ROTACION = ('rojo', 'negro', 'blanco', 'azul')
+ARCHIVO_ROTACION = 'equipos_rotacion.json'
+PENALIZACION_SIN_FORMACION = 100.0
+
+def evaluar_equipo(miembros, permitir_fuera_posicion=False, cache=None):
+    """Arquero, formación y puntaje de un equipo suelto
+
+    Returns:
+        dict | None: {'equipo' (arquero primero), 'puntaje', 'formacion', 'asignacion', 'valido'}
+                     o None si la plantilla no tiene formaciones para ese tamaño. 'valido' es
+                     False si no se pudo ubicar a todos en la formación.
+    """
+    from sorteo_posiciones_especificas import optimizar_posiciones_equipo, puede_jugar_posicion
+
+    candidatos = [j for j in miembros if puede_jugar_posicion(j, 'GK', permitir_fuera_posicion)]
+    arquero = max(candidatos or miembros, key=lambda j: j.puntajes[COLUMNA_GK])
+    equipo = [arquero] + [j for j in miembros if j is not arquero]
+
+    formacion, puntaje, asignacion = optimizar_posiciones_equipo(equipo, permitir_fuera_posicion, cache)
+    if formacion is None:
+        return None
+    puntaje_arquero = arquero.puntajes[COLUMNA_GK]
+    if not candidatos:
+        puntaje_arquero *= 0.3  # Misma penalización que el sorteo de dos equipos
+    return {
+        'equipo': equipo,
+        'puntaje': puntaje + puntaje_arquero,
+        'formacion': formacion,
+        'asignacion': [(arquero.nombre, 'GK', puntaje_arquero)] + asignacion,
+        'valido': bool(candidatos) and len(asignacion) == len(equipo) - 1
+    }
+
+class EstadoRotacion:
+    """Partición en k equipos con las evaluaciones de cada equipo memorizadas por composición"""
+
+    def __init__(self, jugadores, num_equipos, permitir_fuera_posicion, cache):
+        self.jugadores = jugadores
+        self.num_equipos = num_equipos
+        self.permitir = permitir_fuera_posicion
+        self.cache = cache
+        self.evaluaciones = {}  # frozenset de índices -> evaluar_equipo
+
+    def evaluar(self, miembros):
+        clave = frozenset(miembros)
+        if clave not in self.evaluaciones:
+            self.evaluaciones[clave] = evaluar_equipo([self.jugadores[i] for i in sorted(miembros)],
+                                                      self.permitir, self.cache)
+        return self.evaluaciones[clave]
+
+    def puntaje(self, miembros):
+        """Puntaje del equipo con la penalización si no tiene formación válida"""
+        evaluacion = self.evaluar(miembros)
+        return evaluacion['puntaje'] - (0 if evaluacion['valido'] else PENALIZACION_SIN_FORMACION)
+
+    def objetivo(self, puntajes):
+        """(máximo - mínimo, dispersión): menor es mejor"""
+        media = sum(puntajes) / len(puntajes)
+        return (max(puntajes) - min(puntajes), sum((p - media) ** 2 for p in puntajes))
+
+def _reparto_inicial(estado, jugadores, tamano, permitir_fuera_posicion):
+    """Cabezas de serie fijas, un arquero por equipo y el resto al equipo más flojo con lugar"""
+    from sorteo_posiciones_especificas import puede_jugar_posicion
+
+    k = estado.num_equipos
+    orden = sorted(range(len(jugadores)), key=lambda i: jugadores[i].puntaje, reverse=True)
+    equipos = [[orden[t]] for t in range(k)]
+    sumas = [jugadores[orden[t]].puntaje for t in range(k)]
+    restantes = orden[k:]
+
+    # Arqueros para los equipos cuya cabeza de serie no puede atajar
+    arqueros = sorted((i for i in restantes if puede_jugar_posicion(jugadores[i], 'GK', permitir_fuera_posicion)),
+                      key=lambda i: jugadores[i].puntajes[COLUMNA_GK], reverse=True)
+    for t in range(k):
+        if not any(puede_jugar_posicion(jugadores[i], 'GK', permitir_fuera_posicion) for i in equipos[t]) and arqueros:
+            i = arqueros.pop(0)
+            equipos[t].append(i)
+            sumas[t] += jugadores[i].puntaje
+            restantes.remove(i)
+
+    for i in restantes:
+        t = min((t for t in range(k) if len(equipos[t]) < tamano), key=lambda t: sumas[t])
+        equipos[t].append(i)
+        sumas[t] += jugadores[i].puntaje
+    return equipos
+
+def sorteo_rotacion(jugadores, num_equipos=3, permitir_fuera_posicion=False, tiempo_limite_ms=1000,
+                    cache=None, rng=None):
+    """Reparte los jugadores en num_equipos equipos parejos
+
+    Args:
+        jugadores: Lista de jugadores (múltiplo de num_equipos)
+        num_equipos: Cantidad de equipos (2 a 4)
+        permitir_fuera_posicion: Si True, permite jugadores en posiciones que no están en su lista
+        tiempo_limite_ms: Plazo de la búsqueda
+        cache: CacheEvaluaciones opcional para optimizar_posiciones_equipo
+        rng: random.Random a usar (por defecto el módulo random)
+
+    Returns:
+        tuple: (equipos, info) con equipos como lista de listas (arquero primero) e info con
+               'puntajes', 'formaciones', 'asignaciones', 'rango' y 'rotacion' (contadores).
+               (None, None) si no se puede sortear.
+    """
+    if not 2 <= num_equipos <= len(COLORES_ROTACION) or len(jugadores) % num_equipos != 0:
+        print(f"❌ Error: {len(jugadores)} jugadores no se reparten en {num_equipos} equipos iguales")
+        return None, None
+
+    jugadores = asegurar_jugadores(jugadores)
+    rng = rng or random
+    inicio = time.perf_counter()
+    plazo = inicio + tiempo_limite_ms / 1000
+    tamano = len(jugadores) // num_equipos
+    if cache is not None:
+        cache.preparar(jugadores)
+
+    estado = EstadoRotacion(jugadores, num_equipos, permitir_fuera_posicion, cache)
+    equipos = _reparto_inicial(estado, jugadores, tamano, permitir_fuera_posicion)
+    if estado.evaluar(equipos[0]) is None:
+        print(f"❌ Error: No hay formaciones para equipos de {tamano} (ver formaciones.py)")
+        return None, None
+
+    cabezas = {equipo[0] for equipo in equipos}  # Fijas: rompen la simetría entre equipos
+    pares = [(a, b) for a in range(num_equipos) for b in range(a + 1, num_equipos)]
+    contadores = {'intercambios_probados': 0, 'mejoras': 0, 'reinicios': 0}
+
+    puntajes = [estado.puntaje(equipo) for equipo in equipos]
+    actual = estado.objetivo(puntajes)
+    objetivo_inicial = actual
+    mejor = ([list(equipo) for equipo in equipos], actual)
+
+    while time.perf_counter() < plazo and mejor[1][0] > 1e-9:  # Con todos empatados no hay nada que mejorar
+        # Escalada: primer intercambio que mejora, en orden aleatorio
+        mejoro = False
+        candidatos = [(a, b, i, j) for a, b in pares
+                      for i in equipos[a] if i not in cabezas for j in equipos[b] if j not in cabezas]
+        rng.shuffle(candidatos)
+        for a, b, i, j in candidatos:
+            if time.perf_counter() >= plazo:
+                break
+            contadores['intercambios_probados'] += 1
+            nuevo_a = [x for x in equipos[a] if x != i] + [j]
+            nuevo_b = [x for x in equipos[b] if x != j] + [i]
+            nuevos = list(puntajes)
+            nuevos[a] = estado.puntaje(nuevo_a)
+            nuevos[b] = estado.puntaje(nuevo_b)
+            objetivo = estado.objetivo(nuevos)
+            if objetivo < actual:
+                equipos[a], equipos[b] = nuevo_a, nuevo_b
+                puntajes, actual = nuevos, objetivo
+                contadores['mejoras'] += 1
+                mejoro = True
+                break
+        if mejoro:
+            if actual < mejor[1]:
+                mejor = ([list(equipo) for equipo in equipos], actual)
+            continue
+
+        # Óptimo local: perturbar la mejor partición con algunos intercambios al azar
+        contadores['reinicios'] += 1
+        equipos = [list(equipo) for equipo in mejor[0]]
+        for _ in range(rng.randint(2, 4)):
+            a, b = rng.choice(pares)
+            i = rng.choice([x for x in equipos[a] if x not in cabezas])
+            j = rng.choice([x for x in equipos[b] if x not in cabezas])
+            equipos[a] = [x for x in equipos[a] if x != i] + [j]
+            equipos[b] = [x for x in equipos[b] if x != j] + [i]
+        puntajes = [estado.puntaje(equipo) for equipo in equipos]
+        actual = estado.objetivo(puntajes)
+
+    evaluaciones = [estado.evaluar(equipo) for equipo in mejor[0]]
+    puntajes = [e['puntaje'] for e in evaluaciones]
+    info = {
+        'puntajes': puntajes,
+        'formaciones': [e['formacion'] for e in evaluaciones],
+        'asignaciones': [e['asignacion'] for e in evaluaciones],
+        'rango': max(puntajes) - min(puntajes),
+        'validos': all(e['valido'] for e in evaluaciones),
+        'rotacion': dict(contadores, equipos_evaluados=len(estado.evaluaciones),
+                         rango_inicial=round(objetivo_inicial[0], 3),
+                         ms=round((time.perf_counter() - inicio) * 1000, 1))
+    }
+    print(f"🔁 Rotación de {num_equipos} equipos de {tamano}: máximo - mínimo "
+          f"{objetivo_inicial[0]:.2f} → {info['rango']:.2f} ({len(estado.evaluaciones)} equipos evaluados, "
+          f"{contadores['reinicios']} reinicios)")
+    if not info['validos']:
+        print("⚠️  Advertencia: algún equipo quedó sin arquero válido o sin formación completa")
+    return [e['equipo'] for e in evaluaciones], info
+
+def guardar_rotacion(equipos, info, info_partido, archivo=ARCHIVO_ROTACION):
+    """Guarda los equipos de la rotación con un color por equipo"""
+    from formaciones import formatear_formacion
+
+    datos = {
+        'fecha': info_partido.get('fecha'),
+        'hora': info_partido.get('hora'),
+        'cancha': info_partido.get('cancha'),
+        'metodo': f"Rotación de {len(equipos)} equipos",
+        'equipos': {color: [j.nombre for j in equipo] for color, equipo in zip(COLORES_ROTACION, equipos)},
+        'formaciones': {color: formatear_formacion(formacion)
+                        for color, formacion in zip(COLORES_ROTACION, info['formaciones'])},
+        'puntajes': {color: round(puntaje, 2) for color, puntaje in zip(COLORES_ROTACION, info['puntajes'])},
+        'posiciones': dict(zip(COLORES_ROTACION, info['asignaciones'])),
+        'rango': round(info['rango'], 3)
+    }
+    with open(archivo, 'w', encoding='utf-8') as f:
+        json.dump(datos, f, ensure_ascii=False, indent=2)
+
+def main():
+    from plantel import Plantel
+    from seleccion_suplentes import asistencia_reciente
+    from sorteo_posiciones_especificas import cargar_info_partido, jugadores_confirmados
+
+    info_partido, _ = cargar_info_partido()
+    confirmados = jugadores_confirmados(Plantel.desde_archivo().jugadores)
+    num_equipos = int(sys.argv[1]) if len(sys.argv) > 1 else (4 if len(confirmados) >= 24 else 3)
+    tamano = min(7, len(confirmados) // num_equipos)
+    if tamano < 6:
+        print(f"❌ Error: {len(confirmados)} confirmados no alcanzan para {num_equipos} equipos de 6")
+        return
+
+    sobran = len(confirmados) - num_equipos * tamano
+    if sobran:
+        # Descansan los que menos vinieron últimamente
+        asistencia = asistencia_reciente()
+        confirmados = sorted(confirmados, key=lambda j: asistencia.get(j.nombre.lower(), 0.0), reverse=True)
+        print(f"🪑 Descansan: {', '.join(j.nombre for j in confirmados[-sobran:])}")
+        confirmados = confirmados[:-sobran]
+
+    equipos, info = sorteo_rotacion(confirmados, num_equipos)
+    if equipos is None:
+        return
+    for color, equipo, puntaje in zip(COLORES_ROTACION, equipos, info['puntajes']):
+        print(f"\n🎽 {color.upper()} ({puntaje:.1f} pts): {', '.join(j.nombre for j in equipo)}")
+    guardar_rotacion(equipos, info, info_partido)
+    print(f"\n✅ Rotación guardada en {ARCHIVO_ROTACION}")
+
+if __name__ == "__main__":
+    main()
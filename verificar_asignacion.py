@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Verifica que asignar_flexible (algoritmo húngaro) dé lo mismo que probar todas las permutaciones
+
+Arma equipos al azar con jugadores del plantel real y de planteles sintéticos
+(benchmark_sorteo.plantel_sintetico), y para cada formación posible compara
+puntaje y asignación de asignar_flexible contra la búsqueda exhaustiva O(n!),
+con y sin permitir jugadores fuera de posición. Ante empates las dos deben
+elegir la misma asignación (la primera en orden lexicográfico).
+
+Uso:
+    python verificar_asignacion.py                 # 300 equipos
+    python verificar_asignacion.py --equipos 1000 --semilla 3
+"""
+
+import sys
+import random
+import argparse
+import itertools
+
+from benchmark_sorteo import plantel_sintetico
+from formaciones import posicion_base
+from plantel import Plantel, INDICE_POSICION, BIT_POSICION
+from sorteo_posiciones_especificas import asignar_flexible, _posiciones_necesarias, generar_formaciones_posibles
+
+def asignar_por_permutaciones(jugadores_campo, formacion, permitir_fuera_posicion=False):
+    """Asignación de referencia: prueba todas las permutaciones y se queda con la primera de mayor puntaje
+
+    Compara con los puntajes enteros (como asignar_flexible), así los empates exactos no
+    dependen del redondeo de la suma en punto flotante.
+    """
+    posiciones_necesarias = _posiciones_necesarias(formacion, len(jugadores_campo))
+    if posiciones_necesarias is None:
+        return 0, []
+    columnas = [INDICE_POSICION[posicion_base(posicion)] for posicion in posiciones_necesarias]
+    bits = [BIT_POSICION[posicion_base(posicion)] for posicion in posiciones_necesarias]
+
+    mejor_entero = 0
+    mejor_permutacion = None
+    for permutacion in itertools.permutations(jugadores_campo):
+        if not permitir_fuera_posicion and any(not jugador.elegibles & bit for jugador, bit in zip(permutacion, bits)):
+            continue
+        entero = sum(jugador.puntajes_enteros[columna] for jugador, columna in zip(permutacion, columnas))
+        if entero > mejor_entero:
+            mejor_entero = entero
+            mejor_permutacion = permutacion
+    if mejor_permutacion is None:
+        return 0, []
+    asignacion = [(jugador.nombre, posicion, jugador.puntajes[columna])
+                  for jugador, posicion, columna in zip(mejor_permutacion, posiciones_necesarias, columnas)]
+    return sum(puntaje for _, _, puntaje in asignacion), asignacion
+
+def verificar(num_equipos=300, semilla=0):
+    """Compara las dos asignaciones en equipos al azar
+
+    Returns:
+        tuple: (casos comparados, lista de diferencias [(formación, jugadores, húngaro, permutaciones)])
+    """
+    rng = random.Random(semilla)
+    planteles = [Plantel.desde_archivo().jugadores] + [plantel_sintetico(14, semilla + i).jugadores for i in range(5)]
+    casos = 0
+    diferencias = []
+    for _ in range(num_equipos):
+        plantel = rng.choice(planteles)
+        campo = rng.sample(plantel, rng.choice((5, 6)))
+        for formacion in generar_formaciones_posibles(len(campo)):
+            for permitir in (False, True):
+                casos += 1
+                hungaro = asignar_flexible(campo, formacion, permitir)
+                referencia = asignar_por_permutaciones(campo, formacion, permitir)
+                if abs(hungaro[0] - referencia[0]) > 1e-9 or hungaro[1] != referencia[1]:
+                    diferencias.append((formacion, [j.nombre for j in campo], hungaro, referencia))
+    return casos, diferencias
+
+def main():
+    parser = argparse.ArgumentParser(description='Compara asignar_flexible con la búsqueda por permutaciones')
+    parser.add_argument('--equipos', type=int, default=300)
+    parser.add_argument('--semilla', type=int, default=0)
+    args = parser.parse_args()
+
+    casos, diferencias = verificar(args.equipos, args.semilla)
+    for formacion, nombres, hungaro, referencia in diferencias[:5]:
+        print(f"❌ {', '.join(nombres)} en {formacion}:\n   húngaro {hungaro}\n   permutaciones {referencia}")
+    if diferencias:
+        print(f"❌ {len(diferencias)} de {casos} casos no coinciden")
+        return 1
+    print(f"✅ {casos} casos: asignar_flexible coincide con la búsqueda por permutaciones")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())